@@ -0,0 +1,97 @@
+# ── Asset index ──────────────────────────────────────────────────────────────
+#
+# Indexes the game's asset folder by bare name ("bedroom" for
+# backgrounds/bedroom.png). Rescans only re-list directories whose mtime
+# changed; everything else is reused from the previous scan.
+
+import os, threading
+from scriptio import walk_entries
+
+EXTENSIONS = {
+    "background": {".png", ".jpg", ".jpeg", ".webp", ".bmp", ".gif"},
+    "music":      {".ogg", ".mp3", ".wav", ".flac", ".opus", ".m4a"},
+}
+EXTENSIONS["sound"] = EXTENSIONS["music"]
+KINDS = tuple(EXTENSIONS)
+
+
+class AssetIndex:
+    def __init__(self, root=""):
+        self.root = root
+        self.version = 0
+        self.by_name = {}        # name -> [relative paths]
+        self._dirs = {}          # dir -> (mtime, [files], [subdirs])
+        self._lock = threading.Lock()
+
+    def set_root(self, root):
+        with self._lock:
+            self.root = root; self._dirs = {}; self.by_name = {}; self.version += 1
+
+    def scan(self):
+        root = self.root
+        if not root or not os.path.isdir(root): return False
+        dirs, stack, changed = {}, [root], False
+        while stack:
+            d = stack.pop()
+            try: mtime = os.stat(d).st_mtime_ns
+            except OSError: changed = True; continue
+            prev = self._dirs.get(d)
+            if prev and prev[0] == mtime:
+                entry = prev
+            else:
+                files, subs = [], []
+                try:
+                    with os.scandir(d) as it:
+                        for e in it:
+                            if e.name.startswith("."): continue
+                            if e.is_dir(follow_symlinks=False): subs.append(e.path)
+                            elif e.is_file(): files.append(e.name)
+                except OSError: pass
+                entry = (mtime, files, subs); changed = True
+            dirs[d] = entry; stack.extend(entry[2])
+        if not changed and dirs.keys() == self._dirs.keys(): return False
+        by_name = {}
+        for d, (_, files, _) in dirs.items():
+            rel = os.path.relpath(d, root)
+            for f in files:
+                by_name.setdefault(os.path.splitext(f)[0], []).append(os.path.normpath(os.path.join(rel, f)))
+        with self._lock:
+            if root != self.root: return False
+            self._dirs = dirs; self.by_name = by_name; self.version += 1
+        return True
+
+    def names(self, kind=None):
+        exts = EXTENSIONS.get(kind)
+        with self._lock: items = list(self.by_name.items())
+        if exts is None: return sorted(n for n, _ in items)
+        return sorted(n for n, paths in items if any(os.path.splitext(p)[1].lower() in exts for p in paths))
+
+    def __contains__(self, name):
+        return name in self.by_name
+
+
+# ── references ───────────────────────────────────────────────────────────────
+
+def reference_index(sequences):
+    """{kind: {name: [ids]}} built in a single pass over the document."""
+    refs = {k: {} for k in KINDS}
+    for seq_id, sd in sequences.items():
+        sd = sd or {}
+        if sd.get("background"):
+            refs["background"].setdefault(str(sd["background"]), []).append(f"{seq_id}#background")
+        for path, entry in walk_entries(sd.get("sequence")):
+            for kind in KINDS:
+                if entry.get(kind):
+                    refs[kind].setdefault(str(entry[kind]), []).append(f"{seq_id}#{path}")
+    return refs
+
+
+def asset_report(index, refs):
+    """Return (missing {kind: {name: ids}}, unused {kind: [names]})."""
+    missing, unused = {}, {}
+    for kind in KINDS:
+        available = set(index.names(kind))
+        missing[kind] = {n: ids for n, ids in refs[kind].items() if n not in available}
+        used = set().union(*(refs[k] for k in KINDS if EXTENSIONS[k] is EXTENSIONS[kind]))
+        unused[kind] = sorted(available - used)
+    return missing, unused
@@ -0,0 +1,142 @@
+# ── Benchmarks ───────────────────────────────────────────────────────────────
+#
+#   python bench.py bundle|compress|json|flowchart [--seqs N] [--lines N]
+
+import os, sys, time, random, argparse, tempfile
+import yaml
+from serializer import DoubleQuotedStr, dump_yaml
+from bundle import compile_bundle, Bundle
+from scriptio import load_script, save_script
+
+try: _Loader = yaml.CSafeLoader
+except AttributeError: _Loader = None
+
+CHARS = ["luna", "sol", "kai", "mira", "ren"]
+WORDS = ("hello there the night is long and the stars are out "
+         "we should go before {luna} notices (he/she/they) said so").split()
+
+
+def make_script(n_seqs=200, lines=60, seed=1):
+    rnd = random.Random(seed); ids = [f"seq_{i}" for i in range(n_seqs)]
+
+    def body(n, depth):
+        seq = []
+        for _ in range(n):
+            r = rnd.random()
+            if r < 0.15:   seq.append({"char": rnd.choice(CHARS)})
+            elif r < 0.25: seq.append({"emotion": rnd.choice(["happy", "sad", "angry"])})
+            elif r < 0.7:  seq.append({"say": DoubleQuotedStr(" ".join(rnd.choices(WORDS, k=rnd.randint(4, 14))))})
+            elif r < 0.75: seq.append({"background": f"bg_{rnd.randint(0, 20)}", "fadeout": rnd.randint(0, 3)})
+            elif r < 0.8:  seq.append({"music": f"track_{rnd.randint(0, 10)}"})
+            elif r < 0.85: seq.append({"wait": rnd.choice([1, 2, 0.5])})
+            elif r < 0.9:  seq.append({"set": f"flag_{rnd.randint(0, 30)} = {rnd.randint(0, 5)}"})
+            elif r < 0.95 and depth < 2:
+                seq.append({"choice": [{"option": DoubleQuotedStr(f"Option {k + 1}"),
+                                        "sequence": body(n // 4, depth + 1)} for k in range(rnd.randint(2, 3))]})
+            else:          seq.append({"jump": rnd.choice(ids)})
+        return seq
+
+    return {sid: {"title": f"Title {sid}", "description": "", "background": "bg_0",
+                  "characters": {c: "center" for c in rnd.sample(CHARS, 2)},
+                  "sequence": body(lines, 0)} for sid in ids}
+
+
+def timed(fn, repeat=5):
+    best = None
+    for _ in range(repeat):
+        t = time.perf_counter(); fn(); d = time.perf_counter() - t
+        best = d if best is None else min(best, d)
+    return best
+
+
+def report(rows):
+    w = max(len(r[0]) for r in rows)
+    for name, size, secs in rows:
+        print(f"  {name:<{w}}  {'' if size is None else f'{size / 1024:10.1f} KiB':>14}  {secs * 1000:9.2f} ms")
+
+
+def bench_bundle(seqs):
+    text = dump_yaml({"sequences": seqs}); blob = compile_bundle(seqs)
+    rows = [("yaml safe_load", len(text.encode()), timed(lambda: yaml.safe_load(text), 3))]
+    if _Loader:
+        rows.append(("yaml CSafeLoader", len(text.encode()), timed(lambda: yaml.load(text, Loader=_Loader))))
+    rows.append(("bundle open", len(blob), timed(lambda: Bundle(blob))))
+    rows.append(("bundle open + decode all", len(blob), timed(lambda: Bundle(blob).to_sequences())))
+    assert Bundle(blob).to_sequences() == yaml.safe_load(text)["sequences"], "bundle round-trip mismatch"
+    report(rows)
+
+
+def bench_compress(seqs):
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for suffix in (".yaml", ".yaml.gz", ".yaml.xz"):
+            path = os.path.join(tmp, "script" + suffix)
+            save = timed(lambda: save_script(path, seqs), 3)
+            load = timed(lambda: load_script(path), 3)
+            assert load_script(path)["sequences"] == yaml.safe_load(dump_yaml({"sequences": seqs}))["sequences"]
+            rows += [(f"save {suffix}", os.path.getsize(path), save), (f"load {suffix}", os.path.getsize(path), load)]
+    report(rows)
+
+
+def bench_json(seqs):
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for suffix in (".yaml", ".json"):
+            path = os.path.join(tmp, "script" + suffix)
+            save = timed(lambda: save_script(path, seqs), 3)
+            load = timed(lambda: load_script(path), 3)
+            rows += [(f"save {suffix}", os.path.getsize(path), save), (f"load {suffix}", os.path.getsize(path), load),
+                     (f"round-trip {suffix}", os.path.getsize(path), save + load)]
+        assert load_script(os.path.join(tmp, "script.json")) == load_script(os.path.join(tmp, "script.yaml")), \
+            "json/yaml mismatch"
+    report(rows)
+
+
+def bench_flowchart(seqs, nodes=5000):
+    """Layout and render time of the flowchart; sequences are repeated until it has `nodes` nodes."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtGui import QImage, QPainter, QTransform
+    import main, flowchart
+    app = QApplication.instance() or QApplication(sys.argv[:1]); main.init_fonts()
+    editor = main.DialogueTreeEditor()
+    items = list(seqs.items()); n = i = 0
+    while n < nodes:
+        sid, sd = items[i % len(items)]
+        if i >= len(items): sid = f"{sid}_{i // len(items)}"
+        editor._add_seq_from_data(sid, sd); i += 1
+        n += len(flowchart.sequence_graph(editor.mirror.node(editor.tree.topLevelItem(i - 1)), sid)[0])
+    snap = editor.mirror.snapshot()
+    jobs = [(sn, sn.data["id"]) for sn in snap.children]
+    layouts = flowchart.layout_all(jobs)
+    rows = [(f"layout {len(jobs)} sequences", None, timed(lambda: flowchart.layout_all(jobs), 3))]
+    view = flowchart.FlowchartView(lambda *a: None, lambda on: None); view.resize(1600, 1000)
+    scene = view.scene(); font = editor.font()
+    groups = [flowchart.SeqGroup(sid, layouts[sn], font) for sn, sid in jobs]
+    for g, (x, y) in zip(groups, flowchart.pack([(g.layout["w"], g.layout["h"]) for g in groups])):
+        g.setPos(x, y); scene.addItem(g)
+    img = QImage(view.size(), QImage.Format_ARGB32_Premultiplied)
+
+    def render():
+        p = QPainter(img); view.render(p); p.end()
+
+    for label, scale in (("detail", 1.0), ("no text", 0.4), ("flat", 0.2), ("overview", 0.05)):
+        for g in groups: g.set_overview(scale < flowchart.OVERVIEW_SCALE)
+        view.setTransform(QTransform.fromScale(scale, scale)); view.centerOn(scene.itemsBoundingRect().center())
+        rows.append((f"render {label} ×{scale:g}", None, timed(render)))
+    print(f"  {n} nodes, {sum(l['crossings'] for l in layouts.values())} edge crossings")
+    report(rows)
+    editor.close()
+
+
+BENCHES = {"bundle": bench_bundle, "compress": bench_compress, "json": bench_json, "flowchart": bench_flowchart}
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("bench", choices=sorted(BENCHES))
+    ap.add_argument("--seqs", type=int, default=200)
+    ap.add_argument("--lines", type=int, default=60)
+    a = ap.parse_args()
+    seqs = make_script(a.seqs, a.lines)
+    print(f"{a.bench}: {a.seqs} sequences × {a.lines} lines")
+    BENCHES[a.bench](seqs)
@@ -0,0 +1,220 @@
+# ── Binary runtime bundle ────────────────────────────────────────────────────
+#
+# Layout (little-endian):
+#   header    "VNBN" u16 version u32 n_strings u32 n_seqs
+#   strings   u32 offsets[n_strings+1], utf-8 blob
+#   directory per sequence: u32 id, title, desc, bg, n_chars, code_off, code_len
+#             followed by n_chars × (u32 name, u32 pos)
+#   code      opcode streams, one per sequence, offsets relative to its start
+#
+# Every string operand is an index into the deduplicated string table.
+# CHOICE is followed by its table: u16 n, then n × (u32 option, u32 offset);
+# each option body ends in GOTO to the instruction after the whole choice.
+# JUMP operands are sequence indices, resolved at compile time.
+
+import struct
+
+MAGIC   = b"VNBN"
+VERSION = 1
+
+(OP_END, OP_CHAR, OP_EMOTION, OP_SAY, OP_BG, OP_BG_FADE, OP_ANIMATE, OP_MUSIC,
+ OP_SOUND, OP_WAIT, OP_SET, OP_JUMP, OP_CHOICE, OP_GOTO, OP_CMD) = range(15)
+
+STR_OPS = {"char": OP_CHAR, "emotion": OP_EMOTION, "say": OP_SAY, "background": OP_BG,
+           "animate": OP_ANIMATE, "music": OP_MUSIC, "sound": OP_SOUND, "set": OP_SET}
+OP_NAMES = {v: k for k, v in STR_OPS.items()}
+
+_U32 = struct.Struct("<I"); _OP_U32 = struct.Struct("<BI"); _OP_F64 = struct.Struct("<Bd")
+_OP_U32_U32 = struct.Struct("<BII"); _OP_U32_F64 = struct.Struct("<BId")
+_CHOICE = struct.Struct("<BH"); _ENTRY = struct.Struct("<II")
+_HEADER = struct.Struct("<4sHII"); _DIR = struct.Struct("<7I")
+
+
+class BundleError(Exception):
+    pass
+
+
+class _Strings:
+    def __init__(self):
+        self.index = {}; self.items = []
+
+    def __call__(self, s):
+        s = "" if s is None else str(s)
+        i = self.index.get(s)
+        if i is None:
+            i = self.index[s] = len(self.items); self.items.append(s)
+        return i
+
+
+def _num(v):
+    if isinstance(v, bool): return None
+    if isinstance(v, (int, float)): return float(v)
+    try: return float(str(v).strip())
+    except ValueError: return None
+
+
+# ── compiler ─────────────────────────────────────────────────────────────────
+
+def _compile_seq(seq, code, s, seq_index):
+    for entry in seq or []:
+        if not isinstance(entry, dict): continue
+        if "background" in entry and "fadeout" in entry:
+            fade = _num(entry["fadeout"])
+            if fade is not None:
+                code += _OP_U32_F64.pack(OP_BG_FADE, s(entry["background"]), fade); continue
+        for key, val in entry.items():
+            if key == "choice":
+                # like scriptio.choice_options; counted after filtering so the table matches what is written
+                opts = [opt for opt in (val or []) if isinstance(opt, dict)]
+                table = len(code) + _CHOICE.size
+                code += _CHOICE.pack(OP_CHOICE, len(opts))
+                code += bytes(_ENTRY.size * len(opts))
+                gotos = []
+                for n, opt in enumerate(opts):
+                    _ENTRY.pack_into(code, table + n * _ENTRY.size, s(opt.get("option", "")), len(code))
+                    _compile_seq(opt.get("sequence", []), code, s, seq_index)
+                    gotos.append(len(code) + 1); code += _OP_U32.pack(OP_GOTO, 0)
+                for g in gotos: _U32.pack_into(code, g, len(code))
+            elif key == "wait" and _num(val) is not None:
+                code += _OP_F64.pack(OP_WAIT, _num(val))
+            elif key == "jump" and str(val) in seq_index:
+                code += _OP_U32.pack(OP_JUMP, seq_index[str(val)])
+            elif key in STR_OPS:
+                code += _OP_U32.pack(STR_OPS[key], s(val))
+            else:
+                code += _OP_U32_U32.pack(OP_CMD, s(key), s(val))
+    return code
+
+
+def compile_bundle(sequences):
+    s = _Strings(); seq_index = {str(k): i for i, k in enumerate(sequences)}
+    dirs, codes, off = [], [], 0
+    for seq_id, sd in sequences.items():
+        code = _compile_seq(sd.get("sequence", []), bytearray(), s, seq_index)
+        code.append(OP_END)
+        chars = sd.get("characters") or {}
+        d = _DIR.pack(s(seq_id), s(sd.get("title", "")), s(sd.get("description", "")),
+                      s(sd.get("background", "")), len(chars), off, len(code))
+        d += b"".join(_ENTRY.pack(s(k), s(v)) for k, v in chars.items())
+        dirs.append(d); codes.append(code); off += len(code)
+    blobs = [x.encode("utf-8") for x in s.items]
+    offsets, pos = [], 0
+    for b in blobs: offsets.append(pos); pos += len(b)
+    offsets.append(pos)
+    return b"".join([_HEADER.pack(MAGIC, VERSION, len(blobs), len(dirs)),
+                     struct.pack(f"<{len(offsets)}I", *offsets), *blobs, *dirs, *codes])
+
+
+def write_bundle(sequences, path):
+    with open(path, "wb") as f: f.write(compile_bundle(sequences))
+
+
+# ── reader ───────────────────────────────────────────────────────────────────
+
+class Bundle:
+    def __init__(self, data):
+        self.data = memoryview(data)
+        magic, version, n_str, n_seq = _HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC: raise BundleError("not a VN bundle")
+        if version != VERSION: raise BundleError(f"unsupported bundle version {version}")
+        pos = _HEADER.size
+        self._offsets = struct.unpack_from(f"<{n_str + 1}I", self.data, pos)
+        pos += 4 * (n_str + 1)
+        self._blob = pos; pos += self._offsets[-1]
+        self._cache = [None] * n_str
+        self.seqs = []; self.index = {}
+        for i in range(n_seq):
+            sid, title, desc, bg, n_chars, code_off, code_len = _DIR.unpack_from(self.data, pos)
+            pos += _DIR.size
+            chars = [_ENTRY.unpack_from(self.data, pos + k * _ENTRY.size) for k in range(n_chars)]
+            pos += n_chars * _ENTRY.size
+            self.seqs.append((sid, title, desc, bg, chars, code_off, code_len))
+        for i, rec in enumerate(self.seqs):
+            rec = self.seqs[i] = rec[:5] + (rec[5] + pos,) + rec[6:]
+            self.index[self.string(rec[0])] = i
+
+    def string(self, i):
+        s = self._cache[i]
+        if s is None:
+            a, b = self._offsets[i], self._offsets[i + 1]
+            s = self._cache[i] = str(self.data[self._blob + a:self._blob + b], "utf-8")
+        return s
+
+    def seq_ids(self):
+        return list(self.index)
+
+    def meta(self, seq_id):
+        _, title, desc, bg, chars, _, _ = self.seqs[self.index[seq_id]]
+        return {"title": self.string(title), "description": self.string(desc),
+                "background": self.string(bg),
+                "characters": {self.string(k): self.string(v) for k, v in chars}}
+
+    def code(self, seq_id):
+        rec = self.seqs[self.index[seq_id]]
+        return self.data[rec[5]:rec[5] + rec[6]]
+
+    def ops(self, seq_id):
+        """Yield (offset, op, args) for the raw opcode stream of a sequence."""
+        code = self.code(seq_id); pc = 0; st = self.string
+        while pc < len(code):
+            op = code[pc]; at = pc
+            if op == OP_END:
+                yield at, op, (); return
+            if op == OP_CHOICE:
+                n = _CHOICE.unpack_from(code, pc)[1]; pc += _CHOICE.size
+                table = [_ENTRY.unpack_from(code, pc + k * _ENTRY.size) for k in range(n)]
+                pc += n * _ENTRY.size
+                yield at, op, tuple((st(t), o) for t, o in table)
+            elif op == OP_WAIT:
+                yield at, op, (_OP_F64.unpack_from(code, pc)[1],); pc += _OP_F64.size
+            elif op == OP_BG_FADE:
+                _, b, f = _OP_U32_F64.unpack_from(code, pc); pc += _OP_U32_F64.size
+                yield at, op, (st(b), f)
+            elif op == OP_CMD:
+                _, k, v = _OP_U32_U32.unpack_from(code, pc); pc += _OP_U32_U32.size
+                yield at, op, (st(k), st(v))
+            elif op == OP_JUMP:
+                t = _OP_U32.unpack_from(code, pc)[1]; pc += _OP_U32.size
+                yield at, op, (self.string(self.seqs[t][0]),)
+            elif op == OP_GOTO:
+                yield at, op, (_OP_U32.unpack_from(code, pc)[1],); pc += _OP_U32.size
+            elif op in OP_NAMES:
+                yield at, op, (st(_OP_U32.unpack_from(code, pc)[1]),); pc += _OP_U32.size
+            else:
+                raise BundleError(f"bad opcode {op} at {at} in {seq_id}")
+
+    def decode(self, seq_id):
+        """Rebuild the `sequence` list of a sequence by following the offsets."""
+        ops = {at: (op, args) for at, op, args in self.ops(seq_id)}
+        order = sorted(ops)
+        nxt = {a: b for a, b in zip(order, order[1:])}
+
+        def walk(pc):
+            out = []
+            while pc in ops:
+                op, args = ops[pc]
+                if op in (OP_END, OP_GOTO): return out, (args[0] if op == OP_GOTO else None)
+                if op == OP_CHOICE:
+                    opts, after = [], nxt.get(pc)
+                    for text, target in args:
+                        body, after = walk(target)
+                        opts.append({"option": text, "sequence": body})
+                    out.append({"choice": opts}); pc = after; continue
+                if op == OP_WAIT:
+                    w = args[0]; out.append({"wait": int(w) if w.is_integer() else w})
+                elif op == OP_BG_FADE:
+                    f = args[1]; out.append({"background": args[0], "fadeout": int(f) if f.is_integer() else f})
+                elif op == OP_JUMP: out.append({"jump": args[0]})
+                elif op == OP_CMD:  out.append({args[0]: args[1]})
+                else:               out.append({OP_NAMES[op]: args[0]})
+                pc = nxt.get(pc)
+            return out, None
+
+        return walk(0)[0]
+
+    def to_sequences(self):
+        return {sid: dict(self.meta(sid), sequence=self.decode(sid)) for sid in self.index}
+
+
+def load_bundle(path):
+    with open(path, "rb") as f: return Bundle(f.read())
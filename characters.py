@@ -0,0 +1,95 @@
+# ── Character roster ─────────────────────────────────────────────────────────
+#
+# One list model shared by the characters page and every character combo.
+# characters.json holds [{"name", "position", "emotions"}]; the old plain
+# list of names is still read. Edits are saved after a short delay, written
+# to a temporary file and swapped in so a crash never leaves it half-written.
+
+import os, json
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QTimer
+
+POSITIONS = ["left", "center", "right"]
+SAVE_DELAY_MS = 500
+
+
+def _entry(c):
+    if isinstance(c, str): c = {"name": c}
+    return {"name": str(c.get("name", "")).strip(), "position": c.get("position") or "center",
+            "emotions": [str(e) for e in c.get("emotions") or []]}
+
+
+class CharacterModel(QAbstractListModel):
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self._chars = []                 # [{"name", "position", "emotions"}]
+        self._rows = {}                  # name -> row
+        self._timer = QTimer(self); self._timer.setSingleShot(True); self._timer.setInterval(SAVE_DELAY_MS)
+        self._timer.timeout.connect(self.save)
+
+    # model
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._chars)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole): return None
+        return self._chars[index.row()]["name"]
+
+    def _reindex(self):
+        self._rows = {c["name"]: i for i, c in enumerate(self._chars)}
+
+    # roster
+    def names(self):
+        return list(self._rows)
+
+    def __contains__(self, name):
+        return name in self._rows
+
+    def get(self, name):
+        r = self._rows.get(name)
+        return dict(self._chars[r]) if r is not None else None
+
+    def add(self, name, position="center", emotions=()):
+        name = name.strip()
+        if not name or name in self._rows: return False
+        n = len(self._chars)
+        self.beginInsertRows(QModelIndex(), n, n)
+        self._chars.append(_entry({"name": name, "position": position, "emotions": list(emotions)}))
+        self._reindex(); self.endInsertRows()
+        self._timer.start(); return True
+
+    def remove(self, names):
+        for r in sorted((self._rows[n] for n in set(names) if n in self._rows), reverse=True):
+            self.beginRemoveRows(QModelIndex(), r, r); del self._chars[r]; self.endRemoveRows()
+        self._reindex(); self._timer.start()
+
+    def update(self, name, **meta):
+        r = self._rows.get(name)
+        if r is None: return
+        c = _entry({**self._chars[r], **meta})
+        if c == self._chars[r]: return
+        self._chars[r] = c
+        self.dataChanged.emit(self.index(r), self.index(r)); self._timer.start()
+
+    # persistence
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f: raw = json.load(f)
+        except (OSError, ValueError): return False
+        chars, seen = [], set()
+        for c in raw if isinstance(raw, list) else []:
+            e = _entry(c)
+            if e["name"] and e["name"] not in seen: seen.add(e["name"]); chars.append(e)
+        self.beginResetModel(); self._chars = chars; self._reindex(); self.endResetModel()
+        return True
+
+    def save(self):
+        self._timer.stop()
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f: json.dump(self._chars, f, indent=2)
+            os.replace(tmp, self.path)
+        except OSError: pass
+
+    def flush(self):
+        if self._timer.isActive(): self.save()
@@ -0,0 +1,169 @@
+# ── Command registry ─────────────────────────────────────────────────────────
+#
+# Every command type declares its fields. In a script entry the first field
+# is stored under the command key and the others as sibling keys, e.g.
+#   {"background": "street", "fadeout": 2}
+# Tree items keep the parsed field values, so export builds entries straight
+# from them; the column text is only for display (and for hand edits, which
+# are parsed back with parse_display).
+#
+# Project commands can be added in commands.yaml next to the script editor:
+#
+#   commands:
+#     shake_screen:
+#       fields:
+#         - {name: intensity, widget: number, default: 1}
+#         - {name: duration,  widget: number}
+
+import os, re
+import yaml
+from serializer import DoubleQuotedStr
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "commands.yaml")
+WIDGETS = ("dialogue", "character", "emotion", "animation", "asset", "sequence", "line", "number", "options")
+
+
+def to_number(v):
+    if isinstance(v, (int, float)) or v in ("", None): return v
+    s = str(v).strip()
+    try: return int(s) if re.fullmatch(r"[-+]?\d+", s) else float(s)
+    except ValueError: return s
+
+
+class Field:
+    __slots__ = ("name", "widget", "options", "default")
+
+    def __init__(self, name, widget="line", options=None, default=""):
+        if widget not in WIDGETS and not widget.startswith("asset:"):
+            raise ValueError(f"unknown widget {widget!r} for field {name!r}")
+        self.name, self.widget, self.options, self.default = name, widget, options, default
+
+    def coerce(self, v):
+        if v is None: return self.default
+        return to_number(v) if self.widget == "number" else v
+
+
+class Command:
+    """A command type; subclasses override the conversions for their own string formats."""
+    def __init__(self, key, fields, addable=True):
+        self.key, self.fields, self.addable = key, [Field(**f) if isinstance(f, dict) else f for f in fields], addable
+        self.names = [f.name for f in self.fields]
+        self.siblings = self.names[1:] if type(self).from_entry is Command.from_entry else []
+
+    def from_entry(self, entry):
+        first, rest = self.fields[0], self.fields[1:]
+        return {first.name: first.coerce(entry.get(self.key)), **{f.name: f.coerce(entry.get(f.name)) for f in rest}}
+
+    def to_entry(self, values):
+        first, rest = self.fields[0], self.fields[1:]
+        entry = {self.key: values.get(first.name, first.default)}
+        for f in rest:
+            v = values.get(f.name, f.default)
+            if v not in ("", None): entry[f.name] = v
+        return entry
+
+    def display(self, values):
+        first, rest = self.fields[0], self.fields[1:]
+        parts = [str(values.get(first.name, ""))]
+        parts += [f"{f.name}: {values[f.name]}" for f in rest if values.get(f.name) not in ("", None)]
+        return ", ".join(parts)
+
+    def parse_display(self, text):
+        values = {f.name: f.default for f in self.fields}
+        parts = re.split(r", (%s): " % "|".join(map(re.escape, self.names[1:])), text) if self.names[1:] else [text]
+        values[self.names[0]] = self.fields[0].coerce(parts[0].strip())
+        for name, v in zip(parts[1::2], parts[2::2]):
+            values[name] = self.fields[self.names.index(name)].coerce(v.strip())
+        return values
+
+
+class Dialogue(Command):
+    def from_entry(self, entry):
+        v = entry.get(self.key); return {"text": "" if v is None else str(v)}
+
+    def to_entry(self, values): return {self.key: DoubleQuotedStr(values.get("text", ""))}
+    def display(self, values):  return f'"{values.get("text", "")}"'
+    def parse_display(self, text): return {"text": text.strip('"')}
+
+
+class Assignment(Command):
+    # "raw" keeps the string as written (`a=1` stays `a=1` on export) for as long as it
+    # still says the same thing; the panel builds fields without it, which normalizes
+    def from_entry(self, entry): return self.parse_display(str(entry.get(self.key) or ""))
+    def to_entry(self, values):  return {self.key: self.display(values)}
+    def display(self, values):
+        var, val = values.get("variable", ""), values.get("value", "")
+        raw = values.get("raw")
+        if raw is not None and self._split(raw) == (str(var), str(val)): return raw
+        return f"{var} = {val}" if val != "" else str(var)
+
+    def parse_display(self, text):
+        var, val = self._split(text)
+        return {"variable": var, "value": val, "raw": text}
+
+    @staticmethod
+    def _split(text):
+        var, _, val = text.partition("=")
+        return var.strip(), val.strip()
+
+
+class Choice(Command):
+    # options are child items; the entry itself is built from them
+    def from_entry(self, entry): return {}
+    def to_entry(self, values):  return {"choice": []}
+    def display(self, values):   return ""
+    def parse_display(self, text): return {}
+
+
+REGISTRY = {}
+
+def register(cmd):
+    REGISTRY[cmd.key] = cmd; return cmd
+
+for _c in (
+    Command("char",       [Field("character", "character")]),
+    Command("emotion",    [Field("emotion", "emotion")]),
+    Dialogue("say",       [Field("text", "dialogue")]),
+    Command("background", [Field("background", "asset:background"), Field("fadeout", "number")]),
+    Command("animate",    [Field("animation", "animation")]),
+    Choice("choice",      [Field("options", "options", default=2)]),
+    Command("music",      [Field("value", "asset:music")]),
+    Command("sound",      [Field("value", "asset:sound")]),
+    Command("wait",       [Field("value", "number")]),
+    Assignment("set",     [Field("variable"), Field("value")]),
+    Command("jump",       [Field("value", "sequence")]),
+    Dialogue("option",    [Field("text", "dialogue")], addable=False),
+):
+    register(_c)
+
+
+def get(key):
+    """Registered command, or a one-field command for keys nobody declared."""
+    return REGISTRY.get(key) or Command(key, [Field("value")], addable=False)
+
+
+def addable():
+    return [k for k, c in REGISTRY.items() if c.addable]
+
+
+def from_entry(key, entry): return get(key).from_entry(entry)
+def to_entry(key, values):  return get(key).to_entry(values)
+def display(key, values):   return get(key).display(values)
+def parse_display(key, text): return get(key).parse_display(text)
+
+
+def entry_commands(entry):
+    """Split one script entry into [(key, values)]; sibling keys claimed by a command's fields are consumed."""
+    claimed = {n for key in entry if key in REGISTRY for n in REGISTRY[key].siblings}
+    return [(key, get(key).from_entry(entry)) for key in entry if key not in claimed]
+
+
+def load_schema(path=SCHEMA_FILE):
+    """Register the commands declared in a schema file; returns their keys."""
+    if not os.path.exists(path): return []
+    with open(path, "r", encoding="utf-8") as f: schema = yaml.safe_load(f) or {}
+    keys = []
+    for key, spec in (schema.get("commands") or {}).items():
+        register(Command(key, (spec or {}).get("fields") or [{"name": "value"}], (spec or {}).get("addable", True)))
+        keys.append(key)
+    return keys
@@ -0,0 +1,132 @@
+# ── Completion index ─────────────────────────────────────────────────────────
+#
+# One prefix trie per completion kind ("character", "emotion", "background",
+# "sequence", …). A word stays in its trie while any source still counts it:
+# the character roster, the asset index, the built-in lists and the values
+# used in the document, which are counted per snapshot sequence so edits only
+# rescan the sequences whose Node changed.
+
+from collections import Counter
+import commands
+from snapshot import NodeKind, seq_id, fields_of
+from templates import compile_template
+
+# command key -> completion kind of the values it uses
+USED_KINDS = {"char": "character", "emotion": "emotion", "animate": "animation",
+              "background": "background", "music": "music", "sound": "sound", "jump": "sequence"}
+LIMIT = 12
+
+
+class _Node:
+    __slots__ = ("kids", "word", "count", "order")
+
+    def __init__(self):
+        self.kids, self.word, self.count, self.order = {}, None, 0, None   # order: sorted kids, reversed
+
+
+class Trie:
+    """Case-insensitive prefix trie with reference counts; completions come out in alphabetical order."""
+    def __init__(self):
+        self.root = _Node(); self.size = 0
+
+    def add(self, word, n=1):
+        node = self.root
+        for ch in word.lower():
+            nxt = node.kids.get(ch)
+            if nxt is None: nxt = node.kids[ch] = _Node(); node.order = None
+            node = nxt
+        if not node.count: self.size += 1
+        node.word = word; node.count += n
+
+    def discard(self, word, n=1):
+        path, node = [], self.root
+        for ch in word.lower():
+            nxt = node.kids.get(ch)
+            if nxt is None: return
+            path.append((node, ch)); node = nxt
+        if not node.count: return
+        node.count = max(0, node.count - n)
+        if node.count: return
+        node.word = None; self.size -= 1
+        for parent, ch in reversed(path):          # prune empty branches
+            if node.kids or node.count: break
+            del parent.kids[ch]; parent.order = None; node = parent
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, word):
+        node = self.root
+        for ch in word.lower():
+            node = node.kids.get(ch)
+            if node is None: return False
+        return node.count > 0
+
+    def complete(self, prefix, limit=LIMIT):
+        node = self.root
+        for ch in prefix.lower():
+            node = node.kids.get(ch)
+            if node is None: return []
+        out, stack = [], [node]
+        while stack and len(out) < limit:
+            n = stack.pop()
+            if n.count: out.append(n.word)
+            if n.order is None: n.order = [n.kids[k] for k in sorted(n.kids, reverse=True)]
+            stack.extend(n.order)
+        return out
+
+
+def used_values(seq_node, sid):
+    """Counter of (kind, value) used by one snapshot sequence."""
+    c = Counter({("sequence", sid): 1})
+    bg = (seq_node.data or {}).get("bg")
+    if bg: c["background", bg] += 1
+    for _, n in seq_node.walk():
+        if n.kind == NodeKind.SEQ: continue
+        kind = USED_KINDS.get(n.key)
+        if kind and n.kind != NodeKind.HEADER_BG:
+            v = str(fields_of(n).get(commands.get(n.key).names[0]) or "").strip()
+            if v: c[kind, v] += 1
+        elif n.key in ("say", "option"):
+            for m in compile_template(n.value.strip('"')).mentions():
+                if m: c["character", m] += 1
+    return c
+
+
+class CompletionIndex:
+    def __init__(self):
+        self.tries = {}
+        self._sources = {}       # (kind, source) -> set of words
+        self._seqs = {}          # seq Node -> Counter((kind, value))
+        self._root = None
+
+    def trie(self, kind):
+        if kind not in self.tries: self.tries[kind] = Trie()
+        return self.tries[kind]
+
+    def set_source(self, kind, source, words):
+        """Replace the words one source contributes to a kind; only the difference touches the trie."""
+        old, new = self._sources.get((kind, source), set()), set(w for w in words if w)
+        t = self.trie(kind)
+        for w in old - new: t.discard(w)
+        for w in new - old: t.add(w)
+        self._sources[kind, source] = new
+
+    def update(self, root):
+        if root is self._root: return False
+        live = {}
+        for i, sn in enumerate(root.children):
+            if sn.kind != NodeKind.SEQ: continue
+            live[sn] = self._seqs.pop(sn, None) or self._count(used_values(sn, seq_id(sn, i)), 1)
+        for c in self._seqs.values(): self._count(c, -1)
+        self._seqs, self._root = live, root
+        return True
+
+    def _count(self, counter, sign):
+        for (kind, value), n in counter.items():
+            (self.trie(kind).add if sign > 0 else self.trie(kind).discard)(value, n)
+        return counter
+
+    def complete(self, kind, prefix, limit=LIMIT):
+        t = self.tries.get(kind)
+        return t.complete(prefix, limit) if t else []
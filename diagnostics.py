@@ -0,0 +1,200 @@
+# ── Memory diagnostics ───────────────────────────────────────────────────────
+#
+#   python diagnostics.py [script.yaml] [--selections 5000] [--imports 20] [--every 250]
+#
+# MemoryProbe samples RSS, the tracemalloc total, live QObjects by class
+# (children of the application's top-level widgets, plus wrapped QObjects the
+# Python GC still sees, which catches parentless ones) and the documents' tree
+# item counts. growth() flags whatever kept climbing after the warm-up sample.
+#
+# The stress run drives thousands of selection changes and import/close
+# cycles on an offscreen editor, prints the report and exits 1 when something
+# grew or a slot raised, so it can run unattended. Tools > Memory diagnostics samples the
+# running editor the same way.
+
+import os, sys, gc, time, tracemalloc, argparse, tempfile
+from collections import Counter
+
+MB = 1 << 20
+# a series is flagged when it grew at least this much in total and in most sampling intervals
+MIN_OBJECTS = 25
+MIN_HEAP_MB = 1
+MIN_RSS_MB = 64
+STEADY = 0.75
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f: return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource                     # peak rather than current outside Linux
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def qobject_counts(app):
+    """Counter of QObject class names owned by the application's top-level widgets."""
+    from PySide6.QtCore import QObject
+    c = Counter()
+    for w in app.topLevelWidgets():
+        c[w.metaObject().className()] += 1
+        for o in w.findChildren(QObject): c[o.metaObject().className()] += 1
+    return c
+
+
+def wrapper_counts():
+    """Counter of Python classes of the QObject wrappers still alive, parented or not."""
+    from PySide6.QtCore import QObject
+    import shiboken6
+    return Counter(type(o).__name__ for o in gc.get_objects() if isinstance(o, QObject) and shiboken6.isValid(o))
+
+
+def tree_items(editor):
+    return sum(d.mirror.snapshot().size() if d.tree is not None else d.items for d in editor.docs)
+
+
+def flush_deletes(app):
+    # deleteLater() only runs from an event loop; the stress run and the probe have none of their own
+    from PySide6.QtCore import QEvent
+    app.processEvents(); app.sendPostedEvents(None, QEvent.DeferredDelete); app.processEvents()
+
+
+def steady(vals, min_growth):
+    steps = list(zip(vals, vals[1:]))
+    return vals[-1] - vals[0] >= min_growth and sum(b >= a for a, b in steps) >= STEADY * len(steps)
+
+
+class MemoryProbe:
+    """Samples over time; growth() compares everything after the warm-up sample."""
+    def __init__(self, app, editor=None, trace=True):
+        self.app, self.editor, self.samples = app, editor, []
+        self._snaps = []                     # tracemalloc snapshots: first after warm-up, latest
+        self.trace, self._started = trace, trace and not tracemalloc.is_tracing()
+        if self._started: tracemalloc.start(1)
+
+    def stop(self):
+        """Stop tracemalloc if this probe started it."""
+        if self._started and tracemalloc.is_tracing(): tracemalloc.stop()
+        self._started = False
+
+    def sample(self, label=""):
+        flush_deletes(self.app); gc.collect()
+        s = {"label": label, "t": time.time(), "rss": rss_bytes(),
+             "traced": tracemalloc.get_traced_memory()[0] if self.trace else 0,
+             "items": tree_items(self.editor) if self.editor is not None else 0,
+             "qobjects": qobject_counts(self.app), "wrappers": wrapper_counts()}
+        self.samples.append(s)
+        if self.trace:
+            # the probe's own wrappers (findChildren) and tracemalloc's bookkeeping are left out
+            snap = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__),
+                                                              tracemalloc.Filter(False, __file__)])
+            self._snaps = (self._snaps[:1] + [snap]) if len(self.samples) > 2 else [snap]
+        return s
+
+    def growth(self, warmup=1):
+        """[(what, start, end)] for counts and sizes that grew steadily after `warmup` samples."""
+        runs = self.samples[warmup:]
+        if len(runs) < 2: return []
+        out = []
+        for key in ("qobjects", "wrappers"):
+            for name in set().union(*(s[key] for s in runs)):
+                vals = [s[key][name] for s in runs]
+                if steady(vals, MIN_OBJECTS): out.append((f"{key}: {name}", vals[0], vals[-1]))
+        for key, what, min_growth in (("traced", "python heap (MB)", MIN_HEAP_MB * MB if self.trace else None),
+                                      ("rss", "rss (MB)", MIN_RSS_MB * MB)):
+            vals = [s[key] for s in runs]
+            if min_growth and steady(vals, min_growth): out.append((what, round(vals[0] / MB, 1), round(vals[-1] / MB, 1)))
+        if steady([s["items"] for s in runs], 1):
+            out.append(("tree items", runs[0]["items"], runs[-1]["items"]))
+        return out
+
+    def top_allocations(self, limit=10):
+        """Source lines whose traced memory grew most since the first snapshot after warm-up."""
+        if len(self._snaps) < 2: return []
+        return [st for st in self._snaps[1].compare_to(self._snaps[0], "lineno")[:limit] if st.size_diff > 0]
+
+    def report(self, warmup=1):
+        lines = [f"{'sample':<18}{'rss MB':>9}{'heap MB':>9}{'items':>9}{'QObjects':>10}{'wrappers':>10}"]
+        for s in self.samples:
+            lines.append(f"{s['label'][:17]:<18}{s['rss'] / MB:9.1f}{s['traced'] / MB:9.1f}{s['items']:9d}"
+                         f"{sum(s['qobjects'].values()):10d}{sum(s['wrappers'].values()):10d}")
+        grown = self.growth(warmup)
+        lines.append("")
+        lines += [f"GREW  {what}: {a} -> {b}" for what, a, b in grown] or ["no steady growth"]
+        top = self.top_allocations()
+        if top:
+            lines += ["", "largest heap growth since warm-up:"]
+            lines += [f"  {st.size_diff / 1024:+9.1f} KiB  {st.count_diff:+7d}  {st.traceback[0]}" for st in top]
+        return "\n".join(lines)
+
+
+# ── stress run ───────────────────────────────────────────────────────────────
+
+def _items(tree):
+    from PySide6.QtWidgets import QTreeWidgetItemIterator
+    out, it = [], QTreeWidgetItemIterator(tree)
+    while it.value(): out.append(it.value()); it += 1
+    return out
+
+
+def stress(app, editor, script, selections=5000, imports=20, every=250, probe=None, log=print):
+    """Select items one after another and reopen the script in new tabs; sample after every round."""
+    probe = probe or MemoryProbe(app, editor)
+    rounds = max(1, selections // every)
+
+    def reopen():
+        old = editor.doc
+        editor.new_document(); editor.load_file(script)
+        editor._close_tab(editor.tabs.indexOf(old.page))
+
+    def select(n):
+        items = _items(editor.tree)
+        for i in range(n):
+            editor.tree.setCurrentItem(items[(i * 7919) % len(items)])   # stride so neighbours differ
+            if i % 50 == 49: app.processEvents()
+
+    editor.load_file(script); select(every)
+    probe.sample("warm-up")
+    for r in range(rounds):
+        t = time.perf_counter()
+        if r < imports: reopen()
+        select(every)
+        s = probe.sample(f"round {r + 1}")
+        log(f"round {r + 1}/{rounds}: {s['rss'] / MB:.1f} MB rss, {sum(s['qobjects'].values())} QObjects "
+            f"({time.perf_counter() - t:.1f} s)")
+    for _ in range(max(0, imports - rounds)): reopen()
+    if imports > rounds: probe.sample("imports")
+    return probe
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("script", nargs="?", help="script to load (default: a generated one)")
+    ap.add_argument("--selections", type=int, default=5000)
+    ap.add_argument("--imports", type=int, default=20)
+    ap.add_argument("--every", type=int, default=250, help="selections per sampling round")
+    ap.add_argument("--no-trace", action="store_true", help="skip tracemalloc (faster)")
+    a = ap.parse_args()
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    import main, theme
+    app = QApplication(sys.argv[:1]); main.init_fonts(); theme.apply(app)
+    # exceptions raised in slots are only printed by Qt; count them so the run fails on them too
+    errors, hook = [], sys.excepthook
+    sys.excepthook = lambda *exc: (errors.append(exc), hook(*exc))
+    probe = MemoryProbe(app, trace=not a.no_trace)       # started before the editor so its setup is traced too
+    tmp = None
+    if not a.script:
+        from bench import make_script
+        from scriptio import save_script
+        fd, tmp = tempfile.mkstemp(suffix=".yaml"); os.close(fd)
+        save_script(tmp, make_script(40, 40)); a.script = tmp
+    editor = main.DialogueTreeEditor(); editor.show(); probe.editor = editor
+    try: stress(app, editor, a.script, a.selections, a.imports, a.every, probe)
+    finally:
+        if tmp: os.remove(tmp)
+    print(); print(probe.report())
+    grew = bool(probe.growth())
+    editor.close()
+    if errors: print(f"{len(errors)} uncaught exception(s) in event handlers")
+    sys.exit(1 if grew or errors else 0)
@@ -0,0 +1,180 @@
+# ── Find and replace ─────────────────────────────────────────────────────────
+#
+# Matches are computed on a worker thread from a document snapshot and carry
+# the tree path of each item. The replace command resolves those paths to
+# tree items once and keeps the items, so its undo step still finds them after
+# rows are added, removed or dragged elsewhere.
+
+import re
+import shiboken6
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, \
+    QCheckBox, QComboBox, QTreeWidget, QTreeWidgetItem
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QUndoCommand
+from snapshot import NodeKind, seq_id, fields_of
+from workers import run_in_background
+
+TEXT_KINDS = ("say", "option")
+PREVIEW_ROWS = 500
+PREVIEW_DELAY_MS = 250
+
+
+def compile_query(find, replace, regex=False, case=False):
+    """Return (pattern, repl) for re.subn; raises re.error on a bad pattern."""
+    pat = re.compile(find if regex else re.escape(find), 0 if case else re.IGNORECASE)
+    return pat, (replace if regex else lambda m: replace)
+
+
+def find_matches(root, pat, repl, kinds=TEXT_KINDS, seq=None, speaker=None):
+    """Return [(tree path, id, speaker, old text, new text, count, old fields)] for a snapshot root.
+
+    Matching runs on the structured `text` field, never on the quoted display string.
+    """
+    out = []
+
+    def walk(node, path, sid, spk):
+        for i, ch in enumerate(node.children):
+            p = path + (i,)
+            if ch.key == "char": spk = str(fields_of(ch).get("character") or "").strip()
+            if ch.key in kinds and (speaker is None or spk == speaker):
+                fields = fields_of(ch); text = str(fields.get("text", ""))
+                new, n = pat.subn(repl, text)
+                if n and new != text:
+                    out.append((p, sid, spk, text, new, n, dict(fields)))
+            if ch.children: walk(ch, p, sid, spk)
+
+    for i, sn in enumerate(root.children):
+        if sn.kind != NodeKind.SEQ: continue
+        sid = seq_id(sn, i)
+        if seq is None or sid == seq: walk(sn, (i,), sid, "")
+    return out
+
+
+class ReplaceCommand(QUndoCommand):
+    """One undo step for a batch of replacements; items deleted or whose fields changed since are left alone."""
+    def __init__(self, editor, matches):
+        super().__init__(f"Replace {len(matches)} occurrence(s)")
+        self.editor, self.tree = editor, editor.tree
+        self.edits = [(editor._item_at(m[0]), m[6], {**m[6], "text": m[4]}) for m in matches]
+
+    def _set(self, forward):
+        tree = self.tree; done = 0
+        if not shiboken6.isValid(tree): return 0              # its tab was closed or swapped out
+        tree.setUpdatesEnabled(False)
+        try:
+            for item, old, new in self.edits:
+                if not forward: old, new = new, old
+                if item is None or not shiboken6.isValid(item) or item.treeWidget() is not tree: continue
+                if self.editor.item_fields(item) == old:
+                    self.editor.set_cmd_fields(item, dict(new)); done += 1
+        finally:
+            tree.setUpdatesEnabled(True)
+        self.editor._on_sel()
+        return done
+
+    def redo(self): self.applied = self._set(True)
+    def undo(self): self._set(False)
+
+
+class FindReplaceWindow(QWidget):
+    def __init__(self, editor):
+        super().__init__()
+        self.editor = editor
+        self.setWindowTitle("Find and replace"); self.resize(760, 560)
+        lay = QVBoxLayout(self); lay.setContentsMargins(8, 8, 8, 8); lay.setSpacing(6)
+
+        self.find_inp, self.repl_inp = QLineEdit(), QLineEdit()
+        for lbl, w in (("find:", self.find_inp), ("replace with:", self.repl_inp)):
+            l = QLabel(lbl); l.setObjectName("lbl_field"); lay.addWidget(l); lay.addWidget(w)
+
+        row = QHBoxLayout()
+        self.regex_chk, self.case_chk = QCheckBox("Regex"), QCheckBox("Match case")
+        self.kind_combo, self.seq_combo, self.speaker_combo = QComboBox(), QComboBox(), QComboBox()
+        self.kind_combo.addItems(["say + option", "say", "option"])
+        for w in (self.regex_chk, self.case_chk, self.kind_combo, self.seq_combo, self.speaker_combo):
+            row.addWidget(w)
+        row.addStretch(); lay.addLayout(row)
+
+        self.results = QTreeWidget(); self.results.setHeaderLabels(["id", "speaker", "before", "after"])
+        self.results.setRootIsDecorated(False); self.results.setColumnWidth(0, 140)
+        self.results.itemDoubleClicked.connect(self._goto)
+        lay.addWidget(self.results)
+
+        bottom = QHBoxLayout()
+        self.status = QLabel(); self.status.setObjectName("lbl_field"); bottom.addWidget(self.status)
+        bottom.addStretch()
+        self.apply_btn = QPushButton("Replace all"); self.apply_btn.setObjectName("btn_apply")
+        self.apply_btn.clicked.connect(self._replace_all); bottom.addWidget(self.apply_btn)
+        lay.addLayout(bottom)
+
+        self._matches, self._query, self._pending, self._apply_after = [], None, False, False
+        self._timer = QTimer(self); self._timer.setSingleShot(True); self._timer.setInterval(PREVIEW_DELAY_MS)
+        self._timer.timeout.connect(self.preview)
+        for sig in (self.find_inp.textChanged, self.repl_inp.textChanged, self.regex_chk.toggled,
+                    self.case_chk.toggled, self.kind_combo.currentIndexChanged,
+                    self.seq_combo.currentIndexChanged, self.speaker_combo.currentIndexChanged):
+            sig.connect(lambda *_: self._timer.start())
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._fill_scopes(); self.find_inp.setFocus(); self.find_inp.selectAll()
+
+    def _fill_scopes(self):
+        for combo, label, items in ((self.seq_combo, "all sequences", sorted(self.editor._seq_nodes())),
+                                    (self.speaker_combo, "any speaker", self.editor.panel.get_chars())):
+            cur = combo.currentData()
+            combo.blockSignals(True); combo.clear(); combo.addItem(label, None)
+            for it in items: combo.addItem(it, it)
+            combo.setCurrentIndex(max(0, combo.findData(cur))); combo.blockSignals(False)
+
+    def _params(self):
+        k = self.kind_combo.currentIndex()
+        kinds = TEXT_KINDS if k == 0 else (TEXT_KINDS[k - 1],)
+        return (self.find_inp.text(), self.repl_inp.text(), self.regex_chk.isChecked(), self.case_chk.isChecked(),
+                kinds, self.seq_combo.currentData(), self.speaker_combo.currentData())
+
+    def preview(self):
+        self._timer.stop()
+        if self._pending: self._timer.start(); return
+        params = self._params(); find, repl, regex, case, kinds, seq, speaker = params
+        if not find:
+            self._show(params, []); return
+        try: pat, rep = compile_query(find, repl, regex, case)
+        except re.error as e:
+            self._matches, self._query, self._apply_after = [], None, False; self.results.clear()
+            self.status.setText(f"bad pattern: {e}"); return
+        self._pending = True; self.status.setText("searching…")
+        snap = self.editor.mirror.snapshot()
+        run_in_background(lambda: find_matches(snap, pat, rep, kinds, seq, speaker),
+                          lambda res, err: self._done(params, res, err))
+
+    def _done(self, params, matches, error):
+        self._pending = False
+        if error is not None:
+            self._apply_after = False; self.status.setText(f"search failed: {error}"); return
+        self._show(params, matches)
+        if self._apply_after: self._apply_after = False; self._replace_all()
+
+    def _show(self, params, matches):
+        self._matches, self._query = matches, params
+        self.results.setUpdatesEnabled(False); self.results.clear()
+        self.results.addTopLevelItems([QTreeWidgetItem([sid, spk, old, new])
+                                       for _, sid, spk, old, new, *_ in matches[:PREVIEW_ROWS]])
+        self.results.setUpdatesEnabled(True)
+        total = sum(m[5] for m in matches)
+        more = f" (showing {PREVIEW_ROWS})" if len(matches) > PREVIEW_ROWS else ""
+        self.status.setText(f"{total} match(es) in {len(matches)} line(s){more}")
+
+    def _goto(self, row, _):
+        m = self._matches[self.results.indexOfTopLevelItem(row)]
+        item = self.editor._item_at(m[0])
+        if item is not None: self.editor.reveal(item)
+
+    def _replace_all(self):
+        if self._pending or self._query != self._params() or self._timer.isActive():
+            self._apply_after = True; self.preview(); return
+        if not self._matches: return
+        cmd = ReplaceCommand(self.editor, self._matches)
+        self.editor.undo_stack.push(cmd)
+        self.status.setText(f"replaced in {cmd.applied} line(s)")
+        self._matches, self._query = [], None; self.results.clear()
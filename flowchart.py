@@ -0,0 +1,315 @@
+# ── Flowchart view ───────────────────────────────────────────────────────────
+#
+# Sequences, choices and options drawn as a layered (Sugiyama) graph, with
+# jump edges between sequences. Layouts are computed on a worker thread and cached per
+# snapshot node: an unchanged sequence keeps its Node object, so only edited
+# sequences are laid out again.
+
+import math
+from bisect import bisect_right, insort
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QGraphicsView, \
+    QGraphicsScene, QGraphicsItem, QGraphicsPathItem, QGraphicsRectItem, QStyleOptionGraphicsItem
+from PySide6.QtCore import Qt, QRectF, QTimer, QPointF
+from PySide6.QtGui import QColor, QPen, QBrush, QPainter, QPainterPath, QFont, QFontMetrics
+from snapshot import NodeKind, container_of
+from workers import run_in_background
+import theme
+
+NODE_W, NODE_H = 190, 34
+GAP_X, LAYER_H = 24, 70
+SEQ_GAP = 80
+POLL_MS = 400
+SWEEPS = 8                 # barycentric down/up sweep pairs per sequence
+OVERVIEW_SCALE = 0.12      # below this zoom a sequence is drawn as one block
+KIND_COLORS = {"seq": "#3d8bc4", "choice": "#d47a4a", "option": "#c4906a"}
+
+
+# ── layout (worker thread) ───────────────────────────────────────────────────
+
+def sequence_graph(seq_node, seq_id):
+    """Return (nodes, jumps); nodes are [kind, label, local path, predecessors, lines].
+
+    Flow runs from the sequence node through its choices; every option branch
+    ends where it last branched, and the next choice continues from all of
+    those ends, so branches that rejoin make the graph a DAG rather than a tree.
+    """
+    title = (seq_node.data or {}).get("title", "")
+    nodes = [["seq", f"{seq_id}  {title}".strip(), (), [], 0]]
+    jumps = []
+
+    def walk(container, path, ends):
+        for i, ch in enumerate(container.children):
+            p = path + (i,)
+            if ch.kind == NodeKind.CHOICE:
+                c = len(nodes); nodes.append(["choice", f"choice · {len(ch.children)}", p, ends, 0])
+                branch_ends = []
+                for j, opt in enumerate(ch.children):
+                    o = len(nodes); nodes.append(["option", opt.value.strip('"'), p + (j,), [c], 0])
+                    e = [o]
+                    for k, sc in enumerate(opt.children):
+                        if sc.kind == NodeKind.CONTAINER: e = walk(sc, p + (j, k), e)
+                    branch_ends += e
+                ends = branch_ends or [c]
+            elif ch.kind == NodeKind.CONTAINER:
+                ends = walk(ch, p, ends)
+            elif ch.key == "jump":
+                jumps.append((ends[-1], ch.value.strip()))
+            else:
+                nodes[ends[-1]][4] += 1
+        return ends
+
+    for i, ch in enumerate(seq_node.children):
+        if ch.kind == NodeKind.CONTAINER: walk(ch, (i,), [0])
+    return nodes, jumps
+
+
+def _crossings(upper, lower, down):
+    """Edge crossings between two adjacent layers; down[n] lists n's successors in `lower`."""
+    pos = {n: i for i, n in enumerate(lower)}
+    seen, count = [], 0
+    for n in upper:
+        for t in sorted(pos[t] for t in down[n]):
+            count += len(seen) - bisect_right(seen, t); insort(seen, t)
+    return count
+
+
+def layout_sequence(seq_node, seq_id):
+    """Sugiyama layout: longest-path layers, dummy nodes on long edges, barycentric ordering sweeps."""
+    nodes, jumps = sequence_graph(seq_node, seq_id)
+    n_real = len(nodes)
+    layer = [0] * n_real
+    for i, n in enumerate(nodes):                  # predecessors always come first
+        if n[3]: layer[i] = max(layer[p] for p in n[3]) + 1
+    # split edges that skip layers; chains[(a, b)] lists the nodes the edge passes through
+    up, down, chains = [[] for _ in nodes], [[] for _ in nodes], {}
+    for b, n in enumerate(nodes[:n_real]):
+        for a in n[3]:
+            chain, prev = [a], a
+            for l in range(layer[a] + 1, layer[b]):
+                d = len(layer); layer.append(l); up.append([prev]); down.append([]); down[prev].append(d)
+                chain.append(d); prev = d
+            up[b].append(prev); down[prev].append(b); chains[(a, b)] = chain + [b]
+    layers = [[] for _ in range(max(layer) + 1)]
+    for i, l in enumerate(layer): layers[l].append(i)   # real nodes in walk order, dummies after
+
+    def sweep(order, rng, nbrs):
+        for l in rng:
+            pos = {n: i for i, n in enumerate(order[l - 1 if nbrs is up else l + 1])}
+            cur = {n: i for i, n in enumerate(order[l])}
+            order[l] = sorted(order[l], key=lambda n: (sum(pos[m] for m in nbrs[n]) / len(nbrs[n])
+                                                       if nbrs[n] else cur[n]))
+
+    def total(order):
+        return sum(_crossings(order[l], order[l + 1], down) for l in range(len(order) - 1))
+
+    best = [list(l) for l in layers]; best_x = total(best)
+    order = [list(l) for l in layers]
+    for _ in range(SWEEPS):
+        if not best_x: break
+        sweep(order, range(1, len(order)), up); sweep(order, range(len(order) - 2, -1, -1), down)
+        x = total(order)
+        if x < best_x: best, best_x = [list(l) for l in order], x
+    # x: rows start packed; each pass moves nodes towards the mean of their neighbours, keeping
+    # the order and the gap (the average of a left- and a right-pushed placement keeps both)
+    xs, step = [0.0] * len(layer), NODE_W + GAP_X
+    for l in best:
+        for i, n in enumerate(l): xs[n] = i * step
+    for nbrs, rows in ((up, best[1:]), (down, best[-2::-1])) * 2:
+        for l in rows:
+            want = [sum(xs[m] for m in nbrs[n]) / len(nbrs[n]) if nbrs[n] else xs[n] for n in l]
+            left, right, lo, hi = [], [], -math.inf, math.inf
+            for w in want: lo = max(w, lo + step); left.append(lo)
+            for w in reversed(want): hi = min(w, hi - step); right.append(hi)
+            for n, a, b in zip(l, left, reversed(right)): xs[n] = (a + b) / 2
+    lo = min(xs)
+    xs = [x - lo for x in xs]
+    ys = [layer[i] * LAYER_H for i in range(len(layer))]
+    out = [(kind, label + (f"  · {lines} lines" if lines else ""), path, xs[i], ys[i])
+           for i, (kind, label, path, _, lines) in enumerate(nodes)]
+    edges = [[(xs[c[0]] + NODE_W / 2, ys[c[0]] + NODE_H)] + [(xs[d] + NODE_W / 2, ys[d] + NODE_H / 2) for d in c[1:-1]]
+             + [(xs[c[-1]] + NODE_W / 2, ys[c[-1]])] for c in chains.values()]
+    return {"nodes": out, "edges": edges, "jumps": jumps, "crossings": best_x,
+            "w": max(xs) + NODE_W, "h": max(ys) + NODE_H}
+
+
+def layout_all(jobs):
+    return {node: layout_sequence(node, sid) for node, sid in jobs}
+
+
+def pack(sizes):
+    """Shelf-pack sequence blocks into rows; sizes is [(w, h)], returns [(x, y)]."""
+    area = sum((w + SEQ_GAP) * (h + SEQ_GAP) for w, h in sizes)
+    row_w = max(2000.0, math.sqrt(area) * 1.6)
+    x = y = row_h = 0.0; out = []
+    for w, h in sizes:
+        if x and x + w > row_w: x, y, row_h = 0.0, y + row_h + SEQ_GAP, 0.0
+        out.append((x, y)); x += w + SEQ_GAP; row_h = max(row_h, h)
+    return out
+
+
+# ── scene ────────────────────────────────────────────────────────────────────
+
+class FlowNodeItem(QGraphicsItem):
+    RECT = QRectF(0, 0, NODE_W, NODE_H)
+
+    def __init__(self, kind, label, path, font, parent=None):
+        super().__init__(parent)
+        self.kind, self.path = kind, path
+        self.label = QFontMetrics(font).elidedText(label, Qt.ElideRight, NODE_W - 14)
+        self.font = font
+        c = QColor(KIND_COLORS[kind])
+        self.brush = QBrush(c.darker(260)); self.pen = QPen(c, 1.5); self.fill = QBrush(c.darker(150))
+        self.setToolTip(label)
+
+    def boundingRect(self):
+        return self.RECT
+
+    def paint(self, painter, option, widget=None):
+        lod = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        if lod < 0.3:                              # far away: flat block, no outline or text
+            painter.fillRect(self.RECT, self.fill); return
+        painter.setPen(self.pen); painter.setBrush(self.brush)
+        painter.drawRoundedRect(self.RECT, 6, 6)
+        if lod >= 0.55:
+            painter.setPen(QColor(theme.TEXT_HI)); painter.setFont(self.font)
+            painter.drawText(self.RECT.adjusted(7, 0, -7, 0), Qt.AlignVCenter | Qt.AlignLeft, self.label)
+
+
+class SeqGroup(QGraphicsRectItem):
+    def __init__(self, seq_id, layout, font):
+        super().__init__(0, 0, layout["w"], layout["h"])
+        self.setPen(Qt.NoPen); self.seq_id = seq_id; self.layout = layout
+        self.items = [FlowNodeItem(k, lbl, p, font, self) for k, lbl, p, _, _ in layout["nodes"]]
+        for it, (_, _, _, x, y) in zip(self.items, layout["nodes"]): it.setPos(x, y)
+        path = QPainterPath()
+        for pts in layout["edges"]:
+            path.moveTo(*pts[0])
+            for pt in pts[1:]: path.lineTo(*pt)
+        self.edges = QGraphicsPathItem(path, self)
+        self.edges.setPen(QPen(QColor(theme.BORDER), 1.2)); self.edges.setZValue(-1)
+        self.overview = False
+
+    def set_overview(self, on):
+        if on == self.overview: return
+        self.overview = on
+        for it in self.items: it.setVisible(not on)
+        self.edges.setVisible(not on)
+        self.setBrush(QBrush(QColor(KIND_COLORS["seq"]).darker(220)) if on else Qt.NoBrush)
+
+    def paint(self, painter, option, widget=None):
+        super().paint(painter, option, widget)
+        if self.overview:
+            f = QFont(self.items[0].font); f.setPointSize(90)
+            painter.setFont(f); painter.setPen(QColor(theme.TEXT_HI))
+            painter.drawText(self.rect(), Qt.AlignCenter, self.seq_id)
+
+
+class FlowchartView(QGraphicsView):
+    def __init__(self, on_activate, on_overview):
+        super().__init__()
+        self.on_activate, self.on_overview = on_activate, on_overview
+        self.overview = False
+        self.setScene(QGraphicsScene(self))
+        self.scene().setItemIndexMethod(QGraphicsScene.BspTreeIndex)
+        self.setBackgroundBrush(QColor(theme.BG_DEEP))
+        self.setDragMode(QGraphicsView.ScrollHandDrag)
+        self.setViewportUpdateMode(QGraphicsView.SmartViewportUpdate)
+        self.setOptimizationFlags(QGraphicsView.DontSavePainterState)
+        self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
+        self.setRenderHint(QPainter.Antialiasing)
+
+    def wheelEvent(self, event):
+        f = 1.15 if event.angleDelta().y() > 0 else 1 / 1.15
+        scale = self.transform().m11() * f
+        if 0.02 < scale < 4: self.scale(f, f)
+        if (scale < OVERVIEW_SCALE) != self.overview:
+            self.overview = not self.overview; self.on_overview(self.overview)
+
+    def mouseDoubleClickEvent(self, event):
+        it = self.itemAt(event.position().toPoint())
+        if isinstance(it, FlowNodeItem): self.on_activate(it.parentItem().seq_id, it.path)
+        else: super().mouseDoubleClickEvent(event)
+
+
+class FlowchartWindow(QWidget):
+    def __init__(self, editor):
+        super().__init__()
+        self.editor = editor
+        self.setWindowTitle("Flowchart"); self.resize(1100, 760)
+        lay = QVBoxLayout(self); lay.setContentsMargins(4, 4, 4, 4)
+        hdr = QHBoxLayout()
+        self.status = QLabel(); self.status.setObjectName("lbl_field"); hdr.addWidget(self.status); hdr.addStretch()
+        lay.addLayout(hdr)
+        self.view = FlowchartView(editor.goto_seq_path, self._set_overview); lay.addWidget(self.view)
+        self.font = QFont(); self.font.setPointSize(10)
+        self._cache = {}       # seq Node -> layout
+        self._groups = {}      # seq Node -> SeqGroup
+        self._jumps = None
+        self._snap = None; self._busy = False
+        self._timer = QTimer(self); self._timer.setInterval(POLL_MS); self._timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event); self._timer.start(); self.refresh()
+
+    def hideEvent(self, event):
+        super().hideEvent(event); self._timer.stop()
+
+    def refresh(self):
+        if self._busy: return
+        snap = self.editor.mirror.snapshot()
+        if snap is self._snap: return
+        seqs = [(ch, (ch.data or {}).get("id", f"seq_{i}")) for i, ch in enumerate(snap.children)
+                if ch.kind == NodeKind.SEQ]
+        jobs = [(n, sid) for n, sid in seqs if n not in self._cache]
+        self._busy = True
+        run_in_background(lambda: layout_all(jobs), lambda res, err: self._apply(snap, seqs, res, err))
+
+    def _apply(self, snap, seqs, layouts, error):
+        self._busy = False
+        if error is not None: self.status.setText(f"layout failed: {error}"); return
+        self._cache.update(layouts)
+        live = {n for n, _ in seqs}
+        for n in [n for n in self._cache if n not in live]: del self._cache[n]
+        scene = self.view.scene()
+        for n in [n for n in self._groups if n not in live]: scene.removeItem(self._groups.pop(n))
+        positions = pack([(self._cache[n]["w"], self._cache[n]["h"]) for n, _ in seqs])
+        heads = {}
+        for (n, sid), (x, y) in zip(seqs, positions):
+            g = self._groups.get(n)
+            if g is None:
+                g = self._groups[n] = SeqGroup(sid, self._cache[n], self.font); scene.addItem(g)
+                g.set_overview(self.view.overview)
+            g.setPos(x, y); heads[sid] = g.items[0].scenePos()
+        self._draw_jumps(seqs, heads)
+        scene.setSceneRect(scene.itemsBoundingRect().adjusted(-200, -200, 200, 200))
+        self._snap = snap
+        self.status.setText(f"{len(seqs)} sequences · {sum(len(g.items) for g in self._groups.values())} nodes"
+                            f" · {len(layouts)} laid out")
+        QTimer.singleShot(0, self.refresh)   # catch edits made while the layout was running
+
+    def _set_overview(self, on):
+        self.view.setUpdatesEnabled(False)
+        for g in self._groups.values(): g.set_overview(on)
+        if self._jumps:
+            self._jumps[0].setVisible(not on); self._jumps[1].setVisible(on)
+        self.view.setRenderHint(QPainter.Antialiasing, not on)
+        self.view.setUpdatesEnabled(True)
+
+    def _draw_jumps(self, seqs, heads):
+        # detailed: one curve per jump; overview: one straight line per pair of sequences
+        detail, summary, pairs = QPainterPath(), QPainterPath(), set()
+        for n, sid in seqs:
+            g = self._groups[n]
+            for src, target in g.layout["jumps"]:
+                if target not in heads: continue
+                a = g.items[src].scenePos() + QPointF(NODE_W, NODE_H / 2)
+                b = heads[target] + QPointF(NODE_W / 2, 0)
+                detail.moveTo(a); detail.cubicTo(a + QPointF(120, 0), b - QPointF(0, 120), b)
+                if (sid, target) not in pairs:
+                    pairs.add((sid, target)); summary.moveTo(heads[sid]); summary.lineTo(heads[target])
+        if self._jumps is None:
+            self._jumps = (QGraphicsPathItem(), QGraphicsPathItem())
+            for it, c in zip(self._jumps, ("#a07090", "#5a4060")):
+                it.setPen(QPen(QColor(c), 1.2)); it.setZValue(-2); self.view.scene().addItem(it)
+            self._jumps[1].setVisible(self.view.overview); self._jumps[0].setVisible(not self.view.overview)
+        self._jumps[0].setPath(detail); self._jumps[1].setPath(summary)
@@ -0,0 +1,152 @@
+# ── Serializer fuzzing ───────────────────────────────────────────────────────
+#
+#   python fuzz.py [--seconds 10] [--seed N] [--min-mbps 10]
+#
+# Random scripts full of YAML edge cases (keywords and numbers as strings,
+# indicators, control characters, line breaks, empty containers, odd floats)
+# go through dump_yaml, write_sequences and write_json_sequences and are
+# parsed back; the first failing script is shrunk to a minimal value and
+# printed. Afterwards dump_yaml is timed on an ordinary generated script and
+# the run fails when it is slower than the throughput budget, so a faster
+# serializer can be tried without silently corrupting scripts.
+
+import io, sys, json, math, time, random, argparse
+import yaml
+from serializer import DoubleQuotedStr, dump_yaml, write_sequences, write_json_sequences, first_difference
+from scriptio import Loader, iter_sequences
+
+EDGE_STRINGS = [
+    "", " ", "  ", "yes", "No", "on", "OFF", "y", "true", "False", "null", "Null", "~", "=", "<<", "-", "--", "- x",
+    "-1", "+1", "0", "007", "0x1F", "0o17", "0b101", "1_000", "1e3", "1.5e+10", "1.", ".5", ".inf", "-.Inf", ".NaN",
+    "1:30", "190:20:30", "2024-01-01", "2024-01-01 10:00:00", "#x", "x #y", "a: b", "a:b", "x:", "? x", "[x]",
+    "{x}", "*a", "&a", "!x", "!!str", "|", ">", "%x", "@x", "`x", "'x'", '"x"', "x\\y", "\\", "\\n", "line\nbreak",
+    "tab\there", "\t", " lead", "trail ", "\r\n", "\r", "\x00", "\x07", "\x1b[0m", "\x7f", "\x85", "\u2028", "\u2029",
+    "\ufeff", "\xa0", "\u200b", "é", "日本語", "🙂", "\ufffe", "---", "...", "x\n", "\n", "{luna}",
+    "(he/she/they)", "a, b", "points = 0",
+]
+ALPHABET = ("abcxyzABC019 _-.:,#'\"\\{}[]()!?&*|>%@`=~+/\t\n\r\x00\x1f\x7f\x85\xa0\u2028あ\ufeff\U0001f642")
+FLOATS = [0.0, -0.0, 0.1, -1.5, 1e16, 1e-7, 123456789.125, math.inf, -math.inf, math.nan]
+
+
+def random_str(rnd):
+    r = rnd.random()
+    if r < 0.4: return rnd.choice(EDGE_STRINGS)
+    if r < 0.7: return "".join(rnd.choice(ALPHABET) for _ in range(rnd.randint(1, 12)))
+    return rnd.choice(EDGE_STRINGS) + rnd.choice(["", " ", "x", "\n"]) + rnd.choice(EDGE_STRINGS)
+
+
+def random_scalar(rnd):
+    r = rnd.random()
+    if r < 0.35: return random_str(rnd)
+    if r < 0.65: return DoubleQuotedStr(random_str(rnd))
+    if r < 0.75: return rnd.choice([0, 1, -1, 7, 2 ** 40, -(2 ** 70)])
+    if r < 0.85: return rnd.choice(FLOATS)
+    if r < 0.93: return rnd.random() < 0.5
+    return None
+
+
+def random_value(rnd, depth=0):
+    r = rnd.random()
+    if depth > 3 or r < 0.6: return random_scalar(rnd)
+    if r < 0.67: return rnd.choice([{}, []])
+    if r < 0.8: return {random_str(rnd): random_value(rnd, depth + 1) for _ in range(rnd.randint(1, 3))}
+    if r < 0.9: return [random_value(rnd, depth + 1) for _ in range(rnd.randint(1, 3))]
+    return [random_entry(rnd, depth + 1) for _ in range(rnd.randint(1, 3))]
+
+
+def random_entry(rnd, depth=0):
+    """A command dict; the first value is sometimes a list or mapping, as in choice entries."""
+    if depth < 3 and rnd.random() < 0.1:
+        return {"choice": [{"option": DoubleQuotedStr(random_str(rnd)), "sequence": random_body(rnd, depth + 1)}
+                           for _ in range(rnd.randint(0, 3))]}
+    if rnd.random() < 0.05: return {}
+    return {random_str(rnd): random_value(rnd, depth + 1) for _ in range(rnd.randint(1, 3))}
+
+
+def random_body(rnd, depth=0):
+    return [random_entry(rnd, depth) for _ in range(rnd.randint(0, 6))]
+
+
+def random_script(rnd):
+    seqs = {}
+    for _ in range(rnd.randint(0, 4)):
+        seqs[random_str(rnd)] = {
+            "title": random_scalar(rnd), "description": random_scalar(rnd), "background": random_scalar(rnd),
+            "characters": {random_str(rnd): random_str(rnd) for _ in range(rnd.randint(0, 3))},
+            "sequence": random_body(rnd)}
+    return {"sequences": seqs}
+
+
+# ── properties ───────────────────────────────────────────────────────────────
+
+def check(data):
+    """None if every writer round-trips data, else what went wrong."""
+    text = dump_yaml(data)
+    try: back = yaml.load(text, Loader=Loader)
+    except yaml.YAMLError as e: return f"dump_yaml output does not parse: {e}"
+    d = first_difference(data, back)
+    if d: return f"dump_yaml: {d}"
+    buf = io.StringIO(); write_sequences(buf, data["sequences"].items())
+    if buf.getvalue() != text: return "write_sequences output differs from dump_yaml"
+    d = first_difference(data["sequences"], dict(iter_sequences(io.StringIO(text))))
+    if d: return f"iter_sequences: {d}"
+    buf = io.StringIO(); write_json_sequences(buf, data["sequences"].items())
+    d = first_difference(data, json.loads(buf.getvalue()))
+    return f"write_json_sequences: {d}" if d else None
+
+
+def _smaller(v):
+    if isinstance(v, dict):
+        for k in v: yield {kk: vv for kk, vv in v.items() if kk != k}
+        for k, x in v.items():
+            for c in _smaller(x): yield {**v, k: c}
+    elif isinstance(v, list):
+        for i in range(len(v)): yield v[:i] + v[i + 1:]
+        for i, x in enumerate(v):
+            for c in _smaller(x): yield v[:i] + [c] + v[i + 1:]
+    elif isinstance(v, str) and len(v) > 1:
+        for i in range(len(v)): yield type(v)(v[:i] + v[i + 1:])
+
+
+def shrink(data):
+    """Drop keys and items and shorten strings for as long as the script still fails."""
+    def fails(x):
+        return isinstance(x, dict) and isinstance(x.get("sequences"), dict) and check(x) is not None
+    changed = True
+    while changed:
+        changed = False
+        for cand in _smaller(data):
+            if fails(cand): data, changed = cand, True; break
+    return data
+
+
+def throughput(repeat=5):
+    """dump_yaml speed on an ordinary script, in MB/s."""
+    from bench import make_script
+    data = {"sequences": make_script(200, 60)}
+    best, size = None, 0
+    for _ in range(repeat):
+        t = time.perf_counter(); size = len(dump_yaml(data).encode()); d = time.perf_counter() - t
+        best = d if best is None else min(best, d)
+    return size / best / 1e6
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=10)
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--min-mbps", type=float, default=10, help="dump_yaml throughput budget")
+    a = ap.parse_args()
+    seed = a.seed if a.seed is not None else random.randrange(1 << 30)
+    rnd, n, end = random.Random(seed), 0, time.time() + a.seconds
+    while time.time() < end:
+        data = random_script(rnd); n += 1
+        problem = check(data)
+        if problem:
+            small = shrink(data)
+            print(f"case {n} (seed {seed}) failed: {problem}\nminimal: {small!r}\n"
+                  f"yaml:\n{dump_yaml(small)}\n{check(small)}")
+            sys.exit(1)
+    mbps = throughput()
+    print(f"{n} random scripts round-tripped (seed {seed}); dump_yaml {mbps:.1f} MB/s (budget {a.min_mbps:g})")
+    sys.exit(0 if mbps >= a.min_mbps else 1)
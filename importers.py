@@ -0,0 +1,292 @@
+# ── Legacy importers ─────────────────────────────────────────────────────────
+#
+#   python importers.py old/ chapter1.rpy notes.txt -o converted/ [-j N]
+#
+# Ren'Py scripts (.rpy) and screenplay text (.txt) are read line by line and
+# turned into (seq_id, sequence dict) pairs, one sequence at a time, so large
+# files are never held in memory whole. The pairs have the same schema as a
+# YAML script and load into the tree like any imported file.
+#
+# Ren'Py: `label x:` starts a sequence; say lines, `scene`, `show`, `play
+# music/sound`, `pause`, `$ var = value`, `jump`, `call` (imported as a
+# jump) and `menu:` blocks are converted. `if`/`while` blocks are flattened
+# and other statements are skipped; both are reported as warnings.
+#
+# Screenplay text:
+#   == intro ==                  sequence "intro"
+#   INT. COFFEE SHOP - DAY       new sequence with background "coffee_shop"
+#   LUNA: Hello.                 char + say;  LUNA (happy): Hi!  adds an emotion
+#   (smiles)                     emotion for the current speaker
+#   [music: theme] [wait: 1]     any command as [key: value]
+#   -> ending                    jump
+#   * Option text                choice option; the indented lines below are its sequence
+#   anything else                narration
+
+import os, re, sys, argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from serializer import DoubleQuotedStr
+from scriptio import write_script
+
+NARRATOR = "narrator"
+IMPORT_SUFFIXES = (".rpy", ".txt")
+
+
+def slug(text):
+    return re.sub(r"[^0-9a-z]+", "_", text.lower()).strip("_") or "seq"
+
+
+def new_seq(title="", background=""):
+    return {"title": title, "description": "", "background": background, "characters": {}, "sequence": []}
+
+
+class _Frame:
+    __slots__ = ("indent", "entries", "kind", "speaker", "pos")
+
+    def __init__(self, indent, entries, kind="seq", speaker=None, pos=0):
+        self.indent, self.entries, self.kind, self.speaker, self.pos = indent, entries, kind, speaker, pos
+
+
+class _Builder:
+    """Indentation stack shared by both formats; char entries are only emitted when the speaker changes."""
+    def __init__(self):
+        self.sid = self.sd = None; self.frames = []; self.ids = set()
+
+    def start(self, sid, sd, indent=-1):
+        done = self.finish()
+        base, n = sid, 2
+        while sid in self.ids: sid, n = f"{base}_{n}", n + 1
+        self.ids.add(sid)
+        self.sid, self.sd, self.frames = sid, sd, [_Frame(indent, sd["sequence"])]
+        return done
+
+    def finish(self):
+        done = (self.sid, self.sd) if self.sid is not None else None
+        self.sid = self.sd = None; self.frames = []
+        return done
+
+    def at(self, indent):
+        while len(self.frames) > 1 and indent <= self.frames[-1].indent:
+            f = self.frames.pop()
+            # a flattened block shares its parent's entries; after a choice the speaker is unknown
+            if f.kind != "seq": self.frames[-1].speaker = f.speaker if f.kind == "flat" else None
+        return self.frames[-1]
+
+    def speak(self, frame, who, text=None, emotion=None, position=None):
+        if who != frame.speaker:
+            frame.entries.append({"char": who}); frame.speaker = who
+        if who != NARRATOR:
+            chars = self.sd["characters"]
+            if position or who not in chars: chars[who] = position or chars.get(who, "center")
+        if emotion: frame.entries.append({"emotion": emotion})
+        if text is not None: frame.entries.append({"say": DoubleQuotedStr(text)})
+
+    def menu(self, frame, indent):
+        entry = {"choice": []}; frame.entries.append(entry)
+        self.frames.append(_Frame(indent, entry["choice"], "menu", frame.speaker, len(frame.entries) - 1))
+        return entry
+
+    def option(self, menu, indent, text):
+        opt = {"option": DoubleQuotedStr(text), "sequence": []}; menu.entries.append(opt)
+        self.frames.append(_Frame(indent, opt["sequence"], "seq", menu.speaker))
+
+
+# ── Ren'Py ───────────────────────────────────────────────────────────────────
+
+_STR = r'"((?:[^"\\]|\\.)*)"'
+RPY_LABEL_RE  = re.compile(r"^label\s+([\w.]+)\s*(?:\(.*\))?\s*:$")
+RPY_DEFINE_RE = re.compile(r"^define\s+(\w+)\s*=\s*Character\(\s*(?:_\()?\s*[\"']([^\"']*)[\"']")
+RPY_SAY_RE    = re.compile(r"^(?:(?P<who>[A-Za-z_]\w*)(?P<attrs>(?:\s+[A-Za-z_]\w*)*)\s+|" + _STR.replace("(", "(?P<name>", 1) + r"\s+)?"
+                           + _STR.replace("(", "(?P<what>", 1) + r"(?:\s+with\s+\w+)?$")
+RPY_OPTION_RE = re.compile(r"^" + _STR + r"(?:\s+if\s+.*)?\s*:$")
+RPY_TAG_RE    = re.compile(r"\{/?[a-z]+(?:=[^{}]*)?\}")
+RPY_SILENT    = ("hide", "stop", "window", "with", "return", "nvl", "voice sustain", "init", "default")
+
+
+def _rpy_text(s):
+    # escapes and text tags dropped; [interpolation] becomes a {mention}
+    s = re.sub(r"\\(.)", lambda m: "\n" if m.group(1) == "n" else m.group(1), s)
+    return re.sub(r"\[(\w+)\]", r"{\1}", RPY_TAG_RE.sub("", s))
+
+
+def _asset(arg):
+    arg = arg.split()[0].strip("\"'") if arg.split() else ""
+    return os.path.splitext(os.path.basename(arg))[0]
+
+
+def iter_renpy(lines, warnings=None):
+    """Yield (label, sequence dict) from Ren'Py script lines."""
+    warn = warnings.append if warnings is not None else (lambda msg: None)
+    b, names = _Builder(), {}
+    for n, raw in enumerate(lines, 1):
+        line = raw.rstrip("\r\n"); text = line.strip()
+        if not text or text.startswith("#"): continue
+        if '"' not in text and "#" in text: text = text.split("#", 1)[0].rstrip()
+        indent = len(line) - len(line.lstrip())
+        m = RPY_DEFINE_RE.match(text)
+        if m: names[m.group(1)] = slug(m.group(2)) if m.group(2) else m.group(1); continue
+        m = RPY_LABEL_RE.match(text)
+        if m:
+            done = b.start(m.group(1).lstrip("."), new_seq(), indent)
+            if done: yield done
+            continue
+        if b.sid is None: continue
+        if indent <= b.frames[0].indent:            # top-level statement after the label body
+            done = b.finish()
+            if done: yield done
+            continue
+        frame = b.at(indent)
+        if frame.kind == "menu":
+            m = RPY_OPTION_RE.match(text)
+            if m: b.option(frame, indent, _rpy_text(m.group(1))); continue
+        target = b.frames[-2] if frame.kind == "menu" else frame
+        word, _, rest = text.partition(" ")
+        if text.startswith("menu") and text.endswith(":"): b.menu(target, indent)
+        elif text.startswith("$"):
+            expr = text[1:].strip(); pm = re.match(r"renpy\.pause\(\s*([\d.]+)", expr)
+            if pm: target.entries.append({"wait": float(pm.group(1))})
+            elif re.match(r"^[A-Za-z_][\w.]*\s*[-+*/]?=(?!=)", expr): target.entries.append({"set": expr})
+            else: warn(f"line {n}: skipped python: {expr}")
+        elif word == "scene":
+            img = re.split(r"\s+(?:with|at|onlayer|behind)\s+", rest)[0].split()
+            if img and img[0] == "bg": img = img[1:]
+            target.entries.append({"background": "_".join(img) or "black"})
+        elif word == "show":
+            parts = re.split(r"\s+(at|with|onlayer|behind|zorder|as)\s+", rest)
+            img = parts[0].split(); pos = parts[parts.index("at") + 1].split()[0] if "at" in parts[1::2] else None
+            if img and img[0] != "bg":
+                b.speak(target, names.get(img[0], img[0]), None, img[1] if len(img) > 1 else None,
+                        pos if pos in ("left", "center", "right") else None)
+        elif word in ("play", "queue"):
+            channel, _, arg = rest.partition(" ")
+            target.entries.append({"music" if channel == "music" else "sound": _asset(arg)})
+        elif word == "pause":
+            target.entries.append({"wait": float(rest) if re.fullmatch(r"[\d.]+", rest.strip()) else 1})
+        elif word in ("jump", "call"):
+            label = rest.split()[0].lstrip(".") if rest.split() else ""
+            if word == "call": warn(f"line {n}: call {label} imported as jump")
+            target.entries.append({"jump": label})
+        elif RPY_SAY_RE.match(text):
+            m = RPY_SAY_RE.match(text); who = m.group("who"); attrs = (m.group("attrs") or "").split()
+            speaker = names.get(who, who) if who else slug(m.group("name")) if m.group("name") else NARRATOR
+            if frame.kind == "menu":               # menu caption goes before the choice
+                cap = _Frame(indent, [], speaker=target.speaker)
+                b.speak(cap, speaker, _rpy_text(m.group("what")), attrs[0] if attrs else None)
+                target.entries[frame.pos:frame.pos] = cap.entries; frame.pos += len(cap.entries)
+                target.speaker = frame.speaker = cap.speaker
+            else:
+                b.speak(target, speaker, _rpy_text(m.group("what")), attrs[0] if attrs else None)
+        elif text.endswith(":"):
+            warn(f"line {n}: flattened block: {text}")
+            b.frames.append(_Frame(indent, target.entries, "flat", target.speaker))
+        elif not text.startswith(RPY_SILENT):
+            warn(f"line {n}: skipped: {text}")
+    done = b.finish()
+    if done: yield done
+
+
+# ── screenplay ───────────────────────────────────────────────────────────────
+
+SP_SEQ_RE     = re.compile(r"^==+\s*(.+?)\s*==+$")
+SP_HEADING_RE = re.compile(r"^(?:INT|EXT|INT\./EXT|I/E)[.\s]\s*(.+?)(?:\s+-\s+.*)?$")
+SP_LINE_RE    = re.compile(r"^([A-Z][A-Z0-9 _'.-]*?)\s*(?:\(([^)]*)\))?\s*:\s*(.*)$")
+SP_CMD_RE     = re.compile(r"^\[(\w+)\s*:\s*(.*?)\]$")
+
+
+def iter_screenplay(lines, warnings=None):
+    """Yield (seq_id, sequence dict) from screenplay-style text."""
+    b = _Builder()
+    for n, raw in enumerate(lines, 1):
+        line = raw.rstrip("\r\n"); text = line.strip()
+        if not text or text.startswith("#"): continue
+        indent = len(line) - len(line.lstrip())
+        m = SP_SEQ_RE.match(text) if indent == 0 else None
+        if m:
+            done = b.start(slug(m.group(1)), new_seq(m.group(1)))
+            if done: yield done
+            continue
+        m = SP_HEADING_RE.match(text) if indent == 0 else None
+        if m:
+            place = slug(m.group(1))
+            done = b.start(place, new_seq(text, place))
+            if done: yield done
+            continue
+        if b.sid is None: b.start("start", new_seq())
+        frame = b.at(indent)
+        if text.startswith("* "):
+            # consecutive options at one indent share a choice; the menu frame sits one column left of them
+            if not (frame.kind == "menu" and frame.indent == indent - 1):
+                if frame.kind == "menu": frame = b.at(indent - 1)
+                b.menu(frame, indent - 1)
+            b.option(b.frames[-1], indent, text[2:].strip())
+            continue
+        if frame.kind == "menu": frame = b.at(frame.indent)
+        m = SP_CMD_RE.match(text)
+        if m: frame.entries.append({m.group(1).lower(): m.group(2)}); continue
+        if text.startswith("->"): frame.entries.append({"jump": text[2:].strip()}); continue
+        m = SP_LINE_RE.match(text)
+        if m and m.group(3): b.speak(frame, slug(m.group(1)), m.group(3), m.group(2)); continue
+        if text.startswith("(") and text.endswith(")"):
+            frame.entries.append({"emotion": text[1:-1].strip()}); continue
+        b.speak(frame, NARRATOR, text)
+    done = b.finish()
+    if done: yield done
+
+
+# ── files ────────────────────────────────────────────────────────────────────
+
+def reader_for(path):
+    return iter_renpy if path.lower().endswith(".rpy") else iter_screenplay
+
+
+def read_legacy(path, warnings=None):
+    """Stream (seq_id, sequence dict) pairs from a .rpy or screenplay file."""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        yield from reader_for(path)(f, warnings)
+
+
+def convert(path, out_path):
+    warnings = []
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    n = 0
+
+    def counted():
+        nonlocal n
+        for pair in read_legacy(path, warnings):
+            n += 1; yield pair
+
+    write_script(out_path, counted())
+    return out_path, n, warnings
+
+
+def legacy_files(paths):
+    """(file, path relative to its root) for every importable file given or found under a directory."""
+    for p in paths:
+        if os.path.isdir(p):
+            for d, _, files in os.walk(p):
+                for f in sorted(files):
+                    if f.lower().endswith(IMPORT_SUFFIXES):
+                        yield os.path.join(d, f), os.path.relpath(os.path.join(d, f), p)
+        else:
+            yield p, os.path.basename(p)
+
+
+def convert_all(paths, out_dir, ext=".yaml", workers=None):
+    """Convert files (and directories of them) in parallel; returns [(out path, n_sequences, warnings)]."""
+    jobs = [(src, os.path.join(out_dir, os.path.splitext(rel)[0] + ext)) for src, rel in legacy_files(paths)]
+    if len(jobs) < 2: return [convert(*j) for j in jobs]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as ex:
+        return [f.result() for f in [ex.submit(convert, *j) for j in jobs]]
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("inputs", nargs="+", help=".rpy / .txt files or directories")
+    ap.add_argument("-o", "--out", default=".")
+    ap.add_argument("--json", action="store_true", help="write JSON instead of YAML")
+    ap.add_argument("-j", "--jobs", type=int)
+    a = ap.parse_args()
+    for out, n, warnings in convert_all(a.inputs, a.out, ".json" if a.json else ".yaml", a.jobs):
+        print(f"{out}: {n} sequence(s)")
+        for msg in warnings[:20]: print("  " + msg, file=sys.stderr)
+        if len(warnings) > 20: print(f"  … {len(warnings) - 20} more warning(s)", file=sys.stderr)
@@ -0,0 +1,174 @@
+# ── Localization string tables ───────────────────────────────────────────────
+#
+#   python l10n.py extract script.yaml strings.po|strings.csv
+#   python l10n.py inject  script.yaml fr.po de.csv -o out/ [-j N]
+#
+# String IDs are "<seq_id>#<path>" where path alternates entry index and
+# option index, e.g. "intro#4" (say), "intro#5.1" (option), "intro#5.1.0".
+
+import os, re, csv, sys, argparse
+from concurrent.futures import ProcessPoolExecutor
+from serializer import DoubleQuotedStr
+from scriptio import read_sequences, write_script, is_json, walk_entries, choice_options
+
+MENTION_RE   = re.compile(r"\{([^{}]*)\}")
+GENDER_RE    = re.compile(r"\(([^()]*/[^()]*)\)")
+CSV_FIELDS   = ["id", "kind", "speaker", "source", "target"]
+
+
+def placeholders(text):
+    return sorted(set(MENTION_RE.findall(text))), sorted(g.count("/") + 1 for g in GENDER_RE.findall(text))
+
+
+# ── extraction ───────────────────────────────────────────────────────────────
+
+def _scope(path):
+    """Prefix shared by the entries of one (option) sequence: "5.1.0" -> "5.1."."""
+    return path[:path.rfind(".") + 1]
+
+
+def walk_texts(pairs):
+    """Yield (id, kind, speaker, text) for every say/option line; a choice's options come before their branches."""
+    for seq_id, sd in pairs:
+        # speaker per nesting level: a branch starts with the speaker of its choice, and a
+        # `char` inside a branch does not carry over to the entries after the choice
+        speakers = {"": ""}
+        for path, entry in walk_entries((sd or {}).get("sequence")):
+            scope = _scope(path)
+            if scope not in speakers:            # "5.1." branches off entry "5"
+                speakers[scope] = speakers[_scope(scope[:-1].rpartition(".")[0])]
+            if "char" in entry: speakers[scope] = str(entry["char"] or "")
+            speaker = speakers[scope]
+            if entry.get("say") is not None:
+                yield f"{seq_id}#{path}", "say", speaker, str(entry["say"])
+            for j, opt in choice_options(entry):
+                if opt.get("option") is not None:
+                    yield f"{seq_id}#{path}.{j}", "option", speaker, str(opt["option"])
+
+
+def iter_strings(pairs):
+    """Yield unique (id, kind, speaker, text) rows; repeated texts keep their first ID."""
+    seen = set()
+    for row in walk_texts(pairs):
+        if not row[3] or row[3] in seen: continue
+        seen.add(row[3]); yield row
+
+
+def _po_quote(s):
+    return '"' + s.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\t", "\\t") + '"'
+
+def _po_unquote(s):
+    s = s.strip()[1:-1]
+    return re.sub(r'\\(.)', lambda m: {"n": "\n", "t": "\t"}.get(m.group(1), m.group(1)), s)
+
+
+def write_table(rows, path):
+    n = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if path.endswith(".po"):
+            f.write('msgid ""\nmsgstr ""\n"Content-Type: text/plain; charset=UTF-8\\n"\n')
+            for sid, kind, speaker, text in rows:
+                names, groups = placeholders(text)
+                f.write(f"\n#. {kind}" + (f" ({speaker})" if speaker else ""))
+                if names or groups:
+                    f.write(f"; keep: {' '.join('{%s}' % x for x in names)}"
+                            + (f" {len(groups)} gendered group(s)" if groups else ""))
+                f.write(f"\nmsgctxt {_po_quote(sid)}\nmsgid {_po_quote(text)}\nmsgstr \"\"\n")
+                n += 1
+        else:
+            w = csv.writer(f); w.writerow(CSV_FIELDS)
+            for sid, kind, speaker, text in rows:
+                w.writerow([sid, kind, speaker, text, ""]); n += 1
+    return n
+
+
+def extract(pairs, path):
+    return write_table(iter_strings(pairs), path)
+
+
+# ── re-injection ─────────────────────────────────────────────────────────────
+
+def read_table(path):
+    """Return ({id: target}, {source: target}) for rows that have a translation."""
+    by_id, by_src = {}, {}
+
+    def add(sid, src, tgt):
+        if not (sid and src and tgt): return
+        by_id[sid] = tgt; by_src.setdefault(src, tgt)
+
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.endswith(".po"):
+            cur, field = {}, None
+            for line in f:
+                line = line.rstrip("\n")
+                if line.startswith(("msgctxt", "msgid", "msgstr")):
+                    field, _, rest = line.partition(" ")
+                    if field == "msgctxt" and cur:
+                        add(cur.get("msgctxt", ""), cur.get("msgid", ""), cur.get("msgstr", "")); cur = {}
+                    cur[field] = _po_unquote(rest)
+                elif line.startswith('"') and field:
+                    cur[field] += _po_unquote(line)
+            if cur: add(cur.get("msgctxt", ""), cur.get("msgid", ""), cur.get("msgstr", ""))
+        else:
+            for row in csv.DictReader(f):
+                add(row.get("id", ""), row.get("source", ""), row.get("target", ""))
+    return by_id, by_src
+
+
+def _lookup(table, sid, src, issues):
+    by_id, by_src = table
+    tgt = by_id.get(sid) or by_src.get(src)
+    if tgt and placeholders(tgt) != placeholders(src):
+        issues.append(f"{sid}: placeholders differ from source, kept source"); tgt = None
+    return DoubleQuotedStr(tgt or src)
+
+
+def _translate(seq, seq_id, table, issues):
+    for path, entry in walk_entries(seq):
+        if entry.get("say") is not None:
+            entry["say"] = _lookup(table, f"{seq_id}#{path}", str(entry["say"]), issues)
+        for j, opt in choice_options(entry):
+            if opt.get("option") is not None:
+                opt["option"] = _lookup(table, f"{seq_id}#{path}.{j}", str(opt["option"]), issues)
+
+
+def translate_pairs(pairs, table, issues):
+    for seq_id, sd in pairs:
+        sd = sd or {}
+        _translate(sd.get("sequence"), seq_id, table, issues)
+        yield seq_id, sd
+
+
+def inject(source, table_path, out_path):
+    issues = []
+    write_script(out_path, translate_pairs(read_sequences(source), read_table(table_path), issues))
+    return out_path, issues
+
+
+def locale_of(table_path):
+    return os.path.splitext(os.path.basename(table_path))[0]
+
+
+def inject_all(source, tables, out_dir, workers=None):
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.basename(source).split(".")[0]
+    ext = ".json" if is_json(source) else ".yaml"
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        jobs = [ex.submit(inject, source, t, os.path.join(out_dir, f"{stem}.{locale_of(t)}{ext}"))
+                for t in tables]
+        return [j.result() for j in jobs]
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    e = sub.add_parser("extract"); e.add_argument("script"); e.add_argument("table")
+    i = sub.add_parser("inject");  i.add_argument("script"); i.add_argument("tables", nargs="+")
+    i.add_argument("-o", "--out", default="."); i.add_argument("-j", "--jobs", type=int)
+    a = ap.parse_args()
+    if a.cmd == "extract":
+        print(f"{extract(read_sequences(a.script), a.table)} strings written to {a.table}")
+    else:
+        for out, issues in inject_all(a.script, a.tables, a.out, a.jobs):
+            print(out)
+            for msg in issues: print("  " + msg, file=sys.stderr)
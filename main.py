@@ -1,14 +1,27 @@
-import sys, json, os
-import yaml
+import sys, re, json, os, time, weakref, shutil, tempfile
 import theme
+from serializer import DoubleQuotedStr, dump_yaml
+from bundle import write_bundle
+import l10n, templates, variables, slices, commands, spellcheck, importers, diagnostics
+from assets import AssetIndex, reference_index, asset_report, KINDS as ASSET_KINDS
+from workers import run_in_background
+from scriptio import load_script, save_script, choice_options, SCRIPT_SUFFIXES
+import snapshot
+from snapshot import Node, NodeKind, KIND_BY_KEY
+from flowchart import FlowchartWindow
+from characters import CharacterModel, POSITIONS
+from findreplace import FindReplaceWindow
+from navigator import NavigatorIndex
+from completion import CompletionIndex
 from PySide6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
     QPushButton, QTreeWidget, QTreeWidgetItem, QFileDialog, QMessageBox,
     QComboBox, QSplitter, QTextEdit, QSpinBox, QScrollArea, QStackedWidget,
-    QSizePolicy, QListWidget, QListWidgetItem
+    QSizePolicy, QListView, QListWidget, QListWidgetItem, QMenu, QCompleter, QTabWidget, QInputDialog,
+    QPlainTextEdit
 )
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QColor, QFont
+from PySide6.QtCore import Qt, QTimer, QStringListModel, QFileSystemWatcher, QModelIndex, QEvent, QPoint
+from PySide6.QtGui import QColor, QFont, QUndoStack, QTextCursor, QSyntaxHighlighter, QTextCharFormat
 
 CMD_COLORS = {
     "sequences":"#3d8bc4","sequence":"#7090a8","title":"#9090a0",
@@ -21,9 +34,20 @@ EMOTIONS   = ["happy","sad","angry","excited","serious","thinking","laugh",
               "surprised","nervous","neutral","cry","smug"]
 ANIMATIONS = ["jump","shake","bounce","spin","flash","slide_in","slide_out",
               "fade_in","fade_out","nod","tremble"]
-CMDS       = ["char","emotion","say","background","animate","choice",
-              "music","sound","wait"]
 CHARS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "characters.json")
+SETTINGS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "settings.json")
+ASSET_RESCAN_MS = 5000
+SPELL_DELAY_MS = 300
+NAV_REINDEX_MS = 500        # navigator index catches up this long after the last edit
+COMPLETION_DELAY_MS = 300   # and the completion tries this long
+MEMORY_BUDGET_MB = 512      # default for settings["memory_budget_mb"]
+ITEM_BYTES = 3500           # measured cost of one tree item (Qt item, wrapper, snapshot node)
+SPELL_REPORT_ROWS = 1000
+DIAG_INTERVAL_MS = 30_000
+SCRIPT_OPEN_FILTER  = "Scripts (*.yaml *.yml *.yaml.gz *.yml.gz *.yaml.xz *.yml.xz *.json *.json.gz *.json.xz)"
+IMPORT_FILTER       = SCRIPT_OPEN_FILTER + ";;Ren'Py / screenplay text (*.rpy *.txt)"
+SCRIPT_SAVE_FILTERS = {"YAML Files (*.yaml)": ".yaml", "Gzip YAML (*.yaml.gz)": ".yaml.gz",
+                       "XZ YAML (*.yaml.xz)": ".yaml.xz", "JSON (*.json)": ".json"}
 
 FONT_SIZE = 15
 TREE_FONT = LABEL_FONT = BTN_FONT = INPUT_FONT = None
@@ -34,22 +58,249 @@ def init_fonts():
         f = QFont(); f.setPointSize(FONT_SIZE)
         globals()[name] = f
 
+def load_settings():
+    try:
+        with open(SETTINGS_FILE, "r", encoding="utf-8") as f: return json.load(f)
+    except: return {}
+
+def save_settings(settings):
+    try:
+        with open(SETTINGS_FILE, "w", encoding="utf-8") as f: json.dump(settings, f, indent=2)
+    except: pass
+
 def color(key): return CMD_COLORS.get(key, "#c8cdd4")
 
-def make_item(col0, col1="", key=None):
+# computed once: combining flag enums costs ~20 us per item
+CMD_FLAGS = QTreeWidgetItem().flags() | Qt.ItemIsDragEnabled | Qt.ItemIsSelectable | Qt.ItemIsEnabled
+
+def make_item(col0, col1="", key=None, kind=None):
     item = QTreeWidgetItem([col0, col1])
     k = key or col0
     item.setForeground(0, QColor(color(k)))
     item.setForeground(1, QColor("#a0a8b0"))
     item.setData(0, Qt.UserRole, k)
+    item.setData(0, KIND_ROLE, int(kind if kind is not None else KIND_BY_KEY.get(k, NodeKind.CMD)))
     item.setFont(0, TREE_FONT); item.setFont(1, TREE_FONT)
     return item
 
+# ── Node kinds ───────────────────────────────────────────────────────────────
+KIND_ROLE   = Qt.UserRole + 2
+FIELDS_ROLE = Qt.UserRole + 3     # parsed command fields, see commands.py
+
+def _mask(*kinds): return sum(1 << k for k in kinds)
+
+# parent kind -> bitmask of node kinds that may be dropped into it
+DROP_TABLE = [0] * len(NodeKind)
+DROP_TABLE[NodeKind.ROOT]       = _mask(NodeKind.SEQ)
+DROP_TABLE[NodeKind.CHARACTERS] = _mask(NodeKind.CHAR_ENTRY)
+DROP_TABLE[NodeKind.CONTAINER]  = _mask(NodeKind.CHOICE, NodeKind.BACKGROUND, NodeKind.CMD)
+DROP_TABLE[NodeKind.CHOICE]     = _mask(NodeKind.OPTION)
+
+def node_kind(item):
+    if item is None: return NodeKind.ROOT
+    k = item.data(0, KIND_ROLE)
+    if k is not None: return k
+    key = item.data(0, Qt.UserRole) or item.text(0)
+    p = item.parent()
+    pk = node_kind(p) if p is not None else NodeKind.ROOT
+    if pk == NodeKind.CHARACTERS: return NodeKind.CHAR_ENTRY
+    if key == "background" and pk == NodeKind.SEQ: return NodeKind.HEADER_BG
+    return KIND_BY_KEY.get(key, NodeKind.CMD)
+
+def item_fields(item):
+    """Structured fields of a command item; re-parsed if the text was edited without them."""
+    key = item.data(0, Qt.UserRole) or item.text(0)
+    f = item.data(0, FIELDS_ROLE)
+    if f is None or commands.display(key, f) != item.text(1): return commands.parse_display(key, item.text(1))
+    return dict(f)
+
+def expanded_paths(node, prefix=()):
+    out = {prefix: node.isExpanded()} if node.childCount() else {}
+    for i in range(node.childCount()):
+        out.update(expanded_paths(node.child(i), prefix + (i,)))
+    return out
+
+def apply_expanded(node, expanded, prefix=()):
+    if prefix in expanded: node.setExpanded(expanded[prefix])
+    for i in range(node.childCount()):
+        apply_expanded(node.child(i), expanded, prefix + (i,))
+
 def is_seq_container(item):
     if item is None: return False
     k = item.data(0, Qt.UserRole) or item.text(0)
     return k == "sequence" and item.data(0, Qt.UserRole) != "__seq__"
 
+# ── Completion ───────────────────────────────────────────────────────────────
+class TrieCompleter(QCompleter):
+    """Popup fed from the editor's CompletionIndex on every keystroke; no filtering on the Qt side.
+
+    Only queries the tries; the editor brings them up to date shortly after the tree changes.
+    """
+    def __init__(self, editor, kind, widget, on_pick=None):
+        super().__init__(widget)
+        self.editor, self.kind, self.on_pick = editor, kind, on_pick
+        self.words = QStringListModel(self); self.setModel(self.words)
+        self.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.setCaseSensitivity(Qt.CaseInsensitive); self.setWidget(widget)
+        self.activated[str].connect(self._pick)
+        if isinstance(widget, QLineEdit): widget.textEdited.connect(self.update_prefix)
+
+    def update_prefix(self, prefix, rect=None):
+        words = self.editor.completion.complete(self.kind, prefix) if prefix else []
+        if not words or words == [prefix]: self.popup().hide(); return
+        self.words.setStringList(words)
+        self.popup().setCurrentIndex(self.words.index(0))
+        self.complete(rect) if rect is not None else self.complete()
+
+    def _pick(self, word):
+        if self.on_pick: self.on_pick(word)
+        else: self.widget().setText(word)
+
+
+class CompletingTextEdit(QTextEdit):
+    """Dialogue editor that completes `{name}` mentions while typing."""
+    MENTION_RE = re.compile(r"\{([^{}\s]*)$")
+
+    def __init__(self, editor):
+        super().__init__()
+        self.completer = TrieCompleter(editor, "character", self, self._insert_mention)
+        self.textChanged.connect(self._changed)
+
+    def _prefix(self):
+        cur = self.textCursor(); block = cur.block().text()[:cur.positionInBlock()]
+        m = self.MENTION_RE.search(block)
+        return m.group(1) if m else None
+
+    def _changed(self):
+        prefix = self._prefix()
+        if prefix is None or not self.hasFocus(): self.completer.popup().hide(); return
+        rect = self.cursorRect(); rect.setWidth(220)
+        self.completer.update_prefix(prefix, rect)
+
+    def _insert_mention(self, name):
+        cur = self.textCursor()
+        cur.movePosition(QTextCursor.Left, QTextCursor.KeepAnchor, len(self._prefix() or ""))
+        cur.insertText(name + "}"); self.setTextCursor(cur)
+
+    def keyPressEvent(self, event):
+        if self.completer.popup().isVisible() and event.key() in (Qt.Key_Enter, Qt.Key_Return, Qt.Key_Escape,
+                                                                   Qt.Key_Tab, Qt.Key_Backtab):
+            event.ignore(); return          # the completer popup handles these
+        super().keyPressEvent(event)
+
+
+# ── Spelling ─────────────────────────────────────────────────────────────────
+class SpellHighlighter(QSyntaxHighlighter):
+    """Underlines spelling/style issues; lines not in the checker's cache are checked on a worker thread."""
+    def __init__(self, editor, document):
+        super().__init__(document)
+        self.editor = editor; self._pending = set(); self._busy = False
+        self.formats = {}
+        for kind, col in (("spelling", "#e06c75"), ("style", "#d4a84a")):
+            f = QTextCharFormat(); f.setUnderlineStyle(QTextCharFormat.SpellCheckUnderline)
+            f.setUnderlineColor(QColor(col)); self.formats[kind] = f
+        self._timer = QTimer(self); self._timer.setSingleShot(True); self._timer.setInterval(SPELL_DELAY_MS)
+        self._timer.timeout.connect(self._check)
+
+    def highlightBlock(self, text):
+        issues = self.editor.spell.cached(text)
+        if issues is None: self._pending.add(text); self._timer.start(); return
+        for start, length, kind, _ in issues: self.setFormat(start, length, self.formats[kind])
+
+    def _check(self):
+        if self._busy or not self._pending: return
+        lines, self._pending, checker = list(self._pending), set(), self.editor.spell
+        self._busy = True
+        run_in_background(lambda: [checker.check(t) for t in lines], self._checked)
+
+    def _checked(self, _, error):
+        self._busy = False
+        try: doc = self.document()
+        except RuntimeError: return      # the editor was closed meanwhile
+        doc.blockSignals(True)           # new formats are not a text change
+        self.rehighlight(); doc.blockSignals(False)
+
+
+class SpellingWindow(QWidget):
+    """Project-wide spelling and style report; double-click a row to jump to the line."""
+    def __init__(self, editor):
+        super().__init__()
+        self.editor = editor; self._busy = False
+        self.setWindowTitle("Spelling and style"); self.resize(760, 560)
+        lay = QVBoxLayout(self); lay.setContentsMargins(8, 8, 8, 8); lay.setSpacing(6)
+        self.view = QTreeWidget(); self.view.setHeaderLabels(["line", "issue", "text"])
+        self.view.setColumnWidth(0, 160); self.view.setColumnWidth(1, 240); self.view.setRootIsDecorated(False)
+        self.view.itemDoubleClicked.connect(self._goto); lay.addWidget(self.view)
+        row = QHBoxLayout()
+        self.status = QLabel(); self.status.setObjectName("lbl_field"); row.addWidget(self.status, 1)
+        b = QPushButton("Recheck"); b.clicked.connect(self.refresh); row.addWidget(b)
+        lay.addLayout(row)
+
+    def showEvent(self, event):
+        super().showEvent(event); self.refresh()
+
+    def refresh(self):
+        if self._busy: return
+        self._busy = True; self.status.setText("checking…")
+        checker, t = self.editor.spell, time.perf_counter()
+        self.editor._on_snapshot(lambda snap: spellcheck.check_snapshot(checker, snap),
+                                 lambda issues: self._fill(issues, time.perf_counter() - t),
+                                 lambda: setattr(self, "_busy", False))
+
+    def _fill(self, issues, secs):
+        self._busy = False
+        self.view.setUpdatesEnabled(False); self.view.clear()
+        for sid, path, kind, text, ln, (start, length, ikind, msg) in issues[:SPELL_REPORT_ROWS]:
+            line = text.split("\n")[ln]
+            it = QTreeWidgetItem([f"{sid}#{'.'.join(map(str, path))}", msg, line[max(0, start - 30):start + length + 30]])
+            it.setForeground(1, QColor("#e06c75" if ikind == "spelling" else "#d4a84a"))
+            it.setData(0, Qt.UserRole, (sid, path)); self.view.addTopLevelItem(it)
+        self.view.setUpdatesEnabled(True)
+        more = f" (showing {SPELL_REPORT_ROWS})" if len(issues) > SPELL_REPORT_ROWS else ""
+        words = "" if self.editor.spell.words else " · no word list, style rules only"
+        self.status.setText(f"{len(issues)} issue(s){more} · {secs:.2f} s{words}")
+
+    def _goto(self, it, _):
+        site = it.data(0, Qt.UserRole)
+        if site: self.editor.goto_seq_path(*site)
+
+
+# ── Diagnostics ──────────────────────────────────────────────────────────────
+class DiagnosticsWindow(QWidget):
+    """Memory samples of the running editor; tracemalloc runs only while the window is open."""
+    def __init__(self, editor):
+        super().__init__()
+        self.editor, self.probe = editor, None
+        self.setWindowTitle("Memory diagnostics"); self.resize(760, 560)
+        lay = QVBoxLayout(self); lay.setContentsMargins(8, 8, 8, 8); lay.setSpacing(6)
+        self.out = QPlainTextEdit(); self.out.setReadOnly(True); self.out.setFont(QFont("monospace"))
+        lay.addWidget(self.out)
+        row = QHBoxLayout()
+        self.status = QLabel(); self.status.setObjectName("lbl_field"); row.addWidget(self.status, 1)
+        b = QPushButton("Sample now"); b.clicked.connect(self.sample); row.addWidget(b)
+        lay.addLayout(row)
+        self._timer = QTimer(self); self._timer.setInterval(DIAG_INTERVAL_MS); self._timer.timeout.connect(self.sample)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.probe is None:
+            self.probe = diagnostics.MemoryProbe(QApplication.instance(), self.editor); self.sample()
+        self._timer.start()
+
+    def closeEvent(self, event):
+        # the samples are dropped with the probe; reopening starts a new warm-up
+        self._timer.stop(); self.probe.stop(); self.probe = None
+        super().closeEvent(event)
+
+    def sample(self):
+        if self.probe is None: return
+        t = time.perf_counter()
+        self.probe.sample(time.strftime("%H:%M:%S"))
+        self.out.setPlainText(self.probe.report())
+        self.status.setText(f"{len(self.probe.samples)} sample(s), every {DIAG_INTERVAL_MS // 1000} s · "
+                            f"last took {time.perf_counter() - t:.2f} s")
+
+
 # ── Gendered Insert Widget ────────────────────────────────────────────────────
 class GenderedInsertWidget(QWidget):
     def __init__(self, target_textedit, parent=None):
@@ -86,68 +337,33 @@ class GenderedInsertWidget(QWidget):
         self.target.setTextCursor(cursor); self.target.setFocus()
         for inp in self.inputs.values(): inp.clear()
 
-
-# ── YAML serializer ──────────────────────────────────────────────────────────
-
-# Custom string subclass used to flag values that must be double-quoted in YAML
-class DoubleQuotedStr(str):
-    pass
-
-def _yaml_escape(s):
-    return str(s).replace("\\", "\\\\").replace('"', '\\"')
-
-def _yaml_scalar(v):
-    if isinstance(v, DoubleQuotedStr):
-        return f'"{_yaml_escape(v)}"'
-    if isinstance(v, bool):
-        return "true" if v else "false"
-    if isinstance(v, (int, float)):
-        return str(v)
-    s = str(v)
-    if any(c in s for c in ':{}[]|>&*!,#?\'"\\%@`') or s == "" or s.startswith(" "):
-        return f'"{_yaml_escape(s)}"'
-    return s
-
-def _dump_node(node, indent):
-    sp = " " * indent
-    lines = []
-    if isinstance(node, list):
-        for item in node:
-            if isinstance(item, dict):
-                pairs = list(item.items())
-                k0, v0 = pairs[0]
-                if isinstance(v0, list):
-                    lines.append(f"{sp}- {k0}:")
-                    lines.append(_dump_node(v0, indent + 2))
-                    for k, v in pairs[1:]:
-                        if isinstance(v, list):
-                            lines.append(f"{sp}  {k}:")
-                            lines.append(_dump_node(v, indent + 4))
-                        else:
-                            lines.append(f"{sp}  {k}: {_yaml_scalar(v)}")
-                else:
-                    lines.append(f"{sp}- {k0}: {_yaml_scalar(v0)}")
-                    for k, v in pairs[1:]:
-                        if isinstance(v, list):
-                            lines.append(f"{sp}  {k}:")
-                            lines.append(_dump_node(v, indent + 4))
-                        else:
-                            lines.append(f"{sp}  {k}: {_yaml_scalar(v)}")
-            else:
-                lines.append(f"{sp}- {_yaml_scalar(item)}")
-    elif isinstance(node, dict):
-        for k, v in node.items():
-            if isinstance(v, (dict, list)):
-                lines.append(f"{sp}{k}:")
-                lines.append(_dump_node(v, indent + 2))
-            else:
-                lines.append(f"{sp}{k}: {_yaml_scalar(v)}")
-    else:
-        lines.append(f"{sp}{_yaml_scalar(node)}")
-    return "\n".join(l for l in lines if l)
-
-def dump_yaml(data):
-    return _dump_node(data, 0) + "\n"
+# ── Template Preview ─────────────────────────────────────────────────────────
+class TemplatePreview(QWidget):
+    def __init__(self, source_textedit, panel, parent=None):
+        super().__init__(parent)
+        self.source, self.panel = source_textedit, panel
+        lay = QVBoxLayout(self); lay.setContentsMargins(0, 4, 0, 0); lay.setSpacing(4)
+        lay.addWidget(panel._lbl("Preview (mentions: name=Display, …):", "lbl_field"))
+        self.names = QLineEdit(panel.preview_names); self.names.setFont(INPUT_FONT)
+        self.names.setPlaceholderText("luna=Luna"); self.names.setMinimumHeight(32)
+        self.names.textChanged.connect(self._names_changed); lay.addWidget(self.names)
+        self.out = QLabel(); self.out.setWordWrap(True); self.out.setFont(INPUT_FONT)
+        self.out.setTextInteractionFlags(Qt.TextSelectableByMouse); lay.addWidget(self.out)
+        self.issues = QLabel(); self.issues.setWordWrap(True); self.issues.setObjectName("lbl_issue")
+        lay.addWidget(self.issues)
+        self.source.textChanged.connect(self.refresh); self.refresh()
+
+    def _names_changed(self, text):
+        self.panel.preview_names = text; self.refresh()
+
+    def refresh(self):
+        text = self.source.toPlainText()
+        tpl = templates.compile_template(text); names = templates.parse_names(self.names.text())
+        icons = {"he": "♂", "she": "♀", "they": "⚧"}
+        self.out.setText("\n".join(f"{icons[p]}  {tpl.render(p, names)}" for p in templates.PRONOUNS))
+        known = set(self.panel.get_chars()) | set(self.panel.editor.seq_chars_of(self.panel.current_item))
+        issues = templates.check(text, known)
+        self.issues.setText("\n".join("⚠ " + i for i in issues)); self.issues.setVisible(bool(issues))
 
 
 # ── Right Panel ──────────────────────────────────────────────────────────────
@@ -159,8 +375,9 @@ class RightPanel(QWidget):
         self.current_seq  = None
         self.field_widgets = {}
         self._block_instant = False
+        self.preview_names = ""
 
-        self.chars_list = QListWidget()  # init early
+        self.characters = CharacterModel(CHARS_FILE, self)  # init early
 
         lay = QVBoxLayout(self)
         lay.setContentsMargins(8, 8, 8, 8)
@@ -177,6 +394,8 @@ class RightPanel(QWidget):
         self.export_btn = self._btn("⬇  Export YAML");   self.export_btn.setObjectName("btn_io")
         self.chars_btn  = self._btn("✦  Characters");    self.chars_btn.setObjectName("btn_io")
         self.chars_btn.clicked.connect(lambda: self.stack.setCurrentIndex(3))
+        self.tools_btn  = self._btn("☰  Tools");         self.tools_btn.setObjectName("btn_io")
+        self.tools_menu = QMenu(self.tools_btn);          self.tools_btn.setMenu(self.tools_menu)
 
     # helpers
     def _lbl(self, txt, obj=None):
@@ -192,6 +411,16 @@ class RightPanel(QWidget):
     def _inp(self, val=""):
         w = QLineEdit(val); w.setFont(INPUT_FONT); w.setMinimumHeight(36); return w
 
+    def _completing_inp(self, kind, val=""):
+        w = self._inp(val); TrieCompleter(self.editor, kind, w)
+        return w
+
+    def _asset_inp(self, kind, val=""):
+        return self._completing_inp(kind, val)
+
+    def set_asset_names(self, index):
+        for kind in ASSET_KINDS: self.editor.completion.set_source(kind, "assets", index.names(kind))
+
     # ── pages ────────────────────────────────────────────────────────────────
 
     def _build_empty(self):
@@ -207,10 +436,15 @@ class RightPanel(QWidget):
         self.s_id    = self._inp(); l.addWidget(self._lbl("ID:", "lbl_field"));          l.addWidget(self.s_id)
         self.s_title = self._inp(); l.addWidget(self._lbl("title:", "lbl_field"));       l.addWidget(self.s_title)
         self.s_desc  = self._inp(); l.addWidget(self._lbl("description:", "lbl_field")); l.addWidget(self.s_desc)
-        self.s_bg    = self._inp(); l.addWidget(self._lbl("background:", "lbl_field"));  l.addWidget(self.s_bg)
+        self.s_bg    = self._asset_inp("background"); l.addWidget(self._lbl("background:", "lbl_field"));  l.addWidget(self.s_bg)
         l.addWidget(self._lbl("characters (name: pos):", "lbl_field"))
         self.s_chars = QTextEdit(); self.s_chars.setFont(INPUT_FONT); self.s_chars.setFixedHeight(80)
         l.addWidget(self.s_chars)
+        row = QHBoxLayout()
+        self.s_char_combo = QComboBox(); self.s_char_combo.setFont(INPUT_FONT); self.s_char_combo.setMinimumHeight(34)
+        self.s_char_combo.setModel(self.characters); row.addWidget(self.s_char_combo)
+        b = self._btn("Add character", "btn_io"); b.clicked.connect(self._add_seq_char); row.addWidget(b)
+        l.addLayout(row)
         b1 = self._btn("Apply",            "btn_primary"); b1.clicked.connect(self._apply_seq); l.addWidget(b1)
         b2 = self._btn("Delete sequence",  "btn_danger");  b2.clicked.connect(self.editor.del_sequence); l.addWidget(b2)
         b3 = self._btn("+ New sequence",   "btn_new");     b3.clicked.connect(self.editor.add_sequence); l.addWidget(b3)
@@ -227,7 +461,7 @@ class RightPanel(QWidget):
         hdr_row.addWidget(self.new_cmd_btn)
         l.addLayout(hdr_row)
         self.cmd_combo = QComboBox(); self.cmd_combo.setFont(INPUT_FONT); self.cmd_combo.setMinimumHeight(36)
-        self.cmd_combo.addItems(CMDS)
+        self.cmd_combo.addItems(commands.addable())
         self.cmd_combo.currentTextChanged.connect(self._on_cmd_combo_changed)
         l.addWidget(self.cmd_combo)
         l.addWidget(self._lbl("─────", "lbl_field"))
@@ -243,13 +477,16 @@ class RightPanel(QWidget):
         self.delete_btn.hide()
         l.addWidget(self.apply_btn); l.addWidget(self.delete_btn)
         l.addStretch()
-        self._load_fields_for_cmd(CMDS[0])
+        self._load_fields_for_cmd(self.cmd_combo.currentText())
         return w
 
     def _build_chars(self):
         w = QWidget(); l = QVBoxLayout(w); l.setSpacing(8); l.setContentsMargins(0,0,0,0)
         l.addWidget(self._lbl("CHARACTERS", "lbl_section"))
+        self.chars_list = QListView(); self.chars_list.setModel(self.characters)
+        self.chars_list.setSelectionMode(QListView.ExtendedSelection)
         self.chars_list.setFont(TREE_FONT); l.addWidget(self.chars_list)
+        self.chars_list.selectionModel().currentChanged.connect(lambda cur, _: self._show_char_meta())
         row = QHBoxLayout()
         self.char_input = QLineEdit(); self.char_input.setFont(INPUT_FONT)
         self.char_input.setPlaceholderText("name"); self.char_input.setMinimumHeight(36)
@@ -257,6 +494,13 @@ class RightPanel(QWidget):
         b_add = QPushButton("+"); b_add.setFont(BTN_FONT); b_add.setFixedWidth(40)
         b_add.clicked.connect(self._add_char); row.addWidget(b_add); l.addLayout(row)
         b_del  = self._btn("Delete selected", "btn_danger"); b_del.clicked.connect(self._del_char); l.addWidget(b_del)
+        l.addWidget(self._lbl("default position:", "lbl_field"))
+        self.char_pos = QComboBox(); self.char_pos.setFont(INPUT_FONT); self.char_pos.setMinimumHeight(36)
+        self.char_pos.setEditable(True); self.char_pos.addItems(POSITIONS); l.addWidget(self.char_pos)
+        l.addWidget(self._lbl("emotions (comma separated, empty = all):", "lbl_field"))
+        self.char_emotions = self._inp(); l.addWidget(self.char_emotions)
+        self.char_pos.currentTextChanged.connect(lambda _: self._save_char_meta())
+        self.char_emotions.editingFinished.connect(self._save_char_meta)
         b_back = self._btn("← Back",          "btn_io");     b_back.clicked.connect(lambda: self.stack.setCurrentIndex(2)); l.addWidget(b_back)
         l.addStretch(); return w
 
@@ -265,41 +509,38 @@ class RightPanel(QWidget):
     def _add_char(self):
         name = self.char_input.text().strip()
         if not name: return
-        self.chars_list.addItem(QListWidgetItem(name))
-        self.char_input.clear(); self._refresh_char_combo(); self._autosave_chars()
+        if self.characters.add(name):
+            self.chars_list.setCurrentIndex(self.characters.index(self.characters.rowCount() - 1))
+        self.char_input.clear()
 
     def _del_char(self):
-        for item in self.chars_list.selectedItems():
-            self.chars_list.takeItem(self.chars_list.row(item))
-        self._refresh_char_combo(); self._autosave_chars()
+        names = [i.data() for i in self.chars_list.selectionModel().selectedIndexes()]
+        self.characters.remove(names)
 
-    def _autosave_chars(self):
-        try:
-            with open(CHARS_FILE,"w",encoding="utf-8") as f: json.dump(self.get_chars(), f)
-        except: pass
+    def _current_char(self):
+        idx = self.chars_list.currentIndex()
+        return idx.data() if idx.isValid() else None
+
+    def _show_char_meta(self):
+        c = self.characters.get(self._current_char()) or {"position": "center", "emotions": []}
+        self.char_pos.blockSignals(True); self.char_pos.setCurrentText(c["position"]); self.char_pos.blockSignals(False)
+        self.char_emotions.setText(", ".join(c["emotions"]))
+
+    def _save_char_meta(self):
+        name = self._current_char()
+        if name is None: return
+        emotions = [e.strip() for e in self.char_emotions.text().split(",") if e.strip()]
+        self.characters.update(name, position=self.char_pos.currentText().strip() or "center", emotions=emotions)
 
     def autoload_chars(self):
-        if not os.path.exists(CHARS_FILE): return
-        try:
-            with open(CHARS_FILE,"r",encoding="utf-8") as f: chars = json.load(f)
-            self.chars_list.clear()
-            for c in chars: self.chars_list.addItem(QListWidgetItem(c))
-            self._refresh_char_combo()
-        except: pass
+        self.characters.load()
 
     def get_chars(self):
-        return [self.chars_list.item(i).text() for i in range(self.chars_list.count())]
-
-    def _refresh_char_combo(self):
-        for attr in ("_char_field_combo", "_say_char_combo"):
-            if not hasattr(self, attr): continue
-            c = getattr(self, attr)
-            prev = c.currentText()
-            self._block_instant = True
-            c.clear(); c.addItems([""] + self.get_chars())
-            idx = c.findText(prev)
-            if idx >= 0: c.setCurrentIndex(idx)
-            self._block_instant = False
+        return self.characters.names()
+
+    def emotions_for(self, name):
+        c = self.characters.get(name)
+        return c["emotions"] if c and c["emotions"] else EMOTIONS
 
     # ── sequence panel ───────────────────────────────────────────────────────
 
@@ -313,6 +554,12 @@ class RightPanel(QWidget):
         self.s_chars.setPlainText(d.get("chars",""))
         self.stack.setCurrentIndex(1)
 
+    def _add_seq_char(self):
+        c = self.characters.get(self.s_char_combo.currentText())
+        if not c or c["name"] in self.editor.seq_chars_of(self.current_seq): return
+        text = self.s_chars.toPlainText().strip()
+        self.s_chars.setPlainText(f"{text}, {c['name']}: {c['position']}" if text else f"{c['name']}: {c['position']}")
+
     def _apply_seq(self):
         item = self.current_seq
         if not item: return
@@ -347,7 +594,7 @@ class RightPanel(QWidget):
         idx = self.cmd_combo.findText(cmd)
         if idx >= 0: self.cmd_combo.setCurrentIndex(idx)
         self._block_instant = False
-        self._load_fields_for_cmd(cmd, value)
+        self._load_fields_for_cmd(cmd, value, item_fields(item))
         self.delete_btn.show()
         self.stack.setCurrentIndex(2)
 
@@ -359,8 +606,6 @@ class RightPanel(QWidget):
 
     def _clear_fields(self):
         self.field_widgets.clear()
-        for attr in ("_char_field_combo","_say_char_combo"):
-            if hasattr(self, attr): delattr(self, attr)
         self._clear_layout(self.fields_l)
 
     def _clear_layout(self, layout):
@@ -372,72 +617,85 @@ class RightPanel(QWidget):
                 self._clear_layout(item.layout())
                 item.layout().deleteLater()
 
-    def _load_fields_for_cmd(self, cmd, value=""):
+    def _load_fields_for_cmd(self, cmd, value="", fields=None):
         self._clear_fields()
         self.cmd_type_lbl.setText(cmd.upper())
-        chars = self.get_chars()
-
-        if cmd in ("say", "option"):
-            w = QTextEdit(); w.setFont(INPUT_FONT)
-            w.setPlainText(value.strip('"'))
-            w.setFixedHeight(100 if cmd == "say" else 80)
-            w.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
-            self._row("text", w)
-            self.fields_l.addWidget(self._lbl("Insert character mention:", "lbl_field"))
-            row = QHBoxLayout()
-            self._say_char_combo = QComboBox(); self._say_char_combo.setFont(INPUT_FONT)
-            self._say_char_combo.setMinimumHeight(34)
-            self._say_char_combo.addItems([""] + chars)
-            row.addWidget(self._say_char_combo)
-            b = QPushButton("Insert {name}"); b.setFont(BTN_FONT)
-            b.setObjectName("btn_io")
-            b.clicked.connect(lambda checked=False, te=w, cb=self._say_char_combo: self._insert_char_tag(te, cb))
-            row.addWidget(b)
-            self.fields_l.addLayout(row)
-            gw = GenderedInsertWidget(w); self.fields_l.addWidget(gw)
-
-        elif cmd == "char":
-            c = QComboBox(); c.setFont(INPUT_FONT); c.setMinimumHeight(36); c.setEditable(True)
-            c.addItems([""] + chars)
-            idx = c.findText(value); c.setCurrentIndex(idx) if idx >= 0 else c.setCurrentText(value)
-            self._char_field_combo = c
-            c.currentTextChanged.connect(self._instant_update)
-            self._row("character", c)
-
-        elif cmd == "emotion":
-            c = QComboBox(); c.setFont(INPUT_FONT); c.setMinimumHeight(36); c.setEditable(True)
-            c.addItems(EMOTIONS)
-            idx = c.findText(value); c.setCurrentIndex(idx) if idx >= 0 else c.setCurrentText(value)
-            c.currentTextChanged.connect(self._instant_update)
-            self._row("emotion", c)
-
-        elif cmd == "animate":
-            c = QComboBox(); c.setFont(INPUT_FONT); c.setMinimumHeight(36); c.setEditable(True)
-            c.addItems(ANIMATIONS)
-            idx = c.findText(value); c.setCurrentIndex(idx) if idx >= 0 else c.setCurrentText(value)
-            c.currentTextChanged.connect(self._instant_update)
-            self._row("animation", c)
-
-        elif cmd == "background":
-            bg_val, fade_val = value, ""
-            if ", fadeout:" in value:
-                p = value.split(", fadeout:"); bg_val, fade_val = p[0].strip(), p[1].strip()
-            self._row("background", self._inp(bg_val))
-            self._row("fadeout",    self._inp(fade_val))
-
-        elif cmd == "choice":
-            spin = QSpinBox(); spin.setFont(INPUT_FONT); spin.setMinimumHeight(36)
-            spin.setRange(1, 20)
-            spin.setValue(self.current_item.childCount() if self.current_item else 2)
-            self._row("options", spin)
-
-        elif cmd == "set":
-            var_v = value.split("=")[0].strip() if "=" in value else value
-            val_v = value.split("=")[1].strip() if "=" in value else ""
-            self._row("variable", self._inp(var_v)); self._row("value", self._inp(val_v))
-
-        else:
-            self._row("value", self._inp(value))
+        spec = commands.get(cmd)
+        if fields is None: fields = spec.parse_display(value) if value else {}
+        for f in spec.fields:
+            v = fields.get(f.name, f.default)
+            self.FIELD_WIDGETS.get(f.widget.split(":")[0], RightPanel._w_line)(self, cmd, f, "" if v is None else str(v))
+        extra = self.CMD_EXTRAS.get(cmd)
+        if extra: extra(self)
+
+    # field widgets, by Field.widget
+    def _combo(self, f, items, value, kind=None):
+        c = QComboBox(); c.setFont(INPUT_FONT); c.setMinimumHeight(36)
+        # an own line edit: connections to the one setEditable() creates outlive the combo (~400 bytes each)
+        c.setLineEdit(QLineEdit(c))
+        if isinstance(items, QStringListModel) or hasattr(items, "rowCount"): c.setModel(items)
+        else: c.addItems(items)
+        idx = c.findText(value); c.setCurrentIndex(idx) if idx >= 0 else c.setCurrentText(value)
+        # user edits only: a shared model changing must not rewrite the command
+        c.textActivated.connect(self._instant_update); c.lineEdit().textEdited.connect(self._instant_update)
+        if kind:
+            c.setCompleter(None)
+            TrieCompleter(self.editor, kind, c.lineEdit(), lambda w: (c.setCurrentText(w), self._instant_update()))
+        self._row(f.name, c)
+
+    def _w_dialogue(self, cmd, f, value):
+        w = CompletingTextEdit(self.editor); w.setFont(INPUT_FONT)
+        SpellHighlighter(self.editor, w.document())
+        w.setPlainText(value)
+        w.setFixedHeight(100 if cmd == "say" else 80)
+        w.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self._row(f.name, w)
+        self.fields_l.addWidget(self._lbl("Insert character mention:", "lbl_field"))
+        row = QHBoxLayout()
+        cb = QComboBox(); cb.setFont(INPUT_FONT); cb.setMinimumHeight(34)
+        cb.setModel(self.characters); cb.setCurrentIndex(-1)
+        row.addWidget(cb)
+        b = QPushButton("Insert {name}"); b.setFont(BTN_FONT)
+        b.setObjectName("btn_io")
+        b.clicked.connect(lambda checked=False, te=w, cb=cb: self._insert_char_tag(te, cb))
+        row.addWidget(b)
+        self.fields_l.addLayout(row)
+        gw = GenderedInsertWidget(w); self.fields_l.addWidget(gw)
+        self.fields_l.addWidget(TemplatePreview(w, self))
+
+    def _w_character(self, cmd, f, value):
+        self._combo(f, self.characters, value, "character")
+
+    def _w_emotion(self, cmd, f, value):
+        self._combo(f, self.emotions_for(self.editor.speaker_of(self.current_item or self.editor._cur())), value, "emotion")
+
+    def _w_animation(self, cmd, f, value):
+        self._combo(f, ANIMATIONS, value, "animation")
+
+    def _w_asset(self, cmd, f, value):
+        self._row(f.name, self._asset_inp(f.widget.partition(":")[2] or cmd, value))
+
+    def _w_sequence(self, cmd, f, value):
+        self._row(f.name, self._completing_inp("sequence", value))
+
+    def _w_line(self, cmd, f, value):
+        if f.options: self._combo(f, [str(o) for o in f.options], value)
+        else: self._row(f.name, self._inp(value))
+
+    def _w_options(self, cmd, f, value):
+        spin = QSpinBox(); spin.setFont(INPUT_FONT); spin.setMinimumHeight(36)
+        spin.setRange(1, 20)
+        spin.setValue(self.current_item.childCount() if self.current_item else 2)
+        self._row(f.name, spin)
+
+    def _x_find_usages(self):
+        b = self._btn("Find usages", "btn_io"); self.fields_l.addWidget(b)
+        b.clicked.connect(lambda: self.editor._show_variables(self.field_widgets["variable"].text().strip()))
+
+    FIELD_WIDGETS = {"dialogue": _w_dialogue, "character": _w_character, "emotion": _w_emotion,
+                     "animation": _w_animation, "asset": _w_asset, "line": _w_line, "number": _w_line,
+                     "options": _w_options, "sequence": _w_sequence}
+    CMD_EXTRAS = {"set": _x_find_usages}
 
     def _insert_char_tag(self, text_edit, combo):
         name = combo.currentText().strip()
@@ -447,40 +705,35 @@ class RightPanel(QWidget):
         text_edit.setTextCursor(cursor)
         text_edit.setFocus()
 
-    def _instant_update(self, value):
+    def _instant_update(self, _=None):
         if self._block_instant: return
+        cmd = (self.current_item.data(0, Qt.UserRole) or self.current_item.text(0)) if self.current_item else None
+        fields = self.get_fields(cmd)
         if self.current_item is None:
-            self.editor._add_cmd_with_value(value)
+            self.editor._add_cmd_with_value(fields)
         else:
-            self.current_item.setText(1, value)
+            self.editor.set_cmd_fields(self.current_item, fields)
 
     def _row(self, key, widget):
         lbl = QLabel(key + ":"); lbl.setFont(LABEL_FONT); lbl.setObjectName("lbl_field")
         self.fields_l.addWidget(lbl); self.fields_l.addWidget(widget)
         self.field_widgets[key] = widget
 
+    FIELD_READERS = {QTextEdit: lambda w: w.toPlainText().strip(), QLineEdit: lambda w: w.text().strip(),
+                     QComboBox: lambda w: w.currentText().strip(), QSpinBox: lambda w: w.value()}
+
+    def get_fields(self, force_cmd=None):
+        spec = commands.get(force_cmd or self.cmd_combo.currentText())
+        out = {}
+        for f in spec.fields:
+            w = self.field_widgets.get(f.name)
+            read = next((r for t, r in self.FIELD_READERS.items() if isinstance(w, t)), None)
+            out[f.name] = f.coerce(read(w)) if read else f.default
+        return out
+
     def get_cmd_value(self, force_cmd=None):
         cmd = force_cmd or self.cmd_combo.currentText()
-
-        def t(k):
-            w = self.field_widgets.get(k)
-            if not w: return ""
-            if isinstance(w, QTextEdit):  return w.toPlainText().strip()
-            if isinstance(w, QLineEdit):  return w.text().strip()
-            if isinstance(w, QComboBox):  return w.currentText().strip()
-            if isinstance(w, QSpinBox):   return str(w.value())
-            return ""
-
-        if cmd == "say":        return f'"{t("text")}"'
-        if cmd == "option":     return f'"{t("text")}"'
-        if cmd == "emotion":    return t("emotion")
-        if cmd == "animate":    return t("animation")
-        if cmd == "char":       return t("character")
-        if cmd == "set":        return f"{t('variable')} = {t('value')}"
-        if cmd == "background":
-            bg, fade = t("background"), t("fadeout")
-            return f"{bg}, fadeout: {fade}" if fade else bg
-        return t("value")
+        return commands.display(cmd, self.get_fields(cmd))
 
     def get_num_options(self):
         w = self.field_widgets.get("options")
@@ -499,69 +752,61 @@ class RightPanel(QWidget):
                 elif num < cur:
                     for _ in range(cur - num): item.removeChild(item.child(item.childCount()-1))
             else:
-                new_value = self.get_cmd_value(force_cmd=real_cmd)
-                item.setText(1, new_value)
+                self.editor.set_cmd_fields(item, self.get_fields(real_cmd))
         else:
             self.editor._add_cmd()
 
 class VNTreeWidget(QTreeWidget):
-    def _is_drop_valid(self, event):
-        target_item = self.itemAt(event.position().toPoint())
-        dragged_item = self.currentItem()
-
-        if not dragged_item: return False
-
-        drag_key = dragged_item.data(0, Qt.UserRole) or dragged_item.text(0)
-        if drag_key == "sequence":
-            p = dragged_item.parent()
-            if p:
-                pk = p.data(0, Qt.UserRole) or p.text(0)
-                if pk == "__seq__" or pk == "option":
-                    return False
-
-        meta_tags = ["title", "description", "characters"]
-        if drag_key in meta_tags: return False
-
-        if drag_key == "background":
-            p = dragged_item.parent()
-            if p and (p.data(0, Qt.UserRole) or p.text(0)) == "__seq__":
-                return False
-
-        if not target_item:
-            return drag_key == "__seq__"
-
-        drop_pos = self.dropIndicatorPosition()
-
-        if drop_pos == QTreeWidget.DropIndicatorPosition.OnItem:
-            parent_item = target_item
-        else:
-            parent_item = target_item.parent()
-
-        if not parent_item:
-            return drag_key == "__seq__"
-
-        parent_key = parent_item.data(0, Qt.UserRole) or parent_item.text(0)
-
-        if parent_key == "__seq__":
-            if drag_key == "sequence":
-                return False
-            allowed_meta = ["title", "description", "background", "characters"]
-            return drag_key in allowed_meta
-
-        valid_containers = ["characters", "choice", "sequence"]
-        if parent_key not in valid_containers:
-            return False
+    def __init__(self):
+        super().__init__()
+        self._drag_items, self._drag_mask = [], 0
 
-        if parent_key == "choice":
-            return drag_key == "option"
+    def startDrag(self, actions):
+        sel = self.selectedItems()
+        chosen = set(map(id, sel))
 
-        if parent_key == "option":
+        def has_selected_ancestor(it):
+            p = it.parent()
+            while p is not None:
+                if id(p) in chosen: return True
+                p = p.parent()
             return False
 
-        if parent_key == "sequence":
-            forbidden = ["option", "title", "description", "__seq__"]
-            return drag_key not in forbidden
+        items = [it for it in sel if not has_selected_ancestor(it)]
+        items.sort(key=self._order_key)
+        self._drag_items = items
+        self._drag_mask = _mask(*{node_kind(it) for it in items})
+        try: super().startDrag(actions)
+        finally: self._drag_items, self._drag_mask = [], 0
+
+    def _order_key(self, item):
+        path = []
+        while item is not None:
+            p = item.parent() or self.invisibleRootItem()
+            path.append(p.indexOfChild(item)); item = item.parent()
+        return path[::-1]
+
+    def _drop_target(self, event):
+        target = self.itemAt(event.position().toPoint())
+        if target is None: return None, self.invisibleRootItem().childCount()
+        pos = self.dropIndicatorPosition()
+        if pos == QTreeWidget.DropIndicatorPosition.OnItem: return target, target.childCount()
+        parent = target.parent()
+        idx = (parent or self.invisibleRootItem()).indexOfChild(target)
+        if pos == QTreeWidget.DropIndicatorPosition.BelowItem: idx += 1
+        elif pos == QTreeWidget.DropIndicatorPosition.OnViewport:
+            return None, self.invisibleRootItem().childCount()
+        return parent, idx
 
+    def _is_drop_valid(self, event):
+        if not self._drag_items: return False
+        parent, _ = self._drop_target(event)
+        mask = self._drag_mask
+        if DROP_TABLE[node_kind(parent)] & mask != mask: return False
+        dragged = set(map(id, self._drag_items))
+        while parent is not None:                      # no drops into a dragged subtree
+            if id(parent) in dragged: return False
+            parent = parent.parent()
         return True
 
     def dragMoveEvent(self, event):
@@ -570,19 +815,275 @@ class VNTreeWidget(QTreeWidget):
             event.ignore()
 
     def dropEvent(self, event):
-        if self._is_drop_valid(event):
-            super().dropEvent(event)
-        else:
-            event.ignore()
+        if event.source() is not self or not self._is_drop_valid(event):
+            event.ignore(); return
+        parent, idx = self._drop_target(event)
+        self.move_items(self._drag_items, parent, idx)
+        event.setDropAction(Qt.CopyAction); event.accept()   # keep Qt from removing the sources
+
+    def move_items(self, items, parent, idx):
+        dest = parent or self.invisibleRootItem()
+        states = [expanded_paths(it) for it in items]
+        self.setUpdatesEnabled(False)
+        try:
+            for it in items:
+                src = it.parent() or self.invisibleRootItem()
+                i = src.indexOfChild(it)
+                if src is dest and i < idx: idx -= 1
+                src.takeChild(i)
+            dest.insertChildren(idx, items)
+            for it, st in zip(items, states): apply_expanded(it, st)
+            self.clearSelection()
+            for it in items: it.setSelected(True)
+        finally:
+            self.setUpdatesEnabled(True)
+
+# ── Document mirror ──────────────────────────────────────────────────────────
+COMMAND_KINDS = {NodeKind.CMD, NodeKind.BACKGROUND, NodeKind.OPTION}
+
+class DocumentMirror:
+    """Keeps a persistent snapshot.Node per tree item, rebuilt lazily after edits.
+
+    Model signals invalidate the edited item and its ancestors; snapshot()
+    then rebuilds only those nodes and reuses every other subtree as is.
+    """
+    def __init__(self, tree, on_change=None):
+        self.tree, self.on_change = tree, on_change
+        # holding the root's wrapper keeps it cached; a fresh wrapper costs ~50 ms on a 100k-item tree
+        self.root = tree.invisibleRootItem()
+        self._nodes = weakref.WeakKeyDictionary()
+        m = tree.model()
+        m.dataChanged.connect(lambda tl, br, roles=(): self._invalidate(tl))
+        m.rowsInserted.connect(lambda parent, a, b: self._invalidate(parent))
+        m.rowsRemoved.connect(lambda parent, a, b: self._invalidate(parent))
+        m.rowsMoved.connect(lambda sp, a, b, dp, r: (self._invalidate(sp), self._invalidate(dp)))
+        m.modelReset.connect(self._reset); m.layoutChanged.connect(self._reset)
+
+    def _reset(self):
+        self._nodes.clear()
+        if self.on_change: self.on_change()
+
+    def _invalidate(self, index):
+        # a cached node implies cached children, so the walk stops at the first uncached item
+        item = self.tree.itemFromIndex(index) if index.isValid() else None
+        while item is not None and self._nodes.pop(item, None) is not None:
+            item = item.parent()
+        if item is None: self._nodes.pop(self.tree.invisibleRootItem(), None)
+        if self.on_change: self.on_change()
+
+    def node(self, item):
+        n = self._nodes.get(item)
+        if n is None:
+            if item is self.tree.invisibleRootItem():
+                kind, key, value, data = NodeKind.ROOT, "", "", None
+            else:
+                d = item.data(0, Qt.UserRole+1)
+                kind, key, value, data = (node_kind(item), item.data(0, Qt.UserRole) or item.text(0),
+                                          item.text(1), dict(d) if isinstance(d, dict) else None)
+                if data is None and kind in COMMAND_KINDS: data = item_fields(item)
+            n = Node(kind, key, value, data, tuple(self.node(item.child(i)) for i in range(item.childCount())))
+            self._nodes[item] = n
+        return n
+
+    def snapshot(self):
+        return self.node(self.tree.invisibleRootItem())
+
+    def prime(self, pairs):
+        """Seed the cache with (item, node) pairs for items just built from those nodes."""
+        for item, node in pairs: self._nodes[item] = node
+
+
+# ── Variables ────────────────────────────────────────────────────────────────
+class VariablesWindow(QWidget):
+    """Find usages for `set` variables; refreshed from the document snapshot while shown."""
+    def __init__(self, editor):
+        super().__init__()
+        self.editor = editor
+        self.setWindowTitle("Variables"); self.resize(640, 560)
+        self.index = variables.VariableIndex()
+        lay = QVBoxLayout(self); lay.setContentsMargins(8, 8, 8, 8); lay.setSpacing(6)
+        self.filter = QLineEdit(); self.filter.setPlaceholderText("filter variables")
+        self.filter.textChanged.connect(self._fill); lay.addWidget(self.filter)
+        self.view = QTreeWidget(); self.view.setHeaderLabels(["variable", "set", "read", ""])
+        self.view.setColumnWidth(0, 260)
+        self.view.itemExpanded.connect(self._expand); self.view.itemDoubleClicked.connect(self._goto)
+        lay.addWidget(self.view)
+        self.status = QLabel(); self.status.setObjectName("lbl_field"); lay.addWidget(self.status)
+        self._timer = QTimer(self); self._timer.setInterval(400); self._timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event); self._timer.start(); self.refresh()
+
+    def hideEvent(self, event):
+        super().hideEvent(event); self._timer.stop()
+
+    def show_var(self, name):
+        self.filter.setText(name); self.refresh()
+        for i in range(self.view.topLevelItemCount()):
+            it = self.view.topLevelItem(i)
+            if it.text(0) == name: it.setExpanded(True); self.view.setCurrentItem(it)
+
+    def refresh(self):
+        if self.index.update(self.editor.mirror.snapshot()): self._fill()
+
+    def _fill(self):
+        vs = self.index.vars; flt = self.filter.text().strip().lower()
+        open_vars = {self.view.topLevelItem(i).text(0) for i in range(self.view.topLevelItemCount())
+                     if self.view.topLevelItem(i).isExpanded()}
+        self.view.setUpdatesEnabled(False); self.view.clear()
+        for name in sorted(v for v in vs if flt in v.lower()):
+            defs, uses = vs[name]
+            note = "never read" if not uses else "never set" if not defs else ""
+            it = QTreeWidgetItem([name, str(len(defs)), str(len(uses)), note])
+            if note: it.setForeground(3, QColor("#e07070"))
+            it.setChildIndicatorPolicy(QTreeWidgetItem.ShowIndicator)
+            self.view.addTopLevelItem(it)
+            if name in open_vars: it.setExpanded(True)
+        self.view.setUpdatesEnabled(True)
+        unused, never_set = variables.report(vs)
+        self.status.setText(f"{len(vs)} variable(s) · {len(unused)} never read · {len(never_set)} never set")
+
+    def _expand(self, it):
+        if it.parent() is not None or it.childCount(): return
+        defs, uses = self.index.vars.get(it.text(0), ([], []))
+        for role, sites in (("set", defs), ("read", uses)):
+            for sid, path in sites:
+                ch = QTreeWidgetItem([f"{role}  {sid}#{'.'.join(map(str, path))}"])
+                ch.setData(0, Qt.UserRole, (sid, path)); it.addChild(ch)
+
+    def _goto(self, it, _):
+        site = it.data(0, Qt.UserRole)
+        if site: self.editor.goto_seq_path(*site)
+
+
+# ── Navigator ────────────────────────────────────────────────────────────────
+class Navigator(QWidget):
+    """Ctrl+P popup: fuzzy search over sequence ids, titles and dialogue lines."""
+    def __init__(self, editor):
+        super().__init__(editor, Qt.Popup)
+        self.editor = editor
+        self.index = NavigatorIndex(); self._busy = self._pending = False
+        # kept current after edits, so opening the popup rarely has anything to index
+        self._timer = QTimer(self); self._timer.setSingleShot(True); self._timer.setInterval(NAV_REINDEX_MS)
+        self._timer.timeout.connect(self._reindex)
+        lay = QVBoxLayout(self); lay.setContentsMargins(6, 6, 6, 6); lay.setSpacing(4)
+        self.inp = QLineEdit(); self.inp.setFont(INPUT_FONT); self.inp.setPlaceholderText("go to sequence or line…")
+        self.inp.textChanged.connect(self._search); self.inp.returnPressed.connect(self._go)
+        self.inp.installEventFilter(self); lay.addWidget(self.inp)
+        self.results = QListWidget(); self.results.setFont(INPUT_FONT)
+        self.results.itemActivated.connect(lambda _: self._go()); lay.addWidget(self.results)
+        self.status = QLabel(); self.status.setObjectName("lbl_field"); lay.addWidget(self.status)
+        self.resize(640, 420)
+
+    def popup(self):
+        g = self.editor.geometry()
+        self.move(self.editor.mapToGlobal(self.editor.rect().topLeft()) + QPoint((g.width() - self.width()) // 2, 60))
+        self.show(); self.inp.setFocus(); self.inp.selectAll()
+        self._reindex()
+
+    def schedule(self):
+        self._timer.start()
+
+    def _reindex(self):
+        # incremental: only sequences whose snapshot node changed are re-indexed
+        if self._busy: self._pending = True; return
+        snap = self.editor.mirror.snapshot()
+        if snap is self.index._root: self._search(); return
+        self._busy = True
+        if self.isVisible(): self.status.setText("indexing…")
+        run_in_background(lambda: self.index.update(snap), self._indexed)
+
+    def _indexed(self, _, error):
+        self._busy = False
+        if error is not None: self.status.setText(f"indexing failed: {error}"); return
+        if self._pending: self._pending = False; self._reindex()
+        else: self._search()
+
+    def _search(self):
+        if self._busy or not self.isVisible(): return
+        t = time.perf_counter(); hits = self.index.search(self.inp.text())
+        ms = (time.perf_counter() - t) * 1000
+        self.results.setUpdatesEnabled(False); self.results.clear()
+        for _, sid, path, kind, text in hits:
+            it = QListWidgetItem(f"{sid}  ·  {text}" if kind != "sequence" else text)
+            it.setForeground(QColor(color("sequences" if kind == "sequence" else kind)))
+            it.setData(Qt.UserRole, (sid, path)); self.results.addItem(it)
+        if hits: self.results.setCurrentRow(0)
+        self.results.setUpdatesEnabled(True)
+        self.status.setText(f"{len(hits)} result(s) · {ms:.1f} ms" if self.inp.text().strip() else "")
+
+    def _go(self):
+        it = self.results.currentItem()
+        if it is None: return
+        self.hide(); self.editor.goto_seq_path(*it.data(Qt.UserRole))
+
+    def eventFilter(self, obj, event):
+        if obj is self.inp and event.type() == QEvent.KeyPress and event.key() in (Qt.Key_Down, Qt.Key_Up):
+            row = self.results.currentRow() + (1 if event.key() == Qt.Key_Down else -1)
+            if 0 <= row < self.results.count(): self.results.setCurrentRow(row)
+            return True
+        return super().eventFilter(obj, event)
+
+
+# ── Documents ────────────────────────────────────────────────────────────────
+class Document:
+    """One script in its own tab: tree, mirror, undo stack and hot-reload state.
+
+    An evicted document has no tree; its snapshot, view state and reload
+    baseline sit in a swap file until the tab is shown again.
+    """
+    def __init__(self, page):
+        self.page = page                     # tab page the tree lives in
+        self.tree = self.mirror = self.swap = None
+        self.path, self.disk_seqs, self.baseline = None, {}, {}
+        self.source = None                   # legacy file it was converted from; not watched
+        self.saving = self.stale = self.evicting = False
+        self.items = 0                       # node count, measured when the tab is left
+        self.last_used = 0.0
+        self.undo_stack = QUndoStack(page)
+
+    @property
+    def title(self):
+        path = self.path or self.source
+        return os.path.basename(path) if path else "untitled"
+
 
 # ── Main Window ──────────────────────────────────────────────────────────────
 class DialogueTreeEditor(QWidget):
+    tree       = property(lambda self: self.doc.tree)
+    mirror     = property(lambda self: self.doc.mirror)
+    undo_stack = property(lambda self: self.doc.undo_stack)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("VN Editor")
         self.resize(1400, 820)
+        self.settings = load_settings()
+        self.assets = AssetIndex(self.settings.get("asset_root", ""))
+        self._assets_scanning = False
+        self.docs, self.doc, self._swap_dir = [], None, None
+        self.flowchart = self.find_window = self.variables_window = self.navigator = self.spelling_window = None
+        self.diagnostics_window = None
+        self.completion = CompletionIndex()
+        self.completion.set_source("emotion", "builtin", EMOTIONS)
+        self.completion.set_source("animation", "builtin", ANIMATIONS)
+        self._completion_timer = QTimer(self); self._completion_timer.setSingleShot(True)
+        self._completion_timer.setInterval(COMPLETION_DELAY_MS)
+        self._completion_timer.timeout.connect(self.refresh_completion)
+        self.spell = spellcheck.Checker(self._load_word_lists())
+        try: commands.load_schema()
+        except Exception as e: QMessageBox.warning(self, "Command schema", f"{commands.SCHEMA_FILE}: {e}")
         self._build()
+        self.watcher = QFileSystemWatcher(self); self.watcher.fileChanged.connect(self._on_file_changed)
+        self._reload_timer = QTimer(self); self._reload_timer.setSingleShot(True); self._reload_timer.setInterval(300)
+        self._reload_timer.timeout.connect(self._reload_from_disk)
+        chars = self.panel.characters
+        for sig in (chars.modelReset, chars.rowsInserted, chars.rowsRemoved, chars.dataChanged):
+            sig.connect(self._roster_changed)
         self.panel.autoload_chars()
+        self._asset_timer = QTimer(self); self._asset_timer.setInterval(ASSET_RESCAN_MS)
+        self._asset_timer.timeout.connect(self._scan_assets); self._asset_timer.start()
+        self._scan_assets()
 
     def _build(self):
         root_lay = QHBoxLayout(self); root_lay.setContentsMargins(4,4,4,4)
@@ -594,6 +1095,25 @@ class DialogueTreeEditor(QWidget):
         self.panel = RightPanel(self)
         self.panel.import_btn.clicked.connect(self._import)
         self.panel.export_btn.clicked.connect(self._export)
+        self.panel.tools_menu.addAction("Export runtime bundle…", self._export_bundle)
+        self.panel.tools_menu.addAction("Export slice…",          self._export_slice)
+        self.panel.tools_menu.addAction("Export routes…",         self._export_routes)
+        self.panel.tools_menu.addAction("Extract strings…",       self._extract_strings)
+        self.panel.tools_menu.addAction("Validate dialogue",      self._validate_dialogue)
+        self.panel.tools_menu.addAction("Flowchart",              self._show_flowchart)
+        self.panel.tools_menu.addAction("Find and replace…",      self._show_find_replace)
+        self.panel.tools_menu.addAction("Variables",              self._show_variables)
+        self.panel.tools_menu.addAction("Spelling and style",     self._show_spelling)
+        self.panel.tools_menu.addAction("Word lists…",            self._set_word_lists)
+        self.panel.tools_menu.addSeparator()
+        self.panel.tools_menu.addAction("Copy sequences to tab…", self._copy_to_tab)
+        self.panel.tools_menu.addAction("Memory budget…",         self._set_memory_budget)
+        self.panel.tools_menu.addAction("Memory diagnostics",     self._show_diagnostics)
+        a = self.panel.tools_menu.addAction("Verify exports");    a.setCheckable(True)
+        a.setChecked(self.settings.get("verify_export", False)); a.toggled.connect(self._set_verify_export)
+        self.panel.tools_menu.addSeparator()
+        self.panel.tools_menu.addAction("Set asset folder…",      self._set_asset_root)
+        self.panel.tools_menu.addAction("Asset report",           self._asset_report)
 
         left = QWidget(); ll = QVBoxLayout(left); ll.setContentsMargins(6,6,6,6); ll.setSpacing(6)
         hdr = QLabel("✦  VN EDITOR"); hdr.setObjectName("lbl_header"); hdr.setFont(TREE_FONT)
@@ -605,21 +1125,176 @@ class DialogueTreeEditor(QWidget):
         row.addWidget(self.panel.import_btn)
         row.addWidget(self.panel.export_btn)
         row.addWidget(self.panel.chars_btn)
+        row.addWidget(self.panel.tools_btn)
         row.addStretch(); ll.addLayout(row)
 
-        self.tree = VNTreeWidget()
-        self.tree.setFont(TREE_FONT); self.tree.setHeaderLabels(["key","value"])
-        self.tree.setColumnWidth(0, 220); self.tree.header().setFont(TREE_FONT)
-        self.tree.setDragEnabled(True); self.tree.setAcceptDrops(True)
-        self.tree.setDragDropMode(QTreeWidget.InternalMove)
-        self.tree.itemClicked.connect(self._on_click)
-        self.tree.itemSelectionChanged.connect(self._on_sel)
-        ll.addWidget(self.tree); self.splitter.addWidget(left)
+        self.tabs = QTabWidget(); self.tabs.setDocumentMode(True)
+        self.tabs.setTabsClosable(True); self.tabs.setMovable(True)
+        self.tabs.currentChanged.connect(self._tab_changed)
+        self.tabs.tabCloseRequested.connect(self._close_tab)
+        b_tab = QPushButton("+"); b_tab.setFont(BTN_FONT); b_tab.setToolTip("New tab (Ctrl+T)")
+        b_tab.clicked.connect(self.new_document); self.tabs.setCornerWidget(b_tab)
+        self.new_document()
+        ll.addWidget(self.tabs); self.splitter.addWidget(left)
 
         scroll.setWidget(self.panel); self.splitter.addWidget(scroll)
         self.splitter.setStretchFactor(0, 1); self.splitter.setStretchFactor(1, 0)
         self.splitter.setCollapsible(0, False); self.splitter.setCollapsible(1, False)
 
+    # ── documents ────────────────────────────────────────────────────────────
+
+    def _new_tree(self):
+        tree = VNTreeWidget()
+        tree.setFont(TREE_FONT); tree.setHeaderLabels(["key","value"])
+        tree.setColumnWidth(0, 220); tree.header().setFont(TREE_FONT)
+        tree.setDragEnabled(True); tree.setAcceptDrops(True)
+        tree.setDragDropMode(QTreeWidget.InternalMove)
+        tree.setSelectionMode(QTreeWidget.ExtendedSelection)
+        tree.itemClicked.connect(self._on_click)
+        tree.itemSelectionChanged.connect(self._on_sel)
+        return tree
+
+    def _attach_tree(self, doc, tree):
+        doc.tree, doc.mirror = tree, DocumentMirror(tree, self._tree_changed)
+        doc.page.layout().addWidget(tree)
+
+    def new_document(self):
+        page = QWidget(); QVBoxLayout(page).setContentsMargins(0, 0, 0, 0)
+        doc = Document(page); self._attach_tree(doc, self._new_tree())
+        self.docs.append(doc)
+        self.tabs.setCurrentIndex(self.tabs.addTab(page, doc.title))
+        return doc
+
+    def _doc_of(self, page):
+        return next((d for d in self.docs if d.page is page), None)
+
+    def _is_empty(self, doc):
+        return doc.path is None and doc.tree is not None and doc.tree.topLevelItemCount() == 0
+
+    def _tree_changed(self):
+        self._completion_timer.start()
+        if self.navigator is not None: self.navigator.schedule()
+
+    def _tab_changed(self, index):
+        doc = self._doc_of(self.tabs.widget(index))
+        if doc is None or doc is self.doc: return
+        prev, self.doc = self.doc, doc
+        if prev is not None and prev.tree is not None: prev.items = prev.mirror.snapshot().size()
+        doc.last_used = time.monotonic()
+        if doc.tree is None: self._restore(doc)
+        sel = self.tree.selectedItems()
+        if sel: self._on_click(sel[0], 0)
+        else: self.panel.stack.setCurrentIndex(0)
+        if doc.stale: self._reload_timer.start()
+        self._tree_changed()
+        self._enforce_budget()
+
+    def _close_tab(self, index):
+        doc = self._doc_of(self.tabs.widget(index))
+        if self._is_modified(doc) and QMessageBox.question(self, "Close tab",
+                f"{doc.title} has changes that were not exported. Close it anyway?") != QMessageBox.Yes:
+            return
+        self.docs.remove(doc)
+        if doc.swap: os.remove(doc.swap)
+        if doc.path and not any(d.path == doc.path for d in self.docs): self.watcher.removePath(doc.path)
+        if doc is self.doc: self.doc = None
+        if not self.docs: self.new_document()
+        # the page's children go in no particular order; rows removed while the tree is torn
+        # down must not reach the mirror's handlers
+        if doc.tree is not None: doc.tree.model().blockSignals(True)
+        self.tabs.removeTab(self.tabs.indexOf(doc.page)); doc.page.deleteLater()
+        self._tab_changed(self.tabs.currentIndex())
+
+    def _is_modified(self, doc):
+        if doc.tree is not None: root, baseline = doc.mirror.snapshot(), doc.baseline
+        else: state = snapshot.read_swap(doc.swap); root, baseline = state["root"], state["baseline"]
+        return snapshot.build_sequences(root) != baseline
+
+    def _enforce_budget(self):
+        """Evict the least recently used inactive documents until the loaded ones fit the budget."""
+        budget = self.settings.get("memory_budget_mb", MEMORY_BUDGET_MB) * 1_000_000
+        live = [d for d in self.docs if d.tree is not None and not d.evicting]
+        used = sum(d.items for d in live) * ITEM_BYTES
+        for d in sorted((d for d in live if d is not self.doc and not d.saving), key=lambda d: d.last_used):
+            if used <= budget: break
+            self._evict(d); used -= d.items * ITEM_BYTES
+
+    def _evict(self, doc):
+        # the snapshot is immutable, so the swap file is written on a worker thread
+        tree, stamp = doc.tree, doc.last_used
+        cur = tree.currentItem()
+        state = {"root": doc.mirror.snapshot(), "expanded": expanded_paths(tree.invisibleRootItem()),
+                 "current": self._item_path(cur) if cur else None, "scroll": tree.verticalScrollBar().value(),
+                 "disk": doc.disk_seqs, "baseline": doc.baseline}
+        if self._swap_dir is None: self._swap_dir = tempfile.mkdtemp(prefix="vn-editor-")
+        path = os.path.join(self._swap_dir, f"{id(doc):x}.swap.gz")
+        doc.evicting = True
+
+        def done(_, error):
+            doc.evicting = False
+            if error is not None or doc not in self.docs or doc is self.doc or doc.last_used != stamp:
+                if os.path.exists(path): os.remove(path)
+                return
+            tree.blockSignals(True); tree.setParent(None); tree.deleteLater()
+            doc.tree = doc.mirror = None; doc.disk_seqs = doc.baseline = None; doc.swap = path
+            self.tabs.setTabToolTip(self.tabs.indexOf(doc.page), f"{doc.path or doc.title} (swapped out)")
+
+        run_in_background(lambda: snapshot.write_swap(path, state), done)
+
+    def _restore(self, doc):
+        state = snapshot.read_swap(doc.swap)
+        tree = self._new_tree(); tree.setUpdatesEnabled(False)
+        expanded, expand, pairs = state["expanded"], [], []
+
+        def build(node, path):
+            if node.kind == NodeKind.SEQ: item = self._make_seq_node(dict(node.data))
+            else:
+                item = make_item(node.key, node.value, node.key, node.kind)
+                if node.kind in COMMAND_KINDS:
+                    item.setData(0, FIELDS_ROLE, dict(node.data)); item.setFlags(CMD_FLAGS)
+            item.addChildren([build(ch, path + (i,)) for i, ch in enumerate(node.children)])
+            if expanded.get(path): expand.append(item)
+            pairs.append((item, node))
+            return item
+
+        root = state["root"]
+        tree.addTopLevelItems([build(sn, (i,)) for i, sn in enumerate(root.children)])
+        for item in expand: item.setExpanded(True)
+        self._attach_tree(doc, tree)
+        doc.mirror.prime(pairs + [(doc.mirror.root, root)])
+        doc.disk_seqs, doc.baseline = state["disk"], state["baseline"]
+        os.remove(doc.swap); doc.swap = None
+        doc.undo_stack.clear()
+        cur = self._item_at(state["current"]) if state["current"] else None
+        if cur is not None: tree.setCurrentItem(cur)
+        tree.setUpdatesEnabled(True)
+        QTimer.singleShot(0, lambda: tree.verticalScrollBar().setValue(state["scroll"]))
+        self.tabs.setTabToolTip(self.tabs.indexOf(doc.page), doc.path or "")
+
+    def _set_memory_budget(self):
+        mb, ok = QInputDialog.getInt(self, "Memory budget", "Megabytes for the open documents\n"
+                                     "(inactive tabs beyond it are swapped out to disk):",
+                                     self.settings.get("memory_budget_mb", MEMORY_BUDGET_MB), 16, 1 << 20, 64)
+        if not ok: return
+        self.settings["memory_budget_mb"] = mb; save_settings(self.settings)
+        self._enforce_budget()
+
+    def _copy_to_tab(self):
+        ids = self._selected_seq_ids()
+        others = [d for d in self.docs if d is not self.doc]
+        if not ids or not others:
+            QMessageBox.information(self, "Copy sequences", "Select sequences and open a second tab first."); return
+        labels = [f"{i + 1}: {d.title}" for i, d in enumerate(others)]
+        label, ok = QInputDialog.getItem(self, "Copy sequences", "Copy to:", labels, 0, False)
+        if not ok: return
+        nodes = self._seq_nodes(); data = [(sid, self._seq_dict(nodes[sid])) for sid in ids]
+        self.tabs.setCurrentWidget(others[labels.index(label)].page)
+        taken = set(self._seq_nodes())
+        for sid, sd in data:
+            new_id, n = sid, 2
+            while new_id in taken: new_id, n = f"{sid}_{n}", n + 1
+            taken.add(new_id); self._add_seq_from_data(new_id, sd)
+
     def resizeEvent(self, event):
         super().resizeEvent(event)
         total = self.splitter.width()
@@ -629,11 +1304,23 @@ class DialogueTreeEditor(QWidget):
 
     # ── node factories ───────────────────────────────────────────────────────
 
-    def _make_cmd_node(self, cmd, value=""):
-        item = make_item(cmd, value, cmd)
-        item.setFlags(item.flags() | Qt.ItemIsDragEnabled | Qt.ItemIsSelectable | Qt.ItemIsEnabled)
+    def _make_cmd_node(self, cmd, value="", fields=None):
+        if fields is None: fields = commands.parse_display(cmd, value)
+        item = make_item(cmd, commands.display(cmd, fields), cmd)
+        item.setData(0, FIELDS_ROLE, fields)
+        item.setFlags(CMD_FLAGS)
         return item
 
+    def set_cmd_fields(self, item, fields):
+        key = item.data(0, Qt.UserRole) or item.text(0)
+        item.setData(0, FIELDS_ROLE, fields); item.setText(1, commands.display(key, fields))
+
+    def item_fields(self, item):
+        return item_fields(item)
+
+    def set_cmd_text(self, item, text):
+        self.set_cmd_fields(item, commands.parse_display(item.data(0, Qt.UserRole) or item.text(0), text))
+
     def _make_seq_node(self, d):
         item = QTreeWidgetItem([d["id"], d["title"]])
         item.setFont(0, TREE_FONT); item.setFont(1, TREE_FONT)
@@ -641,6 +1328,7 @@ class DialogueTreeEditor(QWidget):
         item.setForeground(1, QColor("#7090a0"))
         item.setData(0, Qt.UserRole, "__seq__")
         item.setData(0, Qt.UserRole+1, d)
+        item.setData(0, KIND_ROLE, int(NodeKind.SEQ))
         item.setFlags(item.flags() | Qt.ItemIsSelectable | Qt.ItemIsEnabled)
         return item
 
@@ -660,6 +1348,69 @@ class DialogueTreeEditor(QWidget):
             cur = cur.parent()
         return None
 
+    def reveal(self, item):
+        p = item.parent()
+        while p is not None: p.setExpanded(True); p = p.parent()
+        self.tree.clearSelection(); self.tree.setCurrentItem(item)
+        self.tree.scrollToItem(item, QTreeWidget.PositionAtCenter)
+
+    def goto_seq_path(self, seq_id, path):
+        item = self._seq_nodes().get(seq_id)
+        if item is None: return
+        for i in path:
+            if not 0 <= i < item.childCount(): break
+            item = item.child(i)
+        self.reveal(item); self.activateWindow()
+
+    def _show_flowchart(self):
+        if self.flowchart is None: self.flowchart = FlowchartWindow(self)
+        self.flowchart.show(); self.flowchart.raise_()
+
+    def _show_variables(self, name=None):
+        if self.variables_window is None: self.variables_window = VariablesWindow(self)
+        self.variables_window.show(); self.variables_window.raise_()
+        if name: self.variables_window.show_var(name)
+
+    def _show_spelling(self):
+        if self.spelling_window is None: self.spelling_window = SpellingWindow(self)
+        self.spelling_window.show(); self.spelling_window.raise_()
+
+    def _set_verify_export(self, on):
+        self.settings["verify_export"] = on; save_settings(self.settings)
+
+    def _show_diagnostics(self):
+        if self.diagnostics_window is None: self.diagnostics_window = DiagnosticsWindow(self)
+        self.diagnostics_window.show(); self.diagnostics_window.raise_()
+
+    def _load_word_lists(self):
+        paths = [p for p in self.settings.get("word_lists", []) if os.path.exists(p)]
+        try: return spellcheck.load_words(paths)
+        except (OSError, UnicodeDecodeError) as e:
+            QMessageBox.warning(self, "Word lists", str(e)); return set()
+
+    def _set_word_lists(self):
+        paths, _ = QFileDialog.getOpenFileNames(self, "Word lists (one word per line)", "", "Text files (*.txt *.dic);;All files (*)")
+        if not paths: return
+        self.settings["word_lists"] = paths; save_settings(self.settings)
+        self.spell = spellcheck.Checker(self._load_word_lists(), self.panel.characters.names())
+
+    def _roster_changed(self, *_):
+        names = self.panel.characters.names()
+        self.completion.set_source("character", "roster", names)
+        self.spell = self.spell.with_names(names)
+
+    def refresh_completion(self):
+        # incremental: only sequences whose snapshot node changed are recounted
+        if self.doc is not None and self.doc.tree is not None: self.completion.update(self.mirror.snapshot())
+
+    def _show_navigator(self):
+        if self.navigator is None: self.navigator = Navigator(self)
+        self.navigator.popup()
+
+    def _show_find_replace(self):
+        if self.find_window is None: self.find_window = FindReplaceWindow(self)
+        self.find_window.show(); self.find_window.raise_(); self.find_window.activateWindow()
+
     def _cur(self):
         sel = self.tree.selectedItems(); return sel[0] if sel else None
 
@@ -685,13 +1436,27 @@ class DialogueTreeEditor(QWidget):
             self.panel.show_add_cmd(target_seq=item)
             return
 
-        if key in CMDS or key == "option" or key == "choice":
+        if key in commands.REGISTRY or node_kind(item) == NodeKind.CMD:
             self.panel.show_cmd(item)
 
     def _on_sel(self):
         sel = self.tree.selectedItems()
         if sel: self._on_click(sel[0], 0)
 
+    def speaker_of(self, item):
+        """Name from the closest `char` command before item, looking into enclosing sequences too."""
+        while item is not None:
+            parent = item.parent() or self.tree.invisibleRootItem()
+            for i in range(parent.indexOfChild(item) - 1, -1, -1):
+                if parent.child(i).data(0, Qt.UserRole) == "char": return parent.child(i).text(1)
+            item = item.parent()
+        return None
+
+    def seq_chars_of(self, item):
+        seq = self._seq_of(item) if item else None
+        d = (seq.data(0, Qt.UserRole+1) or {}) if seq else {}
+        return [p.split(":", 1)[0].strip() for p in d.get("chars", "").split(",") if ":" in p]
+
     # ── seq metadata ─────────────────────────────────────────────────────────
 
     def _refresh_seq_children(self, seq_node, d):
@@ -703,13 +1468,13 @@ class DialogueTreeEditor(QWidget):
         inserts = []
         if d["title"]: inserts.append(make_item("title",       d["title"]))
         if d["desc"]:  inserts.append(make_item("description", d["desc"]))
-        if d["bg"]:    inserts.append(make_item("background",  d["bg"]))
+        if d["bg"]:    inserts.append(make_item("background",  d["bg"], kind=NodeKind.HEADER_BG))
         if d["chars"]:
             cn = make_item("characters", "")
             for part in d["chars"].split(","):
                 if ":" in part:
                     k, v = part.split(":", 1)
-                    cn.addChild(make_item(k.strip(), v.strip()))
+                    cn.addChild(make_item(k.strip(), v.strip(), kind=NodeKind.CHAR_ENTRY))
             cn.setExpanded(True)
             inserts.append(cn)
         for i, node in enumerate(inserts):
@@ -753,20 +1518,19 @@ class DialogueTreeEditor(QWidget):
         parent.insertChild(parent.indexOfChild(cur) + 1, new_node)
 
     def _add_option_to_choice(self, choice_node, label):
-        opt = self._make_cmd_node("option", f'"{label}"')
+        opt = self._make_cmd_node("option", fields={"text": label})
         sn = self._make_seq_container()
         opt.addChild(sn); opt.setExpanded(True); choice_node.addChild(opt)
 
     def _add_cmd(self):
         cmd = self.panel.cmd_combo.currentText()
-        value = self.panel.get_cmd_value()
 
         if cmd == "choice":
             node = self._make_cmd_node("choice", "")
             num = self.panel.get_num_options()
             for i in range(num): self._add_option_to_choice(node, f"Option {i+1}")
         else:
-            node = self._make_cmd_node(cmd, value)
+            node = self._make_cmd_node(cmd, fields=self.panel.get_fields(cmd))
 
         cur = self._cur()
         inserted = False
@@ -812,12 +1576,12 @@ class DialogueTreeEditor(QWidget):
         self.tree.setCurrentItem(node)
         self.panel.show_cmd(node)
 
-    def _add_cmd_with_value(self, value):
+    def _add_cmd_with_value(self, fields):
         cur = self._cur()
         if not cur or (not self._seq_of(cur) and not self._is_seq(cur) and not is_seq_container(cur)):
             return
         cmd  = self.panel.cmd_combo.currentText()
-        node = self._make_cmd_node(cmd, value)
+        node = self._make_cmd_node(cmd, fields=fields)
         self._insert_after(node)
         self.tree.setCurrentItem(node); self.panel.show_cmd(node)
 
@@ -830,117 +1594,321 @@ class DialogueTreeEditor(QWidget):
         (parent or self.tree.invisibleRootItem()).removeChild(item)
         self.panel.show_add_cmd()
 
+    # ── assets ───────────────────────────────────────────────────────────────
+
+    def _scan_assets(self):
+        if self._assets_scanning or not self.assets.root: return
+        self._assets_scanning = True
+        run_in_background(self.assets.scan, self._on_assets_scanned)
+
+    def _on_assets_scanned(self, changed, error):
+        self._assets_scanning = False
+        if changed: self.panel.set_asset_names(self.assets)
+
+    def _set_asset_root(self):
+        path = QFileDialog.getExistingDirectory(self, "Asset folder", self.assets.root)
+        if not path: return
+        self.settings["asset_root"] = path; save_settings(self.settings)
+        self.assets.set_root(path); self.panel.set_asset_names(self.assets)
+        self._scan_assets()
+
+    def _asset_report(self):
+        if not self.assets.root:
+            QMessageBox.warning(self, "Assets", "Set the asset folder first (Tools → Set asset folder…)."); return
+        self._on_snapshot(lambda snap: asset_report(self.assets, reference_index(snapshot.build_sequences(snap))),
+                          self._show_asset_report)
+
+    def _show_asset_report(self, result):
+        missing, unused = result
+        lines = []
+        for kind in ASSET_KINDS:
+            for name, ids in sorted(missing[kind].items()):
+                lines.append(f"missing {kind} '{name}' ({len(ids)}×, first at {ids[0]})")
+        for kind in ASSET_KINDS:
+            if unused[kind]: lines.append(f"unused {kind}: {', '.join(unused[kind][:20])}"
+                                          + (" …" if len(unused[kind]) > 20 else ""))
+        if not lines:
+            QMessageBox.information(self, "Assets", "All referenced assets exist and every asset is used."); return
+        QMessageBox.warning(self, "Assets", "\n".join(lines[:60]) + (f"\n… {len(lines) - 60} more" if len(lines) > 60 else ""))
+
     # ── import ───────────────────────────────────────────────────────────────
 
     def _import(self):
-        path, _ = QFileDialog.getOpenFileName(self, "Import YAML", "", "YAML Files (*.yaml *.yml)")
+        path, _ = QFileDialog.getOpenFileName(self, "Import YAML", "", IMPORT_FILTER)
         if not path: return
-        try:
-            with open(path, "r", encoding="utf-8") as f: data = yaml.safe_load(f)
-            self.tree.clear()
-            for seq_id, sd in data.get("sequences", {}).items():
-                chars_raw = sd.get("characters", {})
-                chars_str = ", ".join(f"{k}: {v}" for k,v in chars_raw.items()) if isinstance(chars_raw, dict) else ""
-                d = {"id": seq_id, "title": sd.get("title",""), "desc": sd.get("description",""),
-                     "bg": sd.get("background",""), "chars": chars_str}
-                node = self._make_seq_node(d)
-                self.tree.invisibleRootItem().addChild(node)
-                self._refresh_seq_children(node, d)
-                sc = self._make_seq_container()
-                node.addChild(sc)
-                self._load_seq(sd.get("sequence", []), sc)
-                sc.setExpanded(True); node.setExpanded(True)
+        open_doc = next((d for d in self.docs if path in (d.path, d.source)), None)
+        if open_doc is not None and open_doc is not self.doc: self.tabs.setCurrentWidget(open_doc.page); return
+        if open_doc is None and not self._is_empty(self.doc): self.new_document()
+        try: self.load_file(path)
         except Exception as e: QMessageBox.critical(self, "Error", str(e))
 
+    def load_file(self, path):
+        if path.lower().endswith(importers.IMPORT_SUFFIXES): return self._load_legacy(path)
+        seqs = load_script(path).get("sequences") or {}
+        self.tree.clear()
+        for seq_id, sd in seqs.items(): self._add_seq_from_data(seq_id, sd)
+        self._watch(path, seqs, self._collect_sequences())
+        self.doc.items = self.mirror.snapshot().size()
+        self._enforce_budget()
+
+    def _load_legacy(self, path):
+        # streamed in one sequence at a time; with an empty baseline the tab counts as unsaved until exported
+        warnings = []
+        self.tree.clear()
+        for seq_id, sd in importers.read_legacy(path, warnings): self._add_seq_from_data(seq_id, sd)
+        self.doc.source = path
+        i = self.tabs.indexOf(self.doc.page); self.tabs.setTabText(i, self.doc.title); self.tabs.setTabToolTip(i, path)
+        self.doc.items = self.mirror.snapshot().size()
+        self._enforce_budget()
+        if warnings:
+            QMessageBox.information(self, "Import", f"{len(warnings)} statement(s) were not converted exactly:\n"
+                                    + "\n".join(warnings[:30]) + (f"\n… {len(warnings) - 30} more" if len(warnings) > 30 else ""))
+
+    def _add_seq_from_data(self, seq_id, sd, index=None):
+        sd = sd or {}
+        chars_raw = sd.get("characters", {})
+        chars_str = ", ".join(f"{k}: {v}" for k,v in chars_raw.items()) if isinstance(chars_raw, dict) else ""
+        d = {"id": seq_id, "title": sd.get("title",""), "desc": sd.get("description",""),
+             "bg": sd.get("background",""), "chars": chars_str}
+        node = self._make_seq_node(d)
+        root = self.tree.invisibleRootItem()
+        if index is None: root.addChild(node)
+        else: root.insertChild(index, node)
+        self._refresh_seq_children(node, d)
+        sc = self._make_seq_container()
+        node.addChild(sc)
+        self._load_seq(sd.get("sequence", []), sc)
+        sc.setExpanded(True); node.setExpanded(True)
+        return node
+
+    # ── hot reload ───────────────────────────────────────────────────────────
+
+    def _watch(self, path, seqs, baseline, doc=None):
+        # seqs: as parsed from disk; baseline: the same sequences as the tree exports them
+        doc = doc or self.doc; old = doc.path
+        doc.path, doc.disk_seqs, doc.baseline = path, seqs, baseline
+        if old and old != path and not any(d.path == old for d in self.docs): self.watcher.removePath(old)
+        if path not in self.watcher.files(): self.watcher.addPath(path)
+        i = self.tabs.indexOf(doc.page); self.tabs.setTabText(i, doc.title); self.tabs.setTabToolTip(i, path)
+
+    def _on_file_changed(self, path):
+        # other tabs are reloaded when they are shown again
+        for d in self.docs:
+            if d.path == path: d.stale = True
+        if path == self.doc.path: self._reload_timer.start()
+
+    def _reload_from_disk(self):
+        doc = self.doc; path = doc.path
+        if not doc.stale: return
+        doc.stale = False
+        if doc.saving or not path or not os.path.exists(path): return
+        if path not in self.watcher.files(): self.watcher.addPath(path)  # replaced by rename
+        try: new = load_script(path).get("sequences") or {}
+        except Exception: return  # half-written file; the next change event retries
+        old = doc.disk_seqs
+        changed = [k for k in new if k in old and new[k] != old[k]]
+        added   = [k for k in new if k not in old]
+        removed = [k for k in old if k not in new]
+        doc.disk_seqs = new
+        if not (changed or added or removed) and list(new) == list(old): return
+
+        nodes = self._seq_nodes()
+        conflicts = [k for k in changed + removed
+                     if k in nodes and self._seq_dict(nodes[k]) != doc.baseline.get(k)]
+        if conflicts and QMessageBox.question(self, "File changed on disk",
+                f"{os.path.basename(path)} changed on disk, but these sequences also have "
+                f"unsaved edits:\n\n{', '.join(conflicts)}\n\nReplace them with the version on disk?") != QMessageBox.Yes:
+            changed = [k for k in changed if k not in conflicts]
+            removed = [k for k in removed if k not in conflicts]
+        self._patch_sequences(new, changed, added, removed, nodes)
+
+    def _patch_sequences(self, new, changed, added, removed, nodes):
+        root = self.tree.invisibleRootItem()
+        state = self._view_state()
+        self.tree.setUpdatesEnabled(False); self.tree.blockSignals(True)
+        try:
+            for k in removed:
+                if k in nodes: root.removeChild(nodes.pop(k))
+            for k in changed:
+                if k not in nodes: added.append(k); continue
+                old = nodes[k]; idx = root.indexOfChild(old)
+                expanded = expanded_paths(old)
+                root.removeChild(old)
+                nodes[k] = self._add_seq_from_data(k, new[k], idx)
+                apply_expanded(nodes[k], expanded)
+            for k in added:
+                nodes[k] = self._add_seq_from_data(k, new[k])
+            order = [nodes[k] for k in new if k in nodes]
+            order += [root.child(i) for i in range(root.childCount()) if root.child(i) not in order]
+            if any(root.child(i) is not n for i, n in enumerate(order)):
+                expanded = [expanded_paths(n) for n in order]
+                root.takeChildren(); root.addChildren(order)
+                for n, e in zip(order, expanded): apply_expanded(n, e)
+        finally:
+            self.tree.blockSignals(False); self.tree.setUpdatesEnabled(True)
+        for k in removed: self.doc.baseline.pop(k, None)
+        for k in changed + added:
+            if k in nodes: self.doc.baseline[k] = self._seq_dict(nodes[k])
+        self._restore_view_state(state)
+
+    def _seq_nodes(self):
+        root = self.tree.invisibleRootItem(); out = {}
+        for i in range(root.childCount()):
+            sn = root.child(i)
+            if self._is_seq(sn): out[(sn.data(0, Qt.UserRole+1) or {}).get("id", sn.text(0))] = sn
+        return out
+
+    def _item_path(self, item):
+        path = []
+        while item is not None:
+            parent = item.parent() or item.treeWidget().invisibleRootItem()
+            path.append(parent.indexOfChild(item)); item = item.parent()
+        return tuple(reversed(path))
+
+    def _item_at(self, path):
+        item = self.tree.invisibleRootItem()
+        for i in path:
+            if not 0 <= i < item.childCount(): return None
+            item = item.child(i)
+        return item
+
+    def _view_state(self):
+        cur = self._cur()
+        return (cur, self._item_path(cur) if cur else None, self.tree.verticalScrollBar().value())
+
+    def _restore_view_state(self, state):
+        cur, path, scroll = state
+        if cur is not None and cur.treeWidget() is not self.tree:
+            item = self._item_at(path)
+            while item is None and path:
+                path = path[:-1]; item = self._item_at(path) if path else None
+            if item is not None: self.tree.setCurrentItem(item)
+            else: self.tree.clearSelection(); self.panel.stack.setCurrentIndex(0)
+        self.tree.verticalScrollBar().setValue(scroll)
+
     def _load_seq(self, seq, parent):
         for entry in seq:
             if not isinstance(entry, dict): continue
-            if "background" in entry and "fadeout" in entry:
-                parent.addChild(self._make_cmd_node("background",
-                    f"{entry['background']}, fadeout: {entry['fadeout']}")); continue
-            for key, val in entry.items():
+            for key, fields in commands.entry_commands(entry):
                 if key == "choice":
                     cn = self._make_cmd_node("choice", ""); parent.addChild(cn)
-                    for opt in (val or []):
-                        on = self._make_cmd_node("option", f'"{opt.get("option","")}"')
+                    for _, opt in choice_options(entry):
+                        on = self._make_cmd_node("option", fields=commands.from_entry("option", opt))
                         sn = self._make_seq_container()
                         on.addChild(sn)
                         self._load_seq(opt.get("sequence", []), sn)
                         sn.setExpanded(True); on.setExpanded(True); cn.addChild(on)
                     cn.setExpanded(True)
                 else:
-                    v = f'"{val}"' if key == "say" and val is not None else (str(val) if val is not None else "")
-                    parent.addChild(self._make_cmd_node(key, v))
+                    parent.addChild(self._make_cmd_node(key, fields=fields))
 
     # ── export ───────────────────────────────────────────────────────────────
 
     def _export(self):
-        path, _ = QFileDialog.getSaveFileName(self, "Export YAML", "", "YAML Files (*.yaml)")
+        path, flt = QFileDialog.getSaveFileName(self, "Export YAML", "", ";;".join(SCRIPT_SAVE_FILTERS))
         if not path: return
-        try:
-            sequences = {}; root = self.tree.invisibleRootItem()
-            for i in range(root.childCount()):
-                sn = root.child(i)
-                if not self._is_seq(sn): continue
-                d = sn.data(0, Qt.UserRole+1) or {}
-                seq_id = d.get("id", f"seq_{i}")
-                chars = {}
-                for part in d.get("chars","").split(","):
-                    if ":" in part:
-                        k, v = part.split(":", 1); chars[k.strip()] = v.strip()
-                sc = self._find_seq_container(sn)
-                sequences[seq_id] = {
-                    "title":       d.get("title",""),
-                    "description": d.get("desc",""),
-                    "background":  d.get("bg",""),
-                    "characters":  chars,
-                    "sequence":    self._build_seq(sc if sc else sn)
-                }
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(dump_yaml({"sequences": sequences}))
-            QMessageBox.information(self, "Exported", "File saved successfully.")
-        except Exception as e: QMessageBox.critical(self, "Error", str(e))
+        if not path.lower().endswith(SCRIPT_SUFFIXES): path += SCRIPT_SAVE_FILTERS.get(flt, ".yaml")
+
+        verify = self.settings.get("verify_export", False)
+
+        def work(snap):
+            sequences = snapshot.build_sequences(snap)
+            save_script(path, sequences, verify)
+            return sequences
+
+        doc = self.doc
+
+        def done(sequences):
+            doc.saving = False
+            if doc in self.docs: self._watch(path, sequences, sequences, doc)
+            QMessageBox.information(self, "Exported", "File saved and verified." if verify else "File saved successfully.")
+
+        doc.saving = True
+        self._on_snapshot(work, done, lambda: setattr(doc, "saving", False))
+
+    def _export_bundle(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export bundle", "", "VN Bundle (*.vnb)")
+        if not path: return
+        self._on_snapshot(lambda snap: write_bundle(snapshot.build_sequences(snap), path),
+                          lambda _: QMessageBox.information(self, "Exported", "Bundle saved successfully."))
+
+    def _selected_seq_ids(self):
+        seqs = dict.fromkeys(self._seq_of(it) for it in self.tree.selectedItems())
+        return [(s.data(0, Qt.UserRole+1) or {}).get("id", s.text(0)) for s in seqs if s is not None]
+
+    def _export_slice(self):
+        roots = self._selected_seq_ids()
+        if not roots:
+            QMessageBox.information(self, "Export slice", "Select the sequences the slice starts from."); return
+        path, flt = QFileDialog.getSaveFileName(self, "Export slice", "", ";;".join(SCRIPT_SAVE_FILTERS))
+        if not path: return
+        if not path.lower().endswith(SCRIPT_SUFFIXES): path += SCRIPT_SAVE_FILTERS.get(flt, ".yaml")
+        self._on_snapshot(lambda snap: slices.write_slice(snapshot.build_sequences(snap), roots, path),
+                          lambda res: QMessageBox.information(self, "Exported", f"{res[1]} sequence(s) written."))
+
+    def _export_routes(self):
+        roots = self._selected_seq_ids()
+        if not roots:
+            QMessageBox.information(self, "Export routes", "Select one sequence per route."); return
+        out = QFileDialog.getExistingDirectory(self, "Export routes to")
+        if not out: return
+        self._on_snapshot(lambda snap: slices.export_routes_of(snapshot.build_sequences(snap), roots, out),
+                          lambda res: QMessageBox.information(self, "Exported", f"{len(res)} route file(s) written."))
+
+    def _extract_strings(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Extract strings", "",
+                                              "Gettext PO (*.po);;CSV (*.csv)")
+        if not path: return
+        self._on_snapshot(lambda snap: l10n.extract(snapshot.build_sequences(snap).items(), path),
+                          lambda n: QMessageBox.information(self, "Extracted", f"{n} strings written."))
+
+    def _validate_dialogue(self):
+        chars = self.panel.get_chars()
+        self._on_snapshot(lambda snap: templates.validate_sequences(snapshot.build_sequences(snap), chars),
+                          self._show_validation)
+
+    def _show_validation(self, issues):
+        if not issues:
+            QMessageBox.information(self, "Validate", "No problems found."); return
+        lines = [f"{sid}: {msg}" for sid, msg in issues[:40]]
+        if len(issues) > 40: lines.append(f"… and {len(issues) - 40} more")
+        QMessageBox.warning(self, "Validate", f"{len(issues)} problem(s):\n\n" + "\n".join(lines))
+
+    def _on_snapshot(self, work, done, failed=None):
+        """Run work(snapshot) on a worker thread; editing continues meanwhile."""
+        snap = self.mirror.snapshot()
+
+        def finish(result, error):
+            if error is None: done(result); return
+            if failed: failed()
+            QMessageBox.critical(self, "Error", str(error))
+
+        run_in_background(lambda: work(snap), finish)
+
+    def _collect_sequences(self):
+        return snapshot.build_sequences(self.mirror.snapshot())
+
+    def _seq_dict(self, sn):
+        return snapshot.seq_dict(self.mirror.node(sn))
 
     def _build_seq(self, parent):
         if parent is None: return []
-        seq = []
-        skip = {"title", "description", "characters", "__seq__"}
-        for i in range(parent.childCount()):
-            child = parent.child(i)
-            key   = child.data(0, Qt.UserRole) or child.text(0)
-            value = child.text(1)
-            if key in skip or self._is_seq(child) or key == "option": continue
-            if is_seq_container(child):
-                seq.extend(self._build_seq(child)); continue
-            if key == "choice":
-                opts = []
-                for j in range(child.childCount()):
-                    oc = child.child(j); opt_text = oc.text(1).strip('"')
-                    sc = next((oc.child(k) for k in range(oc.childCount()) if is_seq_container(oc.child(k))), None)
-                    opts.append({"option": DoubleQuotedStr(opt_text), "sequence": self._build_seq(sc) if sc else []})
-                seq.append({"choice": opts})
-            elif key == "background":
-                p = child.parent()
-                if p and (p.data(0, Qt.UserRole) or p.text(0)) == "__seq__":
-                    continue
-                entry = {"background": value}
-                if ", fadeout:" in value:
-                    p_parts = value.split(", fadeout:")
-                    try: fade = int(p_parts[1].strip()) if "." not in p_parts[1] else float(p_parts[1].strip())
-                    except: fade = p_parts[1].strip()
-                    entry = {"background": p_parts[0].strip(), "fadeout": fade}
-                seq.append(entry)
-            elif key == "say":
-                seq.append({"say": DoubleQuotedStr(value.strip('"'))})
-            elif key == "wait":
-                try: seq.append({"wait": int(value) if "." not in value else float(value)})
-                except: seq.append({"wait": value})
-            else:
-                seq.append({key: value})
-        return seq
+        return snapshot.build_seq(self.mirror.node(parent))
+
+    def closeEvent(self, event):
+        self.panel.characters.flush()
+        if self._swap_dir: shutil.rmtree(self._swap_dir, ignore_errors=True)
+        super().closeEvent(event)
 
     def keyPressEvent(self, event):
+        ctrl, shift = event.modifiers() & Qt.ControlModifier, event.modifiers() & Qt.ShiftModifier
         if event.key() == Qt.Key_Delete: self._delete()
+        elif ctrl and event.key() == Qt.Key_H: self._show_find_replace()
+        elif ctrl and event.key() == Qt.Key_P: self._show_navigator()
+        elif ctrl and event.key() == Qt.Key_T: self.new_document()
+        elif ctrl and event.key() == Qt.Key_W: self._close_tab(self.tabs.currentIndex())
+        elif ctrl and (event.key() == Qt.Key_Y or (shift and event.key() == Qt.Key_Z)): self.undo_stack.redo()
+        elif ctrl and event.key() == Qt.Key_Z: self.undo_stack.undo()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,115 @@
+# ── Navigator index ──────────────────────────────────────────────────────────
+#
+# Trigram index over sequence ids/titles and say/option lines for the Ctrl+P
+# navigator. Entries are kept per snapshot sequence node; update() only
+# re-indexes sequences whose Node changed, so the postings stay current
+# without rebuilding the whole index after each edit.
+
+import heapq
+from itertools import islice
+from collections import Counter
+from snapshot import NodeKind, seq_id
+
+LINE_KEYS = ("say", "option")
+MAX_RESULTS = 50
+# per-keystroke bounds: entries ranked when all trigrams match, postings scanned by the fuzzy pass
+MAX_SCORED = 500
+FUZZY_BUDGET = 4000
+
+
+def trigrams(text):
+    t = f"  {text} "
+    return {t[i:i + 3] for i in range(len(t) - 2)}
+
+
+def query_grams(q):
+    # inner trigrams match anywhere; one- and two-letter queries match word starts
+    if len(q) >= 3: return {q[i:i + 3] for i in range(len(q) - 2)}
+    return {f"  {q}"[-3:], f" {q}"[-3:]} if len(q) == 2 else {f"  {q}"}
+
+
+def seq_entries(sn, sid):
+    """[(path from the sequence item, kind, text)] for one snapshot sequence."""
+    title = (sn.data or {}).get("title", "")
+    out = [((), "sequence", f"{sid}  {title}".strip())]
+    out += [(p, n.key, n.value.strip('"')) for p, n in sn.walk() if n.kind != NodeKind.SEQ and n.key in LINE_KEYS]
+    return out
+
+
+class NavigatorIndex:
+    def __init__(self):
+        self.entries = {}        # eid -> (seq_id, path, kind, text, lowered)
+        self.postings = {}       # trigram -> {eid}
+        self._seqs = {}          # seq Node -> (seq_id, [eid])
+        self._root = None
+        self._heads = set()      # eids of the sequence entries
+        self._next = 0
+
+    def _add(self, sid, path, kind, text):
+        eid = self._next; self._next += 1
+        low = text.lower()
+        self.entries[eid] = (sid, path, kind, text, low)
+        for g in trigrams(low): self.postings.setdefault(g, set()).add(eid)
+        return eid
+
+    def _drop(self, eids):
+        for eid in eids:
+            for g in trigrams(self.entries.pop(eid)[4]):
+                s = self.postings.get(g)
+                if s is not None:
+                    s.discard(eid)
+                    if not s: del self.postings[g]
+
+    def update(self, root):
+        if root is self._root: return False
+        live = {}
+        for i, sn in enumerate(root.children):
+            if sn.kind != NodeKind.SEQ: continue
+            sid = seq_id(sn, i); prev = self._seqs.get(sn)
+            if prev is None or prev[0] != sid:
+                if prev is not None: self._drop(prev[1])
+                prev = (sid, [self._add(sid, *e) for e in seq_entries(sn, sid)])
+            live[sn] = prev
+        for sn, (_, eids) in self._seqs.items():
+            if sn not in live: self._drop(eids)
+        self._seqs, self._root = live, root
+        self._heads = {eids[0] for _, eids in live.values()}
+        return True
+
+    def search(self, query, limit=MAX_RESULTS):
+        """Ranked [(score, seq_id, path, kind, text)]; shared trigrams first, substring hits and sequences boosted."""
+        q = query.strip().lower()
+        if not q: return []
+        grams = sorted(query_grams(q), key=lambda g: len(self.postings.get(g, ())))
+        postings = [self.postings.get(g, set()) for g in grams]
+        # entries containing every trigram first; enough of them means no fuzzy pass is needed
+        # the rarest posting is intersected a chunk at a time, stopping once MAX_SCORED are found
+        common, rest, it = [], postings[1:], iter(postings[0])
+        while len(common) < MAX_SCORED:
+            chunk = set(islice(it, 2048))
+            if not chunk: break
+            common += chunk.intersection(*rest)
+        if len(common) >= limit:
+            # only a bounded number of these are ranked; sequences always are
+            pool = [(len(grams), eid) for eid in self._heads.intersection(postings[0]).intersection(*rest)]
+            pool += [(len(grams), eid) for eid in common[:MAX_SCORED]]
+        else:
+            # an entry sharing `need` trigrams shares one of the rarest len - need + 1, so only those
+            # postings are scanned and the common ones are intersected; need is raised while the
+            # scanned postings are over budget
+            need = max(1, (len(grams) + 1) // 2); k = len(grams) - need + 1
+            while k > 1 and sum(len(p) for p in postings[:k]) > FUZZY_BUDGET: k -= 1; need += 1
+            hits = Counter()
+            for p in postings[:k]: hits.update(p)
+            cand = set(hits)
+            for p in postings[k:]: hits.update(cand & p)
+            pool = heapq.nlargest(limit * 4, ((n, eid) for eid, n in hits.items() if n >= need))
+            pool += [(hits[eid], eid) for eid in self._heads.intersection(hits) if hits[eid] >= need]
+
+        def score(eid, n):
+            sid, path, kind, text, low = self.entries[eid]
+            pos = low.find(q)
+            s = n / len(grams) + (1.0 if pos >= 0 else 0) + (0.5 if pos == 0 else 0) + (0.3 if kind == "sequence" else 0)
+            return s - len(low) / 10000, sid, path, kind, text
+
+        return heapq.nlargest(limit, (score(eid, n) for n, eid in set(pool)), key=lambda r: r[0])
@@ -0,0 +1,120 @@
+# ── Script file I/O ──────────────────────────────────────────────────────────
+
+import os, gzip, lzma, json
+import yaml
+from yaml.events import MappingStartEvent, MappingEndEvent
+from serializer import write_sequences, write_json_sequences, first_difference
+
+# compressed scripts are (de)compressed as a stream while parsing / serializing
+CODECS = {
+    ".gz": lambda path, mode: gzip.open(path, mode + "t", compresslevel=6, encoding="utf-8"),
+    ".xz": lambda path, mode: lzma.open(path, mode + "t", encoding="utf-8"),
+}
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+try:
+    from yaml.cyaml import CParser
+    from yaml.composer import Composer
+    from yaml.constructor import SafeConstructor
+    from yaml.resolver import Resolver
+
+    class StreamLoader(CParser, Composer, SafeConstructor, Resolver):
+        """libyaml's event parser under the Python composer, so nodes can be built one at a time."""
+        def __init__(self, stream):
+            CParser.__init__(self, stream); Composer.__init__(self)
+            SafeConstructor.__init__(self); Resolver.__init__(self)
+except ImportError:
+    StreamLoader = yaml.SafeLoader
+SCRIPT_SUFFIXES = (".yaml", ".yml", ".yaml.gz", ".yml.gz", ".yaml.xz", ".yml.xz",
+                   ".json", ".json.gz", ".json.xz")
+
+
+def is_json(path):
+    base, ext = os.path.splitext(path.lower())
+    if ext in CODECS: base, ext = os.path.splitext(base)
+    return ext == ".json"
+
+
+def open_script(path, mode="r"):
+    codec = CODECS.get(os.path.splitext(path)[1].lower())
+    return codec(path, mode) if codec else open(path, mode, encoding="utf-8")
+
+
+def _expect(loader, cls):
+    ev = loader.get_event()
+    if not isinstance(ev, cls):
+        raise yaml.YAMLError(f"expected {cls.__name__[:-5]}, got {type(ev).__name__[:-5]}")
+    return ev
+
+
+def iter_sequences(stream):
+    """Yield (seq_id, data) pairs from a script without loading the whole document."""
+    loader = StreamLoader(stream)
+    try:
+        loader.get_event(); loader.get_event()          # stream / document start
+        if not loader.check_event(MappingStartEvent): return
+        loader.get_event()
+        while not loader.check_event(MappingEndEvent):
+            key = loader.construct_document(loader.compose_node(None, None))
+            if key != "sequences" or not loader.check_event(MappingStartEvent):
+                loader.compose_node(None, None); continue
+            loader.get_event()
+            while not loader.check_event(MappingEndEvent):
+                seq_id = loader.construct_document(loader.compose_node(None, None))
+                yield seq_id, loader.construct_document(loader.compose_node(None, None)) or {}
+            _expect(loader, MappingEndEvent)
+    finally:
+        loader.dispose()
+
+
+def read_sequences(path):
+    if is_json(path):
+        yield from (load_script(path).get("sequences") or {}).items(); return
+    with open_script(path) as f:
+        yield from iter_sequences(f)
+
+
+def load_script(path):
+    with open_script(path) as f:
+        if is_json(path): return json.load(f) or {}
+        return yaml.load(f, Loader=Loader) or {}
+
+
+def write_script(path, pairs):
+    """Write (seq_id, data) pairs as YAML or JSON, picked by the file suffix."""
+    with open_script(path, "w") as f:
+        (write_json_sequences if is_json(path) else write_sequences)(f, pairs)
+
+
+def save_script(path, sequences, verify=False):
+    """With verify, the script is written next to path, read back and only moved into place if it matches."""
+    if not verify:
+        write_script(path, sequences.items()); return
+    head, name = os.path.split(path)
+    tmp = os.path.join(head, ".verify-" + name)          # same suffix, so the same codec and format
+    try:
+        write_script(tmp, sequences.items())
+        diff = verify_script(tmp, sequences)
+        if diff: raise ValueError(f"Export verification failed, {name} was not written.\nFirst difference at {diff}")
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp): os.remove(tmp)
+
+
+def verify_script(path, sequences):
+    """None if the script at path reads back as exactly `sequences`, else where it first differs."""
+    return first_difference({"sequences": sequences}, load_script(path))
+
+
+def walk_entries(seq, prefix=""):
+    """Yield (path, entry) for every command dict, descending into choice options."""
+    for i, entry in enumerate(seq or []):
+        if not isinstance(entry, dict): continue
+        path = f"{prefix}{i}"
+        yield path, entry
+        for j, opt in choice_options(entry):
+            yield from walk_entries(opt.get("sequence"), f"{path}.{j}.")
+
+
+def choice_options(entry):
+    """(index, option) for the options of a choice entry; anything that is not a mapping is skipped."""
+    return [(j, opt) for j, opt in enumerate(entry.get("choice") or []) if isinstance(opt, dict)]
@@ -0,0 +1,146 @@
+# ── YAML serializer ──────────────────────────────────────────────────────────
+
+import re, json, math
+from yaml.resolver import Resolver
+
+# Custom string subclass used to flag values that must be double-quoted in YAML
+class DoubleQuotedStr(str):
+    pass
+
+# first character -> [(tag, regexp)] PyYAML uses to type plain scalars; a plain string matching one would load as non-str
+_IMPLICIT = Resolver.yaml_implicit_resolvers
+_PLAIN_UNSAFE = re.compile(r"""[:{}\[\]|>&*!,#?'"\\%@`]|^-""")
+# everything a double-quoted scalar cannot hold literally: breaks (also NEL and U+2028/9, which PyYAML folds),
+# controls, BOM and what the YAML reader rejects. Lone surrogates have no YAML form; writing them fails.
+_ESCAPE_RE = re.compile('[\\\\"\x00-\x1f\x7f-\x9f\u2028\u2029\ufeff\ufffe\uffff]')
+_ESCAPES = {"\\": "\\\\", '"': '\\"', "\n": "\\n", "\t": "\\t", "\r": "\\r", "\x00": "\\0",
+            "\x85": "\\N", "\u2028": "\\L", "\u2029": "\\P"}
+
+def _escape_char(m):
+    c = m.group(0)
+    return _ESCAPES.get(c) or (f"\\x{ord(c):02x}" if ord(c) < 0x100 else f"\\u{ord(c):04x}")
+
+def _yaml_escape(s):
+    s = str(s)
+    if s.isprintable() and "\\" not in s and '"' not in s: return s
+    return _ESCAPE_RE.sub(_escape_char, s)
+
+def _plain_ok(s):
+    if not s or s[0] == " " or s[-1] == " " or _PLAIN_UNSAFE.search(s) or not s.isprintable(): return False
+    return not any(rx.match(s) for _, rx in _IMPLICIT.get(s[0], ()))
+
+def _yaml_float(v):
+    if math.isnan(v): return ".nan"
+    if math.isinf(v): return ".inf" if v > 0 else "-.inf"
+    r = repr(v)
+    if "e" in r and "." not in r: r = r.replace("e", ".0e")    # YAML 1.1 floats need the dot
+    return r
+
+_rendered = {}          # plain str -> YAML text; keys and names repeat throughout a script
+
+def _yaml_str(s):
+    r = _rendered.get(s)
+    if r is None:
+        if len(_rendered) > 50_000: _rendered.clear()
+        r = _rendered[s] = s if _plain_ok(s) else f'"{_yaml_escape(s)}"'
+    return r
+
+def _yaml_scalar(v):
+    t = type(v)
+    if t is str:
+        return _yaml_str(v)
+    if t is DoubleQuotedStr or isinstance(v, DoubleQuotedStr):
+        return f'"{_yaml_escape(v)}"'
+    if v is None:
+        return "null"
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    if isinstance(v, int):
+        return str(v)
+    if isinstance(v, float):
+        return _yaml_float(v)
+    if isinstance(v, (dict, list)):
+        return "{}" if isinstance(v, dict) else "[]"     # only ever empty here; _dump_node expands the rest
+    return _yaml_str(str(v))
+
+def _block(v):
+    return isinstance(v, (dict, list)) and len(v) > 0
+
+def _dump_pair(lines, head, k, v, child_indent):
+    # head: what precedes the key ("  " or "- "); child_indent: where a block value starts
+    if _block(v):
+        lines.append(f"{head}{_yaml_scalar(k)}:")
+        lines.append(_dump_node(v, child_indent))
+    else:
+        lines.append(f"{head}{_yaml_scalar(k)}: {_yaml_scalar(v)}")
+
+def _dump_node(node, indent):
+    sp = " " * indent
+    lines = []
+    if isinstance(node, list):
+        for item in node:
+            if isinstance(item, dict) and item:
+                pairs = iter(item.items())
+                k0, v0 = next(pairs)
+                # a list under the first key may sit at the key's column; anything else goes one level deeper
+                _dump_pair(lines, f"{sp}- ", k0, v0, indent + (2 if isinstance(v0, list) else 4))
+                for k, v in pairs:
+                    _dump_pair(lines, f"{sp}  ", k, v, indent + 4)
+            elif isinstance(item, list) and item:
+                lines.append(f"{sp}-")
+                lines.append(_dump_node(item, indent + 2))
+            else:
+                lines.append(f"{sp}- {_yaml_scalar(item)}")
+    elif isinstance(node, dict):
+        for k, v in node.items():
+            _dump_pair(lines, sp, k, v, indent + 2)
+    else:
+        lines.append(f"{sp}{_yaml_scalar(node)}")
+    return "\n".join(l for l in lines if l)
+
+def dump_yaml(data):
+    return _dump_node(data, 0) + "\n"
+
+def _kind(v):
+    return "null" if v is None else "bool" if isinstance(v, bool) else "int" if isinstance(v, int) else \
+           "float" if isinstance(v, float) else "str" if isinstance(v, str) else type(v).__name__
+
+def first_difference(expected, actual, path=""):
+    """Where `actual` (e.g. a re-parsed script) first differs from `expected`, as a readable string; None if equal."""
+    where = path or "/"
+    if isinstance(expected, dict):
+        if not isinstance(actual, dict): return f"{where}: expected a mapping, got {actual!r:.80}"
+        for k in expected:
+            if k not in actual: return f"{where}: key {k!r:.80} missing"
+        for k in actual:
+            if k not in expected: return f"{where}: unexpected key {k!r:.80}"
+        for k, v in expected.items():
+            d = first_difference(v, actual[k], f"{path}/{k}")
+            if d: return d
+        return None
+    if isinstance(expected, list):
+        if not isinstance(actual, list): return f"{where}: expected a list, got {actual!r:.80}"
+        for i, (a, b) in enumerate(zip(expected, actual)):
+            d = first_difference(a, b, f"{path}/{i}")
+            if d: return d
+        return None if len(expected) == len(actual) else f"{where}: {len(expected)} items, got {len(actual)}"
+    if _kind(expected) != _kind(actual) or (expected != actual and expected == expected):   # nan == nan here
+        return f"{where}: expected {expected!r:.80}, got {actual!r:.80}"
+    return None
+
+def write_sequences(f, pairs):
+    # Streams one top-level sequence at a time; same output as dump_yaml({"sequences": ...})
+    empty = True
+    for seq_id, sd in pairs:
+        if empty: f.write("sequences:\n"); empty = False
+        f.write(_dump_node({seq_id: sd}, 2) + "\n")
+    if empty: f.write("sequences: {}\n")
+
+
+def write_json_sequences(f, pairs):
+    # Same schema as write_sequences, one sequence encoded at a time
+    f.write('{"sequences": {')
+    for i, (seq_id, sd) in enumerate(pairs):
+        f.write((",\n" if i else "\n") + json.dumps(str(seq_id), ensure_ascii=False) + ": "
+                + json.dumps(sd, ensure_ascii=False, separators=(",", ":")))
+    f.write("\n}}\n")
@@ -0,0 +1,101 @@
+# ── Route slices ─────────────────────────────────────────────────────────────
+#
+#   python slices.py script.yaml out.yaml intro [more roots…]
+#   python slices.py script.yaml --routes intro ch2_a ch2_b -o out/ [-j N]
+#
+# A slice is the chosen root sequences plus every sequence reachable from
+# them through `jump`, written in document order. Scripts on disk are streamed:
+# the jump index is built in one pass and each slice is written by reading the
+# script again, keeping only its own sequences.
+
+import os, sys, argparse, tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from scriptio import read_sequences, write_script, walk_entries, is_json
+
+
+def jump_index(pairs):
+    """{seq_id: [jump targets]} in a single pass."""
+    return {sid: list(dict.fromkeys(str(e["jump"]).strip() for _, e in walk_entries((sd or {}).get("sequence"))
+                                    if e.get("jump") is not None))
+            for sid, sd in pairs}
+
+
+def closure(index, roots):
+    """Roots plus all sequences reachable through jumps; unknown targets are skipped."""
+    seen, stack = set(), [r for r in roots if r in index]
+    while stack:
+        sid = stack.pop()
+        if sid in seen: continue
+        seen.add(sid); stack.extend(t for t in index[sid] if t in index and t not in seen)
+    return seen
+
+
+def slice_pairs(sequences, roots, index=None):
+    keep = closure(index or jump_index(sequences.items()), roots)
+    return [(sid, sd) for sid, sd in sequences.items() if sid in keep]
+
+
+def write_slice(sequences, roots, path, index=None):
+    pairs = slice_pairs(sequences, roots, index)
+    write_script(path, pairs)
+    return path, len(pairs)
+
+
+def _write_kept(script, keep, path):
+    """Stream script again and write only the sequences in keep; runs in the worker processes."""
+    n = 0
+
+    def kept():
+        nonlocal n
+        for sid, sd in read_sequences(script):
+            if sid in keep: n += 1; yield sid, sd
+
+    write_script(path, kept())
+    return path, n
+
+
+def write_slice_file(script, roots, path, index=None):
+    """write_slice for a script on disk, read twice instead of held in memory."""
+    return _write_kept(script, closure(index or jump_index(read_sequences(script)), roots), path)
+
+
+def export_routes(script, routes, out_dir, ext=None, workers=None, index=None):
+    """One file per route root, written in parallel; returns [(path, n_sequences)].
+
+    Workers get the script path and the ids of their slice and stream the
+    script themselves, so no sequence data is pickled into the pool.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    ext = ext or (".json" if is_json(script) else ".yaml")
+    index = index or jump_index(read_sequences(script))
+    jobs = [(script, closure(index, [r]), os.path.join(out_dir, f"{r}{ext}")) for r in routes if r in index]
+    if len(jobs) < 2: return [_write_kept(*j) for j in jobs]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as ex:
+        return [f.result() for f in [ex.submit(_write_kept, *j) for j in jobs]]
+
+
+def export_routes_of(sequences, routes, out_dir, workers=None):
+    """export_routes for sequences held in memory; they are written once to a script the workers read."""
+    with tempfile.TemporaryDirectory() as tmp:
+        script = os.path.join(tmp, "script.yaml")
+        write_script(script, sequences.items())
+        return export_routes(script, routes, out_dir, ".yaml", workers, jump_index(sequences.items()))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("script"); ap.add_argument("args", nargs="*", help="out file and root sequences")
+    ap.add_argument("--routes", nargs="+", help="write one slice per route root")
+    ap.add_argument("-o", "--out", default="."); ap.add_argument("-j", "--jobs", type=int)
+    a = ap.parse_args()
+    index = jump_index(read_sequences(a.script))        # streamed; only the jump targets are kept
+    if a.routes:
+        results = export_routes(a.script, a.routes, a.out, workers=a.jobs, index=index)
+    elif len(a.args) >= 2:
+        results = [write_slice_file(a.script, a.args[1:], a.args[0], index)]
+    else:
+        ap.error("give an output file and root sequences, or --routes")
+    missing = [r for r in (a.routes or a.args[1:]) if r not in index]
+    for path, n in results: print(f"{path}: {n} sequence(s)")
+    if missing: print("unknown sequences: " + ", ".join(missing)); sys.exit(1)
@@ -0,0 +1,113 @@
+# ── Document snapshots ───────────────────────────────────────────────────────
+#
+# Immutable mirror of the editor tree. A Node is never modified after it is
+# built; an edit replaces only the nodes on the path from the edited item to
+# the root, so consecutive snapshots share every untouched subtree. Snapshots
+# are plain Python objects and can be handed to worker threads. Command
+# nodes carry their parsed fields (commands.py) in `data`.
+
+import gzip, pickle
+from enum import IntEnum
+import commands
+
+
+class NodeKind(IntEnum):
+    ROOT, SEQ, META, HEADER_BG, CHARACTERS, CHAR_ENTRY, CONTAINER, CHOICE, OPTION, BACKGROUND, CMD = range(11)
+
+KIND_BY_KEY = {"__seq__": NodeKind.SEQ, "title": NodeKind.META, "description": NodeKind.META,
+               "characters": NodeKind.CHARACTERS, "sequence": NodeKind.CONTAINER,
+               "choice": NodeKind.CHOICE, "option": NodeKind.OPTION, "background": NodeKind.BACKGROUND}
+
+
+class Node:
+    __slots__ = ("kind", "key", "value", "data", "children")
+
+    def __init__(self, kind, key, value="", data=None, children=()):
+        self.kind, self.key, self.value, self.data, self.children = kind, key, value, data, children
+
+    def __repr__(self):
+        return f"Node({NodeKind(self.kind).name}, {self.key!r}, {self.value!r}, {len(self.children)} children)"
+
+    def __reduce__(self):
+        # plain constructor call; much faster to pickle and load than the default slot state
+        return Node, (self.kind, self.key, self.value, self.data, self.children)
+
+    def size(self):
+        return 1 + sum(ch.size() for ch in self.children)
+
+    def walk(self, path=()):
+        """Yield (path, node) depth-first; paths are child indices from this node."""
+        yield path, self
+        for i, ch in enumerate(self.children):
+            yield from ch.walk(path + (i,))
+
+
+# ── export ───────────────────────────────────────────────────────────────────
+
+def container_of(node):
+    return next((ch for ch in node.children if ch.kind == NodeKind.CONTAINER), None)
+
+
+def fields_of(node):
+    return node.data if node.data is not None else commands.parse_display(node.key, node.value)
+
+
+def build_seq(node):
+    if node is None: return []
+    seq = []
+    for child in node.children:
+        kind = child.kind
+        if kind in (NodeKind.SEQ, NodeKind.META, NodeKind.CHARACTERS, NodeKind.OPTION, NodeKind.HEADER_BG):
+            continue
+        if kind == NodeKind.CONTAINER:
+            seq.extend(build_seq(child)); continue
+        if kind == NodeKind.CHOICE:
+            opts = []
+            for oc in child.children:
+                sc = container_of(oc)
+                opts.append({**commands.to_entry("option", fields_of(oc)), "sequence": build_seq(sc) if sc else []})
+            seq.append({"choice": opts})
+        else:
+            seq.append(commands.to_entry(child.key, fields_of(child)))
+    return seq
+
+
+def seq_dict(node):
+    d = node.data or {}
+    chars = {}
+    for part in d.get("chars","").split(","):
+        if ":" in part:
+            k, v = part.split(":", 1); chars[k.strip()] = v.strip()
+    sc = container_of(node)
+    return {
+        "title":       d.get("title",""),
+        "description": d.get("desc",""),
+        "background":  d.get("bg",""),
+        "characters":  chars,
+        "sequence":    build_seq(sc if sc else node)
+    }
+
+
+def seq_id(node, index):
+    return (node.data or {}).get("id", f"seq_{index}")
+
+
+def build_sequences(root):
+    return {seq_id(sn, i): seq_dict(sn) for i, sn in enumerate(root.children) if sn.kind == NodeKind.SEQ}
+
+
+# ── swap files ───────────────────────────────────────────────────────────────
+#
+# A document evicted from memory is kept as its snapshot plus whatever state
+# the editor needs to bring it back (view state, hot-reload baseline), pickled
+# into a gzip file. Only this process writes and reads these files.
+
+def write_swap(path, state):
+    with gzip.open(path, "wb", compresslevel=1) as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def read_swap(path):
+    with gzip.open(path, "rb") as f:
+        return pickle.load(f)
@@ -0,0 +1,128 @@
+# ── Spelling and style check ─────────────────────────────────────────────────
+#
+#   python spellcheck.py script.yaml -w words.txt [-w more.txt] [-c characters.json]
+#
+# Offline checker for say/option text. Known words come from plain word
+# lists (one word per line, `#` starts a comment) and the character roster;
+# `{name}` mentions and `(he/she/they)` groups are skipped. Results are cached
+# per line text, so a recheck only looks at lines that changed since the last
+# pass. Without a word list only the style rules run.
+
+import os, re, sys, json, argparse
+from l10n import MENTION_RE, GENDER_RE, walk_texts
+from snapshot import NodeKind, seq_id, fields_of
+
+LINE_KEYS = ("say", "option")
+WORD_RE = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)*")
+SPACE_PUNCT_RE = re.compile(r"\s[,;:!?]")
+# (pattern, message, cheap test on (line, lowered words)); a pattern only runs when its test passes
+STYLE_RULES = [
+    (r"\b(?P<rep>\w+)\s+(?P=rep)\b", "repeated word",                   lambda t, w: len(set(w)) < len(w)),
+    (r"(?<=\S)  +(?=\S)",             "double space",                    lambda t, w: "  " in t),
+    (r"(?<=\w)\s+(?=[,;:!?])",        "space before punctuation",        lambda t, w: SPACE_PUNCT_RE.search(t)),
+    (r"[,;](?=[^\W\d_])",             "missing space after punctuation", lambda t, w: "," in t or ";" in t),
+    (r"^\s+|\s+$",                    "leading/trailing space",          lambda t, w: t != t.strip()),
+]
+STYLE_RE = [(re.compile(rx, re.I), msg, test) for rx, msg, test in STYLE_RULES]
+
+
+def load_words(paths):
+    words = set()
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                w = line.split("#", 1)[0].strip()
+                if w: words.add(w.lower())
+    return words
+
+
+def roster_names(path):
+    """Names in characters.json; both the current and the old list-of-names format."""
+    if not os.path.exists(path): return []
+    with open(path, "r", encoding="utf-8") as f: data = json.load(f)
+    return [c if isinstance(c, str) else str(c.get("name", "")) for c in data or []]
+
+
+def _mask(m):
+    return "§" * len(m.group(0))
+
+
+class Checker:
+    """Checks single lines; issues are (start, length, kind, message) with kind "spelling" or "style"."""
+    def __init__(self, words=(), names=()):
+        self.words = frozenset(words)
+        self.names = frozenset(w.lower() for n in names for w in WORD_RE.findall(n))
+        self._cache = {}         # line -> issues
+
+    def with_names(self, names):
+        """Checker sharing the word list with a different roster (and a fresh cache); self if the names match."""
+        other = Checker(self.words, names)
+        return self if other.names == self.names else other
+
+    def known(self, word):
+        w = word.lower().replace("’", "'")
+        if w in self.words or w in self.names: return True
+        return w.endswith("'s") and (w[:-2] in self.words or w[:-2] in self.names)
+
+    def cached(self, line):
+        return self._cache.get(line)
+
+    def check(self, line):
+        issues = self._cache.get(line)
+        if issues is None: issues = self._cache[line] = self._check(line)
+        return issues
+
+    def _check(self, line):
+        # mentions and gendered groups are masked with a non-word character so offsets still match the line
+        text = GENDER_RE.sub(_mask, MENTION_RE.sub(_mask, line)) if "{" in line or "/" in line else line
+        out = []
+        # set difference first; positions are only looked up for lines with unknown words
+        words = WORD_RE.findall(text.lower())
+        if self.words and not self.words.issuperset(words):
+            out += [(m.start(), len(m.group(0)), "spelling", f"unknown word '{m.group(0)}'")
+                    for m in WORD_RE.finditer(text) if not self.known(m.group(0))]
+        for rx, msg, test in STYLE_RE:
+            if test(text, words): out += [(m.start(), m.end() - m.start(), "style", msg) for m in rx.finditer(text)]
+        return tuple(sorted(out)) if out else ()
+
+    def check_text(self, text):
+        """[(line number, issue)] for a possibly multi-line dialogue text."""
+        return [(i, iss) for i, line in enumerate(text.split("\n")) for iss in self.check(line)]
+
+
+# ── project passes ───────────────────────────────────────────────────────────
+
+def check_snapshot(checker, root):
+    """[(seq_id, tree path, kind, text, line number, issue)] over every say/option line of a snapshot."""
+    out = []
+    for i, sn in enumerate(root.children):
+        if sn.kind != NodeKind.SEQ: continue
+        sid = seq_id(sn, i)
+        for path, n in sn.walk():
+            if n.kind == NodeKind.SEQ or n.key not in LINE_KEYS: continue
+            text = str(fields_of(n).get("text", ""))
+            out.extend((sid, path, n.key, text, ln, iss) for ln, iss in checker.check_text(text))
+    return out
+
+
+def check_pairs(checker, pairs):
+    """[(string id, kind, text, line number, issue)] for (seq_id, sequence dict) pairs."""
+    return [(sid, kind, text, ln, iss) for sid, kind, _, text in walk_texts(pairs)
+            for ln, iss in checker.check_text(text)]
+
+
+if __name__ == "__main__":
+    from scriptio import read_sequences
+    ap = argparse.ArgumentParser()
+    ap.add_argument("script")
+    ap.add_argument("-w", "--words", action="append", default=[], help="word list, one word per line")
+    ap.add_argument("-c", "--characters", default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                "characters.json"))
+    a = ap.parse_args()
+    checker = Checker(load_words(a.words), roster_names(a.characters))
+    issues = check_pairs(checker, read_sequences(a.script))
+    for sid, kind, text, ln, (start, length, _, msg) in issues:
+        line = text.split("\n")[ln]
+        print(f"{sid}: {msg}: …{line[max(0, start - 20):start + length + 20]}…")
+    print(f"{len(issues)} issue(s)")
+    sys.exit(1 if issues else 0)
@@ -0,0 +1,92 @@
+# ── Dialogue templates ───────────────────────────────────────────────────────
+#
+# A `say`/`option` line is compiled once into a tuple of tokens:
+#   (TEXT, "literal")   (MENTION, "luna")   (GENDER, ("he", "she", "they"))
+# Parentheses without a slash, e.g. "(sighs)", stay literal text.
+
+from functools import lru_cache
+from l10n import walk_texts
+
+TEXT, MENTION, GENDER = 0, 1, 2
+PRONOUNS = ("he", "she", "they")
+
+
+class Template:
+    __slots__ = ("tokens", "errors")
+
+    def __init__(self, tokens, errors):
+        self.tokens = tokens; self.errors = errors
+
+    def render(self, pronoun="they", names=None):
+        p = PRONOUNS.index(pronoun); names = names or {}; out = []
+        for kind, val in self.tokens:
+            if kind == TEXT:      out.append(val)
+            elif kind == MENTION: out.append(names.get(val) or val)
+            else:                 out.append(val[min(p, len(val) - 1)])
+        return "".join(out)
+
+    def mentions(self):
+        return [v for k, v in self.tokens if k == MENTION]
+
+
+@lru_cache(maxsize=65536)
+def compile_template(text):
+    tokens, errors, buf = [], [], []
+    i, n, depth = 0, len(text), 0
+
+    def flush():
+        if buf: tokens.append((TEXT, "".join(buf))); buf.clear()
+
+    while i < n:
+        c = text[i]
+        if c == "(":
+            j = text.find(")", i + 1); inner = text[i + 1:j]
+            if j >= 0 and "/" in inner and "(" not in inner:
+                flush()
+                forms = tuple(f.strip() for f in inner.split("/"))
+                if len(forms) != len(PRONOUNS):
+                    errors.append(f"gendered group ({inner}) has {len(forms)} forms, expected {len(PRONOUNS)}")
+                tokens.append((GENDER, forms)); i = j + 1; continue
+            depth += 1
+        elif c == ")":
+            if depth: depth -= 1
+            else: errors.append(f"unbalanced ')' at {i}")
+        elif c == "{":
+            j = text.find("}", i + 1); inner = text[i + 1:j]
+            if j >= 0 and "{" not in inner:
+                flush()
+                if not inner.strip(): errors.append(f"empty mention at {i}")
+                tokens.append((MENTION, inner.strip())); i = j + 1; continue
+            errors.append(f"unbalanced '{{' at {i}")
+        elif c == "}":
+            errors.append(f"unbalanced '}}' at {i}")
+        buf.append(c); i += 1
+    if depth: errors.append(f"{depth} unclosed '('")
+    flush()
+    return Template(tuple(tokens), tuple(errors))
+
+
+def check(text, known_names=None):
+    tpl = compile_template(text); issues = list(tpl.errors)
+    if known_names is not None:
+        issues += [f"unknown name {{{m}}}" for m in tpl.mentions() if m and m not in known_names]
+    return issues
+
+
+def validate_sequences(sequences, chars=()):
+    """Return [(id, message)] for every problem in the project, in one pass."""
+    chars = set(chars); out = []
+    for seq_id, sd in sequences.items():
+        known = chars | set((sd or {}).get("characters") or {})
+        for sid, kind, speaker, text in walk_texts([(seq_id, sd)]):
+            out.extend((sid, msg) for msg in check(text, known))
+    return out
+
+
+def parse_names(text):
+    """'luna=Luna, sol=Sol' -> {'luna': 'Luna', 'sol': 'Sol'}"""
+    out = {}
+    for part in text.split(","):
+        if "=" in part:
+            k, v = part.split("=", 1); out[k.strip()] = v.strip()
+    return out
@@ -0,0 +1,89 @@
+# Snapshots are persistent: edits to the editor tree must leave earlier
+# snapshots untouched and share every subtree they did not change.
+
+import os, sys
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+import pytest
+from PySide6.QtWidgets import QApplication
+from serializer import DoubleQuotedStr
+
+SCRIPT = {
+    "intro": {"title": "Intro", "characters": {"luna": "left"},
+              "sequence": [{"char": "luna"}, {"say": DoubleQuotedStr("Hello.")}, {"wait": 1},
+                           {"say": DoubleQuotedStr('"Stop!" she said')}]},
+    "middle": {"title": "Middle", "sequence": [{"say": DoubleQuotedStr("Unchanged.")}, {"jump": "ending"}]},
+    "ending": {"title": "Ending", "sequence": [{"say": DoubleQuotedStr("The end.")}]},
+}
+
+
+@pytest.fixture(scope="module")
+def app():
+    app = QApplication.instance() or QApplication([])
+    import main
+    main.init_fonts()
+    return app
+
+
+@pytest.fixture
+def editor(app):
+    import main
+    ed = main.DialogueTreeEditor()
+    for sid, sd in SCRIPT.items(): ed._add_seq_from_data(sid, sd)
+    yield ed
+    ed.close(); ed.deleteLater()
+
+
+def dump(node):
+    """Plain nested tuples, for comparing a snapshot before and after edits."""
+    return (int(node.kind), node.key, node.value, node.data and dict(node.data), tuple(dump(ch) for ch in node.children))
+
+
+def container(editor, seq_index):
+    import main
+    seq = editor.tree.topLevelItem(seq_index)
+    return next(seq.child(i) for i in range(seq.childCount()) if main.node_kind(seq.child(i)) == main.NodeKind.CONTAINER)
+
+
+def test_edits_leave_earlier_snapshot_unchanged(editor):
+    import main
+    before = editor.mirror.snapshot()
+    expected = dump(before)
+
+    body = container(editor, 0)
+    editor.set_cmd_text(body.child(1), "Goodbye.")
+    body.removeChild(body.child(2))
+    body.insertChild(0, main.make_item("wait", "2"))
+    after = editor.mirror.snapshot()
+
+    assert dump(before) == expected
+    assert after is not before
+    body_after = main.snapshot.container_of(after.children[0]).children
+    assert [ch.key for ch in body_after] == ["wait", "char", "say", "say"]
+    assert main.snapshot.fields_of(body_after[2])["text"] == "Goodbye."
+
+
+def test_untouched_sequences_are_shared(editor):
+    import main
+    before = editor.mirror.snapshot()
+
+    body = container(editor, 0)
+    body.child(1).setText(1, "Edited.")
+    body.removeChild(body.child(2))
+    body.insertChild(0, main.make_item("wait", "2"))
+    after = editor.mirror.snapshot()
+
+    assert after.children[0] is not before.children[0]
+    assert after.children[1] is before.children[1]
+    assert after.children[2] is before.children[2]
+    # inside the edited sequence, the header rows are untouched as well
+    untouched = [i for i, ch in enumerate(before.children[0].children) if ch.kind != main.NodeKind.CONTAINER]
+    assert untouched and all(after.children[0].children[i] is before.children[0].children[i] for i in untouched)
+
+
+def test_snapshot_round_trips_quoted_text(editor):
+    from snapshot import build_sequences
+    seqs = build_sequences(editor.mirror.snapshot())
+    assert seqs["intro"]["sequence"][3] == {"say": '"Stop!" she said'}
+    assert seqs["middle"]["sequence"] == SCRIPT["middle"]["sequence"]
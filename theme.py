@@ -189,6 +189,10 @@ QLabel#lbl_field {{
     color: {TEXT_DIM};
     font-size: 12px;
 }}
+QLabel#lbl_issue {{
+    color: #e07070;
+    font-size: 12px;
+}}
 QLabel#lbl_header {{
     color: {ACCENT_HI};
     font-size: 18px;
@@ -233,6 +237,15 @@ QListWidget::item {{
 QListWidget::item:selected {{ background-color: {BG_SEL}; color: {TEXT_HI}; }}
 QListWidget::item:hover:!selected {{ background-color: {BG_HOVER}; }}
 
+/* ── Menu ── */
+QMenu {{
+    background-color: {BG_PANEL};
+    border: 1px solid {BORDER};
+    padding: 4px;
+}}
+QMenu::item {{ padding: 6px 18px; color: {TEXT_MID}; }}
+QMenu::item:selected {{ background-color: {BG_SEL}; color: {TEXT_HI}; }}
+
 /* ── ScrollArea ── */
 QScrollArea {{
     border: none;
@@ -0,0 +1,110 @@
+# ── Variable index ───────────────────────────────────────────────────────────
+#
+#   python variables.py script.yaml
+#
+# `set` commands ("flag = 1", "score += 2") define a variable and read every
+# name on the right-hand side; `if` / `condition` entries only read. The
+# index is built per sequence and cached by snapshot node, so after an edit
+# only the sequences whose Node changed are scanned again.
+
+import re, sys, argparse
+from snapshot import NodeKind, seq_id
+from scriptio import read_sequences, walk_entries
+
+SET_KEYS = ("set",)
+CONDITION_KEYS = ("if", "condition")
+ASSIGN_RE = re.compile(r"^\s*([A-Za-z_]\w*)\s*([-+*/]?)=(?!=)\s*(.*)$", re.S)
+IDENT_RE  = re.compile(r"\"[^\"]*\"|'[^']*'|\b([A-Za-z_]\w*)\b")
+KEYWORDS  = {"and", "or", "not", "true", "false", "none", "null", "in", "is"}
+
+
+def names_in(expr):
+    return [m.group(1) for m in IDENT_RE.finditer(expr) if m.group(1) and m.group(1).lower() not in KEYWORDS]
+
+
+def parse(key, value):
+    """Return (defined, [read]) for one command."""
+    value = str(value)
+    if key in SET_KEYS:
+        m = ASSIGN_RE.match(value)
+        if not m: return None, []
+        var, op, rhs = m.groups()
+        return var, ([var] if op else []) + names_in(rhs)
+    if key in CONDITION_KEYS: return None, names_in(value)
+    return None, []
+
+
+def scan(commands):
+    """{var: ([def sites], [use sites])} from (site, key, value) triples, one pass."""
+    out = {}
+    for site, key, value in commands:
+        var, reads = parse(key, value)
+        if var: out.setdefault(var, ([], []))[0].append(site)
+        for r in reads: out.setdefault(r, ([], []))[1].append(site)
+    return out
+
+
+# ── sources ──────────────────────────────────────────────────────────────────
+
+def node_commands(seq_node):
+    """(tree path from the sequence item, key, value) for every command in a snapshot sequence."""
+    keys = SET_KEYS + CONDITION_KEYS
+    return ((p, n.key, n.value) for p, n in seq_node.walk() if n.kind == NodeKind.CMD and n.key in keys)
+
+
+def dict_commands(sd):
+    keys = SET_KEYS + CONDITION_KEYS
+    for path, entry in walk_entries((sd or {}).get("sequence")):
+        for k in keys:
+            if entry.get(k) is not None: yield path, k, entry[k]
+
+
+class VariableIndex:
+    def __init__(self):
+        self._seqs = {}          # seq Node -> {var: (defs, uses)}
+        self._root = None
+        self.vars = {}           # var -> ([(seq_id, path)], [(seq_id, path)])
+
+    def update(self, root):
+        """Rescan sequences whose Node changed since the last root; returns False if nothing did."""
+        if root is self._root: return False
+        cache, seqs = {}, []
+        for i, sn in enumerate(root.children):
+            if sn.kind != NodeKind.SEQ: continue
+            cache[sn] = self._seqs[sn] if sn in self._seqs else scan(node_commands(sn))
+            seqs.append((seq_id(sn, i), cache[sn]))
+        self._seqs, self._root = cache, root
+        self.vars = merge(seqs)
+        return True
+
+
+def merge(seqs):
+    out = {}
+    for sid, per in seqs:
+        for var, (defs, uses) in per.items():
+            d, u = out.setdefault(var, ([], []))
+            d.extend((sid, p) for p in defs); u.extend((sid, p) for p in uses)
+    return out
+
+
+def report(variables):
+    """Return (unused, never_set): variables set but never read, and read but never set."""
+    return (sorted(v for v, (d, u) in variables.items() if d and not u),
+            sorted(v for v, (d, u) in variables.items() if u and not d))
+
+
+def project_variables(pairs):
+    return merge((sid, scan(dict_commands(sd))) for sid, sd in pairs)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("script")
+    a = ap.parse_args()
+    variables = project_variables(read_sequences(a.script))
+    unused, never_set = report(variables)
+    for title, names, col in (("set but never read", unused, 0), ("read but never set", never_set, 1)):
+        print(f"{title}: {len(names)}")
+        for v in names:
+            print(f"  {v:<24} " + ", ".join(f"{sid}#{p}" for sid, p in variables[v][col][:5]))
+    sys.exit(1 if never_set else 0)
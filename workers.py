@@ -0,0 +1,34 @@
+# ── Background work ──────────────────────────────────────────────────────────
+#
+# run_in_background(fn, on_done) runs fn() on a worker thread and calls
+# on_done(result, error) back on the GUI thread.
+
+import threading
+from PySide6.QtCore import QObject, Signal
+
+
+class _Relay(QObject):
+    done = Signal(object, object, object)
+
+    def __init__(self):
+        super().__init__()
+        self.done.connect(self._deliver)
+
+    def _deliver(self, cb, result, error):
+        if cb: cb(result, error)
+
+
+_relay = None
+
+def run_in_background(fn, on_done=None):
+    global _relay
+    if _relay is None: _relay = _Relay()
+    relay = _relay
+
+    def work():
+        try: res, err = fn(), None
+        except Exception as e: res, err = None, e
+        relay.done.emit(on_done, res, err)
+
+    t = threading.Thread(target=work, daemon=True); t.start()
+    return t